@@ -1,14 +1,130 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
   
     openai_api_key: str
+    openai_timeout_seconds: float = 30.0
+    openai_connect_timeout_seconds: float = 5.0
+    openai_max_connections: int = 20
+    openai_max_keepalive_connections: int = 10
+    # Retries happen in our rate limiter, not the SDK, so they go back
+    # through the queue: 429s after Retry-After, connection errors,
+    # timeouts and 5xx after a jittered backoff.
+    openai_max_retries: int = 0
+    openai_rate_limit_retries: int = 2
+    openai_transient_retries: int = 2
+    openai_retry_backoff_base_seconds: float = 0.5
+    openai_retry_backoff_max_seconds: float = 8.0
+    # The model's per-minute quotas; 0 disables that limit.
+    openai_rpm_limit: int = 500
+    openai_tpm_limit: int = 30000
+    openai_queue_max_wait_seconds: float = 10.0
     
     laravel_api_base_url: str
     laravel_agent_email: str
     laravel_agent_password: str
     
+    # Log in again this long before the JWT expires, in the background.
+    jwt_refresh_margin_seconds: float = 600
+    
+    laravel_http_timeout_seconds: float = 10.0
+    laravel_http_max_connections: int = 50
+    laravel_http_max_keepalive_connections: int = 20
+    laravel_http_keepalive_expiry_seconds: float = 30.0
+    laravel_http2: bool = False
+    laravel_uds_path: Optional[str] = None
+    # Coalesce employee/shift lookups into agent/employees?ids=... requests.
+    laravel_bulk_lookups: bool = True
+    laravel_bulk_max_ids: int = 50
+    # Adaptive cap on concurrent Laravel requests (AIMD on observed latency).
+    laravel_concurrency_initial: int = 10
+    laravel_concurrency_min: int = 2
+    laravel_concurrency_max: int = 50
+    laravel_concurrency_latency_tolerance: float = 2.0
+    laravel_concurrency_max_wait_seconds: float = 5.0
+    # Per endpoint family (employees/{id}, fatigue-scores/{id}, ...).
+    laravel_breaker_failure_threshold: int = 5
+    laravel_breaker_reset_seconds: float = 60.0
+    # Hedged GETs: a second request once the first has run past the
+    # endpoint's observed p95.
+    laravel_hedging: bool = False
+    laravel_hedge_min_samples: int = 20
+    laravel_hedge_min_delay_ms: float = 50.0
+    # Retries and hedges may add at most this share of extra traffic.
+    laravel_retry_budget_ratio: float = 0.1
+    laravel_retry_budget_min_per_second: float = 1.0
+    laravel_retry_backoff_base_seconds: float = 0.5
+    laravel_retry_backoff_max_seconds: float = 4.0
+    
+    cache_backend: str = "memory"
+    cache_redis_url: Optional[str] = None
+    cache_max_entries: int = 500
+    cache_max_bytes: Optional[int] = 32 * 1024 * 1024
+    cache_sweep_interval_seconds: float = 30.0
+    cache_push_invalidation: bool = False
+    # Shared secret Laravel sends in X-Agent-Token to call /api/cache/invalidate.
+    agent_api_token: Optional[str] = None
+    cache_stale_while_revalidate: bool = True
+    
+    # "llm" waits for the explanation; "deferred" answers with a template and
+    # generates the explanation in the background.
+    reasoning_mode: str = "llm"
+    explanation_callback_endpoint: Optional[str] = None
+    
+    # Off by default: cached decision explanations come from a canonical
+    # prompt without the per-check messages, so they are vaguer.
+    llm_cache_enabled: bool = False
+    llm_cache_max_entries: int = 2000
+    llm_cache_ttl_seconds: float = 86400
+    llm_cache_path: Optional[str] = None
+    # With a path, write new entries out this often, not just at shutdown.
+    llm_cache_save_interval_seconds: float = 60.0
+    llm_cache_score_bucket: int = 5
+    # Fatigue assessments from concurrent swaps share one completion,
+    # collected for up to the window or until max_items are waiting.
+    llm_batch_fatigue: bool = True
+    llm_batch_window_ms: float = 50
+    llm_batch_max_items: int = 8
+    # Swaps whose earlier shift is at least this many days away answer with
+    # template reasoning; their LLM explanation is produced in bulk by the
+    # offline tier ("local", or "openai" for the Batch API) and attached later.
+    # Only the decision explanation is deferred: these swaps' fatigue
+    # analysis stays a template. Off by default, since nothing polls
+    # /api/explanations yet and the swaps would only lose their LLM text.
+    offline_llm_enabled: bool = False
+    offline_llm_min_days_ahead: int = 14
+    offline_llm_backend: str = "local"
+    offline_llm_batch_interval_seconds: float = 60.0
+    offline_llm_batch_max_items: int = 50
+    offline_llm_local_concurrency: int = 2
+    offline_llm_poll_seconds: float = 30.0
+    
+    # "sequential" runs the checks one after another; "parallel" runs them
+    # concurrently in a single run_checks step.
+    validation_execution_mode: str = "sequential"
+    check_timeout_seconds: float = 8.0
+    fatigue_check_timeout_seconds: float = 15.0
+    context_prefetch_enabled: bool = True
+    # "langgraph" or "direct" (a plain loop over the same nodes). A non-zero
+    # sample rate replays that share of validations on the other executor
+    # and reports whether the outcomes match.
+    graph_executor: str = "langgraph"
+    graph_shadow_sample_rate: float = 0.0
+    # Overall budget per validation unless the caller sends
+    # X-Request-Deadline-Ms; 0 disables it. The reserve is kept back to
+    # answer requires_review when the graph runs out of time.
+    validation_deadline_seconds: float = 25.0
+    validation_deadline_reserve_ms: float = 250
+    
+    bulk_validation_concurrency: int = 8
+    bulk_validation_max_swaps: int = 100
+    
+    
+    # Warm-up runs after startup; /ready reports 503 until it has finished.
+    startup_budget_ms: float = 10000
+    startup_warm_connections: int = 4
     
     app_env: str = "development"
     app_port: int = 8001
@@ -0,0 +1,184 @@
+import asyncio
+import random
+from typing import Dict, Any, Callable, Awaitable, AsyncIterator, List, Optional, Union
+
+from app.graph.nodes import should_continue_after_availability, should_continue_after_fatigue
+from app.utils.request_context import RequestContext
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+END = "__end__"
+
+NodeFunction = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+Route = Union[str, Callable[[Dict[str, Any]], str]]
+
+# Same topology as the LangGraph workflows in workflow.py.
+SEQUENTIAL_ROUTES: Dict[str, Route] = {
+    "load_context": "check_availability",
+    "check_availability": should_continue_after_availability,
+    "check_fatigue": should_continue_after_fatigue,
+    "check_staffing": "check_compliance",
+    "check_compliance": "make_decision",
+    "make_decision": END
+}
+
+PARALLEL_ROUTES: Dict[str, Route] = {
+    "load_context": "run_checks",
+    "run_checks": "make_decision",
+    "make_decision": END
+}
+
+
+class DirectExecutor:
+    """Runs the validation nodes in a plain loop.
+
+    Exposes the ainvoke/astream calls main.py uses on the compiled LangGraph
+    app, without its channel bookkeeping: each node's result is merged into
+    one state dict and the routing functions pick the next node.
+    """
+
+    def __init__(self, nodes: Dict[str, NodeFunction], routes: Dict[str, Route], entry_point: str = "load_context"):
+        self.nodes = nodes
+        self.routes = routes
+        self.entry_point = entry_point
+
+    async def astream(self, state: Dict[str, Any], stream_mode: str = "updates") -> AsyncIterator[Dict[str, Any]]:
+        state = dict(state)
+        node_name = self.entry_point
+        while node_name != END:
+            update = await self.nodes[node_name](state)
+            if update:
+                state.update(update)
+            yield {node_name: update}
+
+            route = self.routes[node_name]
+            node_name = route(state) if callable(route) else route
+
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        state = dict(state)
+        async for update in self.astream(state):
+            for node_update in update.values():
+                if node_update:
+                    state.update(node_update)
+        return state
+
+
+def compare_outcomes(primary: Dict[str, Any], shadow: Dict[str, Any]) -> List[str]:
+    # LLM wording differs between runs; compare what decides the outcome.
+    mismatches = []
+    for field in ("decision", "confidence"):
+        if primary.get(field) != shadow.get(field):
+            mismatches.append(f"{field}: {primary.get(field)!r} != {shadow.get(field)!r}")
+
+    if bool(primary.get("error")) != bool(shadow.get("error")):
+        mismatches.append(f"error: {primary.get('error')!r} != {shadow.get('error')!r}")
+
+    def check_outcomes(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            check.check_name: (check.passed, check.severity)
+            for check in state.get("all_checks") or []
+        }
+
+    primary_checks, shadow_checks = check_outcomes(primary), check_outcomes(shadow)
+    for check_name in sorted(set(primary_checks) | set(shadow_checks), key=str):
+        if primary_checks.get(check_name) != shadow_checks.get(check_name):
+            mismatches.append(
+                f"{check_name}: {primary_checks.get(check_name)!r} != {shadow_checks.get(check_name)!r}"
+            )
+    return mismatches
+
+
+class ShadowExecutor:
+    """Serves results from `primary` and replays a sample of requests on
+    `shadow` in the background, recording whether the outcomes match.
+
+    Shadow runs skip LLM calls and other side effects (see
+    RequestContext.is_shadow), so they only cost upstream lookups, which
+    are normally cache hits by then.
+    """
+
+    def __init__(self, primary, shadow, sample_rate: float, primary_name: str, shadow_name: str):
+        self.primary = primary
+        self.shadow = shadow
+        self.sample_rate = sample_rate
+        self.primary_name = primary_name
+        self.shadow_name = shadow_name
+        self._tasks: set = set()
+        self._stats = {
+            "runs": 0,
+            "matches": 0,
+            "mismatches": 0,
+            "failures": 0
+        }
+        self._last_mismatch: Optional[Dict[str, Any]] = None
+
+    def _maybe_shadow(self, initial_state: Dict[str, Any], final_state: Dict[str, Any]):
+        if random.random() >= self.sample_rate:
+            return
+        task = asyncio.create_task(self._run_shadow(initial_state, final_state))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_shadow(self, initial_state: Dict[str, Any], primary_state: Dict[str, Any]):
+        RequestContext.fork(shadow=True)
+        self._stats["runs"] += 1
+        try:
+            shadow_state = await self.shadow.ainvoke(initial_state)
+        except Exception as e:
+            self._stats["failures"] += 1
+            logger.warning(f"Shadow {self.shadow_name} run failed for swap {initial_state.get('swap_id')}: {e}")
+            return
+
+        mismatches = compare_outcomes(primary_state, shadow_state)
+        if not mismatches:
+            self._stats["matches"] += 1
+            return
+
+        self._stats["mismatches"] += 1
+        self._last_mismatch = {
+            "swap_id": initial_state.get("swap_id"),
+            "correlation_id": RequestContext.get_correlation_id(),
+            "differences": mismatches
+        }
+        logger.warning(
+            f"Shadow mismatch for swap {initial_state.get('swap_id')} "
+            f"({self.primary_name} vs {self.shadow_name}): {'; '.join(mismatches)}"
+        )
+
+    async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        initial_state = dict(state)
+        final_state = await self.primary.ainvoke(state)
+        self._maybe_shadow(initial_state, final_state)
+        return final_state
+
+    async def astream(self, state: Dict[str, Any], stream_mode: str = "updates") -> AsyncIterator[Dict[str, Any]]:
+        # Callers (main.run_graph) merge updates into `state` as they arrive;
+        # the shadow has to start from the state before any node ran.
+        initial_state = dict(state)
+        final_state = dict(state)
+        async for update in self.primary.astream(state, stream_mode=stream_mode):
+            for node_update in update.values():
+                if node_update:
+                    final_state.update(node_update)
+            yield update
+        self._maybe_shadow(initial_state, final_state)
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        runs = self._stats["runs"] - self._stats["failures"]
+        return {
+            **self._stats,
+            "primary": self.primary_name,
+            "shadow": self.shadow_name,
+            "sample_rate": self.sample_rate,
+            "match_rate_percent": round(self._stats["matches"] / runs * 100, 2) if runs else None,
+            "in_flight": len(self._tasks),
+            "last_mismatch": self._last_mismatch
+        }
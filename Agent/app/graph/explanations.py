@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from app.config import get_settings
+from app.graph.tools import laravel_client
+from app.utils.cache import InMemoryCache
+from app.utils.request_context import RequestContext
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ExplanationStore:
+    """LLM explanations generated after the validation response was sent.
+
+    Entries are keyed by correlation_id and kept for a bounded time so
+    Laravel (or the UI) can poll for them; when a callback endpoint is
+    configured the finished explanation is also pushed to Laravel. A pending
+    entry can be given a longer ttl than the default, e.g. to outlive an
+    offline batch's completion window.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._entries = InMemoryCache(max_size=max_entries, default_ttl=ttl_seconds)
+        self._tasks: set = set()
+        self._stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "pushed": 0
+        }
+
+    def schedule(
+        self,
+        correlation_id: str,
+        swap_id: int,
+        generate: Callable[[], Awaitable[str]],
+        pending_seconds: Optional[float] = None
+    ):
+        # Pending for at least as long as generate() may take; the finished
+        # entry then gets the default ttl.
+        ttl = max(self.ttl_seconds, pending_seconds or 0)
+        self._entries.set_nowait(correlation_id, {
+            "correlation_id": correlation_id,
+            "swap_id": swap_id,
+            "status": "pending",
+            "reasoning": None,
+            "created_at": time.time()
+        }, ttl=ttl)
+        self._stats["scheduled"] += 1
+
+        task = asyncio.create_task(self._run(correlation_id, swap_id, generate))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, correlation_id: str, swap_id: int, generate: Callable[[], Awaitable[str]]):
+        RequestContext.fork()
+        entry = self._entries.get_nowait(correlation_id) or {"correlation_id": correlation_id, "swap_id": swap_id}
+        try:
+            reasoning = await generate()
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"Deferred explanation for swap {swap_id} failed: {e}")
+            self._entries.set_nowait(correlation_id, {**entry, "status": "failed", "error": str(e)})
+            return
+
+        self._stats["completed"] += 1
+        entry = {**entry, "status": "ready", "reasoning": reasoning, "completed_at": time.time()}
+        self._entries.set_nowait(correlation_id, entry)
+        logger.info(f"Deferred explanation ready for swap {swap_id}")
+
+        if settings.explanation_callback_endpoint:
+            try:
+                await laravel_client.post(
+                    settings.explanation_callback_endpoint.format(swap_id=swap_id),
+                    {"correlation_id": correlation_id, "reasoning": reasoning}
+                )
+                self._stats["pushed"] += 1
+            except Exception as e:
+                logger.warning(f"Could not push explanation for swap {swap_id} to Laravel: {e}")
+
+    def get(self, correlation_id: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get_nowait(correlation_id)
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self._tasks)
+        }
+
+
+explanation_store = ExplanationStore()
@@ -0,0 +1,376 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, TypeVar, Tuple
+import asyncio
+import json
+import random
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+
+from app.config import get_settings
+from app.utils.cache import SingleFlight
+from app.utils.llm_cache import LLMResponseCache, get_llm_cache
+from app.utils.request_context import RequestContext
+from app.utils.rate_limiter import openai_rate_limiter, estimate_tokens, retry_after_seconds
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+openai_client = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds),
+    max_retries=settings.openai_max_retries,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections
+        )
+    )
+)
+
+T = TypeVar("T")
+
+# Deferred explanations queue behind every call a request is waiting on.
+BACKGROUND_PRIORITY = 1000.0
+
+_llm_single_flight = SingleFlight()
+
+
+def bucket_score(score: Any, size: Optional[int] = None) -> int:
+    size = size or settings.llm_cache_score_bucket
+    try:
+        return int(round(float(score) / size) * size)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _request_options() -> Dict[str, Any]:
+    # Don't let the OpenAI call outlive the request that's waiting for it.
+    RequestContext.check_deadline("LLM call")
+    remaining = RequestContext.time_remaining()
+    return {"timeout": remaining} if remaining is not None else {}
+
+
+def _retry_backoff(attempt: int) -> float:
+    # Full jitter, so calls that failed together don't retry together.
+    cap = min(settings.openai_retry_backoff_max_seconds, settings.openai_retry_backoff_base_seconds * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+async def _rate_limited(send: Callable[[], Awaitable[T]], tokens: int, priority: float) -> T:
+    """Send once the rate limiter has room; on a 429, pause the whole queue
+    for Retry-After and go back into it. Connection errors, timeouts and
+    5xx (APITimeoutError is an APIConnectionError) back off and go back
+    into the queue too."""
+    rate_limited = transient = 0
+    while True:
+        # Background work has nobody waiting on it: it queues behind
+        # interactive calls for as long as that takes instead of failing.
+        max_wait = settings.openai_queue_max_wait_seconds if priority < BACKGROUND_PRIORITY else None
+        remaining = RequestContext.time_remaining()
+        if remaining is not None:
+            max_wait = min(max_wait, remaining) if max_wait is not None else remaining
+        charged = await openai_rate_limiter.acquire(tokens, priority, max_wait)
+        try:
+            result = await send()
+        except RateLimitError as e:
+            openai_rate_limiter.settle(charged, 0)
+            openai_rate_limiter.pause(retry_after_seconds(getattr(e.response, "headers", None)))
+            if rate_limited == settings.openai_rate_limit_retries:
+                raise
+            rate_limited += 1
+            continue
+        except (APIConnectionError, InternalServerError) as e:
+            # The call may have been processed, so its estimate stays charged.
+            if transient == settings.openai_transient_retries:
+                raise
+            wait_time = _retry_backoff(transient)
+            remaining = RequestContext.time_remaining()
+            if remaining is not None and wait_time >= remaining:
+                raise
+            transient += 1
+            logger.warning(f"OpenAI call failed ({type(e).__name__}), retrying in {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+            continue
+        
+        # Streams report no usage, so their estimate stands.
+        usage = getattr(result, "usage", None)
+        if usage is not None:
+            openai_rate_limiter.settle(charged, usage.total_tokens)
+        return result
+
+
+async def _create_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    priority: float = 0.0,
+    response_format: Optional[Dict[str, str]] = None
+) -> str:
+    extra = {"response_format": response_format} if response_format else {}
+    response = await _rate_limited(
+        lambda: openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **extra,
+            **_request_options()
+        ),
+        estimate_tokens(messages, max_tokens),
+        priority
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def _stream_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    on_token: Callable[[str], None],
+    priority: float = 0.0
+) -> str:
+    stream = await _rate_limited(
+        lambda: openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            **_request_options()
+        ),
+        estimate_tokens(messages, max_tokens),
+        priority
+    )
+    parts = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            parts.append(token)
+            on_token(token)
+    return "".join(parts).strip()
+
+
+def parse_batch_answers(content: str, count: int) -> Dict[int, str]:
+    """{"1": "...", "2": "..."} -> {0: "...", 1: "..."}; unusable entries are left out."""
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("batch answer is not a JSON object")
+    answers = {}
+    for key, value in data.items():
+        try:
+            index = int(key) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count and isinstance(value, str) and value.strip():
+            answers[index] = value.strip()
+    return answers
+
+
+class CompletionBatcher:
+    """Folds concurrent completions that share a system prompt into one
+    multi-item completion.
+
+    Prompts submitted within `window_ms` of each other (or until
+    `max_items` are waiting) go out as one numbered JSON request, and each
+    caller gets its own answer back. Items the batch answer doesn't cover,
+    or a batch that fails outright, fall back to one call per item.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens_per_item: int,
+        window_ms: float,
+        max_items: int
+    ):
+        self.name = name
+        self.system_prompt = system_prompt
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens_per_item = max_tokens_per_item
+        self.window_seconds = window_ms / 1000
+        self.max_items = max(max_items, 1)
+        self._pending: List[Tuple[List[Dict[str, str]], float, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self._stats = {
+            "items": 0,
+            "batches": 0,
+            "batched_items": 0,
+            "single_calls": 0,
+            "failed_batches": 0,
+            "fallback_items": 0
+        }
+
+    async def complete(self, messages: List[Dict[str, str]], priority: float = 0.0) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((messages, priority, future))
+        self._stats["items"] += 1
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items = [item for item in self._pending if not item[2].done()]
+        self._pending = []
+        if not items:
+            return
+        task = asyncio.create_task(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[Tuple[List[Dict[str, str]], float, asyncio.Future]]):
+        # The items belong to different requests; no single deadline applies.
+        RequestContext.fork()
+        if len(items) == 1:
+            self._stats["single_calls"] += 1
+            await self._run_single(items[0])
+            return
+
+        self._stats["batches"] += 1
+        self._stats["batched_items"] += len(items)
+        try:
+            answers = await self._complete_batch(items)
+        except Exception as e:
+            logger.warning(f"{self.name} batch of {len(items)} failed, falling back to per-item calls: {e}")
+            self._stats["failed_batches"] += 1
+            answers = {}
+
+        missing = []
+        for index, item in enumerate(items):
+            future = item[2]
+            if index not in answers:
+                missing.append(item)
+            elif not future.done():
+                future.set_result(answers[index])
+
+        if missing:
+            self._stats["fallback_items"] += len(missing)
+            await asyncio.gather(*(self._run_single(item) for item in missing))
+
+    async def _complete_batch(self, items: List[Tuple[List[Dict[str, str]], float, asyncio.Future]]) -> Dict[int, str]:
+        numbered = "\n\n".join(
+            f"Item {index + 1}:\n{messages[-1]['content'].strip()}"
+            for index, (messages, _, _) in enumerate(items)
+        )
+        content = await _create_completion(
+            [
+                {
+                    "role": "system",
+                    "content": (
+                        f"{self.system_prompt}\n"
+                        f"You will get {len(items)} numbered items; answer each one on its own. "
+                        'Reply with a JSON object mapping each item number ("1", "2", ...) to its answer.'
+                    )
+                },
+                {"role": "user", "content": numbered}
+            ],
+            self.model,
+            self.temperature,
+            self.max_tokens_per_item * len(items) + 20,
+            min(priority for _, priority, _ in items),
+            response_format={"type": "json_object"}
+        )
+        return parse_batch_answers(content, len(items))
+
+    async def _run_single(self, item: Tuple[List[Dict[str, str]], float, asyncio.Future]):
+        messages, priority, future = item
+        if future.done():
+            return
+        try:
+            content = await _create_completion(messages, self.model, self.temperature, self.max_tokens_per_item, priority)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(content)
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "avg_batch_size": round(self._stats["batched_items"] / batches, 2) if batches else None,
+            "pending": len(self._pending),
+            "window_ms": self.window_seconds * 1000,
+            "max_items": self.max_items
+        }
+
+
+async def complete_chat(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o",
+    temperature: float = 0.3,
+    max_tokens: int = 100,
+    cache_kind: Optional[str] = None,
+    cache_inputs: Optional[Dict[str, Any]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    priority: float = 0.0,
+    batcher: Optional[CompletionBatcher] = None
+) -> str:
+    """Run a chat completion, reusing a cached answer for the same canonical inputs.
+
+    Build `messages` from cache_inputs alone (e.g. from bucketed scores,
+    not the exact ones): anything else swap-specific in the prompt would
+    end up in an answer that is served to other swaps with the same key.
+
+    With on_token the completion is streamed and each token passed to the
+    callback; answers served from the cache (or from another caller's
+    in-flight request) arrive as a single token.
+
+    Calls wait for the OpenAI rate limiter in `priority` order, lowest first.
+    With a batcher, cache misses are sent through it (its model, temperature
+    and max_tokens must match these arguments).
+    """
+    async def create() -> str:
+        if batcher is not None and on_token is None:
+            return await batcher.complete(messages, priority)
+        if on_token is None:
+            return await _create_completion(messages, model, temperature, max_tokens, priority)
+        return await _stream_completion(messages, model, temperature, max_tokens, on_token, priority)
+
+    if not cache_kind or not settings.llm_cache_enabled:
+        return await create()
+
+    cache = get_llm_cache()
+    key = LLMResponseCache.make_key(cache_kind, {
+        **(cache_inputs or {}),
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    })
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug(f"LLM cache HIT: {cache_kind}")
+        if on_token is not None:
+            on_token(cached)
+        return cached
+
+    streamed = False
+
+    async def fetch() -> str:
+        nonlocal streamed
+        streamed = True
+        content = await create()
+        cache.set(key, content)
+        return content
+
+    content = await _llm_single_flight.do(key, fetch)
+    if on_token is not None and not streamed:
+        on_token(content)
+    return content
@@ -1,10 +1,22 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from openai import AsyncOpenAI
 import asyncio
 
 from app.graph.state import SwapValidationState
 from app.graph.tools import laravel_client
+from app.graph.llm import complete_chat, bucket_score, CompletionBatcher, BACKGROUND_PRIORITY
+from app.graph.explanations import explanation_store
+from app.graph.offline import OfflineBatchQueue, create_batch_backend
+from app.graph.records import EmployeeRecord, ShiftRecord, CheckResult
+from app.graph.prefetch import (
+    plan_id_prefetch,
+    plan_date_prefetch,
+    start_prefetch,
+    cancel_prefetch,
+    use_prefetched,
+    release_prefetch
+)
+from app.utils.request_context import RequestContext
 from app.config import get_settings
 import logging
 
@@ -12,10 +24,38 @@ settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
-openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+FATIGUE_HIGH_RISK_THRESHOLD = 60 
 
 
-FATIGUE_HIGH_RISK_THRESHOLD = 60 
+def days_until_shift(state: SwapValidationState) -> Optional[int]:
+    # Days until the earlier of the two shifts, or None if neither is dated.
+    days = [
+        shift.day for shift in (state.get('requester_shift_data'), state.get('target_shift_data'))
+        if shift is not None and shift.day is not None
+    ]
+    if not days:
+        return None
+    return max((min(day.date() for day in days) - datetime.now().date()).days, 0)
+
+
+def llm_priority(state: SwapValidationState) -> float:
+    # OpenAI calls for sooner shifts go first.
+    return float(days_until_shift(state) or 0)
+
+
+def uses_offline_llm(state: SwapValidationState) -> bool:
+    """Shifts far enough off that nobody needs the LLM explanation right
+    now: answer with templates and leave it to the offline batch tier."""
+    if not settings.offline_llm_enabled:
+        return False
+    days = days_until_shift(state)
+    return days is not None and days >= settings.offline_llm_min_days_ahead
+
+
+def llm_deadline_reserve() -> float:
+    # LLM calls give up early enough to fall back to a template and still
+    # leave the response its own reserve.
+    return settings.validation_deadline_reserve_ms * 2 / 1000
 
 
 SHIFT_FATIGUE_IMPACT = {
@@ -41,17 +81,33 @@ async def load_context_node(state: SwapValidationState) -> Dict[str, Any]:
 
     logger.info(f"Loading context for swap {state['swap_id']}")
     
+    # Speculatively fetch what the checks will need in the same wave as the
+    # context, so later nodes don't each pay a round trip.
+    prefetch_tasks = start_prefetch(plan_id_prefetch(state)) if settings.context_prefetch_enabled else {}
+    
     try:
-       
-        results = await asyncio.gather(
+        employees = asyncio.gather(
             laravel_client.get_employee(state['requester_id']),
             laravel_client.get_employee(state['target_employee_id']),
+            return_exceptions=True
+        )
+        requester_shift_data, target_shift_data = await asyncio.gather(
             laravel_client.get_shift(state['requester_shift_id']),
             laravel_client.get_shift(state['target_shift_id']),
             return_exceptions=True
         )
         
-        requester_data, target_data, requester_shift_data, target_shift_data = results
+        if (
+            settings.context_prefetch_enabled
+            and not isinstance(requester_shift_data, Exception)
+            and not isinstance(target_shift_data, Exception)
+        ):
+            # Availability is keyed by shift date, so it starts as soon as the shifts arrive.
+            prefetch_tasks.update(start_prefetch(
+                plan_date_prefetch(state, requester_shift_data, target_shift_data)
+            ))
+        
+        requester_data, target_data = await employees
         
        
         errors = []
@@ -66,26 +122,34 @@ async def load_context_node(state: SwapValidationState) -> Dict[str, Any]:
                 logger.error(f"Failed to load {name}: {result}")
         
         if errors:
+            await cancel_prefetch(prefetch_tasks)
             return {
-                **state,
                 "error": "; ".join(errors)
             }
         
-        logger.info("Context loaded successfully (parallel)")
+        # The checks await the prefetches they need; nothing waits for the
+        # slowest one here.
+        logger.info(f"Context loaded successfully (parallel, {len(prefetch_tasks)} prefetching)")
         
+        # Normalize once; every later node reads these records.
         return {
-            **state,
-            "requester_data": requester_data,
-            "target_data": target_data,
-            "requester_shift_data": requester_shift_data,
-            "target_shift_data": target_shift_data,
+            "requester_data": EmployeeRecord.from_payload(requester_data),
+            "target_data": EmployeeRecord.from_payload(target_data),
+            "requester_shift_data": ShiftRecord.from_payload(requester_shift_data),
+            "target_shift_data": ShiftRecord.from_payload(target_shift_data),
+            "prefetched": prefetch_tasks,
             "error": None
         }
         
+    except asyncio.CancelledError:
+        # Out of time (or the client went away): don't leave prefetches running.
+        for task in prefetch_tasks.values():
+            task.cancel()
+        raise
     except Exception as e:
         logger.error(f"Failed to load context: {str(e)}")
+        await cancel_prefetch(prefetch_tasks)
         return {
-            **state,
             "error": f"Failed to load context: {str(e)}"
         }
 
@@ -96,18 +160,22 @@ async def check_availability_node(state: SwapValidationState) -> Dict[str, Any]:
     logger.info(f"Checking availability for swap {state['swap_id']}")
     
     if state.get('error'):
-        return state
+        return {}
     
     try:
-        requester_shift_date = state['requester_shift_data'].get('shift_date')
-        target_shift_date = state['target_shift_data'].get('shift_date')
+        requester_shift_date = state['requester_shift_data'].shift_date
+        target_shift_date = state['target_shift_data'].shift_date
         
-        requester_name = state.get('requester_data', {}).get('full_name', 'Requester')
-        target_name = state.get('target_data', {}).get('full_name', 'Target employee')
+        requester_name = state['requester_data'].name('Requester')
+        target_name = state['target_data'].name('Target employee')
         
         requester_avail, target_avail = await asyncio.gather(
-            laravel_client.get_employee_availability(state['requester_id'], target_shift_date),
-            laravel_client.get_employee_availability(state['target_employee_id'], requester_shift_date)
+            use_prefetched(state, "requester_availability", lambda: laravel_client.get_employee_availability(
+                state['requester_id'], target_shift_date
+            )),
+            use_prefetched(state, "target_availability", lambda: laravel_client.get_employee_availability(
+                state['target_employee_id'], requester_shift_date
+            ))
         )
         
         requester_available = requester_avail.get('is_available', False) if requester_avail else True
@@ -126,44 +194,42 @@ async def check_availability_node(state: SwapValidationState) -> Dict[str, Any]:
             formatted_reason = REASON_FORMAT_MAP.get(raw_reason, REASON_FORMAT_MAP.get('other'))
             reasons.append(f"{target_name} is {formatted_reason} on {requester_shift_date}")
         
-        check_result = {
-            "check_name": "availability",
-            "passed": passed,
-            "severity": "hard",  # Hard check - blocks swap if failed
-            "message": "Both employees available" if passed else "; ".join(reasons),
-            "details": {
+        check_result = CheckResult(
+            check_name="availability",
+            passed=passed,
+            severity="hard",  # Hard check - blocks swap if failed
+            message="Both employees available" if passed else "; ".join(reasons),
+            details={
                 "requester_available": requester_available,
                 "target_available": target_available,
                 "requester_shift_date": requester_shift_date,
                 "target_shift_date": target_shift_date
             }
-        }
+        )
         
         logger.info(f"Availability check: {'PASSED' if passed else 'FAILED'}")
         
         return {
-            **state,
             "availability_check": check_result
         }
         
     except Exception as e:
         logger.error(f"Availability check error: {str(e)}")
         return {
-            **state,
-            "availability_check": {
-                "check_name": "availability",
-                "passed": False,
-                "severity": "hard",
-                "message": f"Could not verify availability: {str(e)}",
-                "details": {"error": str(e)}
-            }
+            "availability_check": CheckResult(
+                check_name="availability",
+                passed=False,
+                severity="hard",
+                message=f"Could not verify availability: {str(e)}",
+                details={"error": str(e)}
+            )
         }
 
 def calculate_realistic_fatigue_impact(
     current_score: int,
     new_shift_type: str,
-    new_shift_date: str,
-    old_shift_date: str
+    new_shift_date: Any,
+    old_shift_date: Any
 ) -> int:
    
     base_increase = SHIFT_FATIGUE_IMPACT.get(new_shift_type, 10)
@@ -193,36 +259,103 @@ def calculate_realistic_fatigue_impact(
     return current_score + total_increase
 
 
+FATIGUE_CONTEXT_TEMPLATE = """
+        Shift Swap Fatigue Analysis:
+        
+        Requester:
+        - Current fatigue score: about {requester_current}
+        - Projected after swap: about {requester_after} ({requester_status})
+        - Risk level: {requester_risk_level}
+        
+        Target Employee:
+        - Current fatigue score: about {target_current}
+        - Projected after swap: about {target_after} ({target_status})
+        - Risk level: {target_risk_level}
+        
+        High risk threshold: {threshold}
+        Scores are rounded to the nearest {bucket}; do not quote more precise figures.
+        """
+
+FATIGUE_SYSTEM_PROMPT = "You are a workplace safety analyst. Briefly assess the fatigue risk for this shift swap in 1-2 sentences."
+
+# Concurrent swaps' fatigue assessments go out as one completion.
+fatigue_batcher = CompletionBatcher(
+    "fatigue",
+    FATIGUE_SYSTEM_PROMPT,
+    model="gpt-4o",
+    temperature=0.3,
+    max_tokens_per_item=100,
+    window_ms=settings.llm_batch_window_ms,
+    max_items=settings.llm_batch_max_items
+)
+
+# Decision explanations for swaps whose shifts are far off (uses_offline_llm).
+offline_explanations = OfflineBatchQueue(
+    "decision",
+    model="gpt-4o",
+    temperature=0.4,
+    max_tokens=150,
+    interval_seconds=settings.offline_llm_batch_interval_seconds,
+    max_items=settings.offline_llm_batch_max_items,
+    backend=create_batch_backend()
+)
+
+
+def build_fatigue_context(inputs: Dict[str, Any]) -> str:
+    # Built only from the cache inputs, so a cached analysis never quotes
+    # figures from a different swap than the one it is served to.
+    def status(at_risk: bool) -> str:
+        return "at or above the high-risk threshold" if at_risk else "below the high-risk threshold"
+    
+    return FATIGUE_CONTEXT_TEMPLATE.format(
+        **inputs,
+        requester_status=status(inputs["requester_at_risk"]),
+        target_status=status(inputs["target_at_risk"]),
+        bucket=settings.llm_cache_score_bucket
+    )
+
+
+def render_fatigue_analysis(requester_name: str, requester_after: int, target_name: str, target_after: int) -> str:
+    at_risk = [
+        f"{name} would reach a fatigue score of {score}"
+        for name, score in ((requester_name, requester_after), (target_name, target_after))
+        if score >= FATIGUE_HIGH_RISK_THRESHOLD
+    ]
+    if not at_risk:
+        return "Projected fatigue stays below the high-risk threshold for both employees."
+    return f"{' and '.join(at_risk)} after the swap, at or above the high-risk threshold of {FATIGUE_HIGH_RISK_THRESHOLD}."
+
+
 async def check_fatigue_node(state: SwapValidationState) -> Dict[str, Any]:
     logger.info(f"Checking fatigue for swap {state['swap_id']}")
     
     if state.get('error'):
-        return state
+        return {}
     
     try:
         requester_fatigue, target_fatigue = await asyncio.gather(
-            laravel_client.get_fatigue_score(state['requester_id']),
-            laravel_client.get_fatigue_score(state['target_employee_id'])
+            use_prefetched(state, "requester_fatigue", lambda: laravel_client.get_fatigue_score(state['requester_id'])),
+            use_prefetched(state, "target_fatigue", lambda: laravel_client.get_fatigue_score(state['target_employee_id']))
         )
         
         requester_current_score = requester_fatigue.get('total_score', 0)
         target_current_score = target_fatigue.get('total_score', 0)
         
-        requester_shift = state.get('requester_shift_data', {})
-        target_shift = state.get('target_shift_data', {})
+        requester_shift = state['requester_shift_data']
+        target_shift = state['target_shift_data']
         
         requester_after_swap = calculate_realistic_fatigue_impact(
             requester_current_score,
-            target_shift.get('shift_type', 'day'),
-            target_shift.get('shift_date', ''),
-            requester_shift.get('shift_date', '')
+            target_shift.shift_type,
+            target_shift.day,
+            requester_shift.day
         )
         
         target_after_swap = calculate_realistic_fatigue_impact(
             target_current_score,
-            requester_shift.get('shift_type', 'day'),
-            requester_shift.get('shift_date', ''),
-            target_shift.get('shift_date', '')
+            requester_shift.shift_type,
+            requester_shift.day,
+            target_shift.day
         )
         
         requester_at_risk = requester_after_swap >= FATIGUE_HIGH_RISK_THRESHOLD
@@ -230,45 +363,66 @@ async def check_fatigue_node(state: SwapValidationState) -> Dict[str, Any]:
         
         passed = not (requester_at_risk or target_at_risk)
         
-        fatigue_context = f"""
-        Shift Swap Fatigue Analysis:
-        
-        Requester:
-        - Current fatigue score: {requester_current_score}
-        - Projected after swap: {requester_after_swap}
-        - Risk level: {requester_fatigue.get('risk_level', 'unknown')}
-        
-        Target Employee:
-        - Current fatigue score: {target_current_score}
-        - Projected after swap: {target_after_swap}
-        - Risk level: {target_fatigue.get('risk_level', 'unknown')}
-        
-        High risk threshold: {FATIGUE_HIGH_RISK_THRESHOLD}
-        """
+        # Bucketed scores plus the exact pass/fail outcome: near-identical
+        # swaps share one analysis, but never across a different outcome.
+        fatigue_inputs = {
+            "requester_current": bucket_score(requester_current_score),
+            "requester_after": bucket_score(requester_after_swap),
+            "requester_risk_level": requester_fatigue.get('risk_level', 'unknown'),
+            "requester_at_risk": requester_at_risk,
+            "target_current": bucket_score(target_current_score),
+            "target_after": bucket_score(target_after_swap),
+            "target_risk_level": target_fatigue.get('risk_level', 'unknown'),
+            "target_at_risk": target_at_risk,
+            "threshold": FATIGUE_HIGH_RISK_THRESHOLD
+        }
         
-        ai_response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a workplace safety analyst. Briefly assess the fatigue risk for this shift swap in 1-2 sentences."
-                },
-                {
-                    "role": "user", 
-                    "content": fatigue_context
-                }
-            ],
-            max_tokens=100,
-            temperature=0.3
+        template_analysis = lambda: render_fatigue_analysis(
+            state['requester_data'].name('Requester'),
+            requester_after_swap,
+            state['target_data'].name('Target employee'),
+            target_after_swap
         )
-        
-        ai_analysis = ai_response.choices[0].message.content.strip()
-        check_result = {
-            "check_name": "fatigue",
-            "passed": passed,
-            "severity": "hard",
-            "message": ai_analysis if not passed else "Fatigue levels are within safe limits",
-            "details": {
+        analysis_source = "llm"
+        if settings.reasoning_mode == "deferred" or RequestContext.is_shadow() or uses_offline_llm(state):
+            # Don't block on a second LLM call. This check's message feeds the
+            # deferred decision explanation, but its own analysis stays a
+            # template; the details say so.
+            ai_analysis = template_analysis()
+            analysis_source = "template"
+        else:
+            fatigue_context = build_fatigue_context(fatigue_inputs)
+            
+            try:
+                ai_analysis = await RequestContext.within_deadline(complete_chat(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": FATIGUE_SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user", 
+                            "content": fatigue_context
+                        }
+                    ],
+                    model="gpt-4o",
+                    max_tokens=100,
+                    temperature=0.3,
+                    cache_kind="fatigue",
+                    cache_inputs=fatigue_inputs,
+                    priority=llm_priority(state),
+                    batcher=fatigue_batcher if settings.llm_batch_fatigue else None
+                ), llm_deadline_reserve())
+            except asyncio.TimeoutError:
+                logger.warning("Fatigue analysis would overrun the request deadline, using template")
+                ai_analysis = template_analysis()
+                analysis_source = "template"
+        check_result = CheckResult(
+            check_name="fatigue",
+            passed=passed,
+            severity="hard",
+            message=ai_analysis if not passed else "Fatigue levels are within safe limits",
+            details={
                 "requester_current": requester_current_score,
                 "requester_after": requester_after_swap,
                 "requester_risk_level": requester_fatigue.get('risk_level'),
@@ -276,48 +430,49 @@ async def check_fatigue_node(state: SwapValidationState) -> Dict[str, Any]:
                 "target_after": target_after_swap,
                 "target_risk_level": target_fatigue.get('risk_level'),
                 "threshold": FATIGUE_HIGH_RISK_THRESHOLD,
-                "ai_analysis": ai_analysis
+                "ai_analysis": ai_analysis,
+                "ai_analysis_source": analysis_source
             }
-        }
+        )
         
         logger.info(f"Fatigue check: {'PASSED' if passed else 'FAILED'}")
         
         return {
-            **state,
             "fatigue_check": check_result
         }
         
     except Exception as e:
         logger.error(f"Fatigue check error: {str(e)}")
         return {
-            **state,
-            "fatigue_check": {
-                "check_name": "fatigue",
-                "passed": True,  
-                "severity": "soft",
-                "message": f"Could not fully assess fatigue: {str(e)}",
-                "details": {"error": str(e), "needs_manual_review": True}
-            }
+            "fatigue_check": CheckResult(
+                check_name="fatigue",
+                passed=True,  
+                severity="soft",
+                message=f"Could not fully assess fatigue: {str(e)}",
+                details={"error": str(e), "needs_manual_review": True}
+            )
         }
 
 async def check_staffing_node(state: SwapValidationState) -> Dict[str, Any]:
     logger.info(f"Checking staffing for swap {state['swap_id']}")
     
     if state.get('error'):
-        return state
+        return {}
     
     try:
-        requester_shift_assignments = await laravel_client.get_shift_assignments(
-            state['requester_shift_id']
-        )
-        target_shift_assignments = await laravel_client.get_shift_assignments(
-            state['target_shift_id']
+        requester_shift_assignments, target_shift_assignments = await asyncio.gather(
+            use_prefetched(state, "requester_shift_assignments", lambda: laravel_client.get_shift_assignments(
+                state['requester_shift_id']
+            )),
+            use_prefetched(state, "target_shift_assignments", lambda: laravel_client.get_shift_assignments(
+                state['target_shift_id']
+            ))
         )
         requester_shift = state['requester_shift_data']
         target_shift = state['target_shift_data']
         
-        requester_required = requester_shift.get('required_staff_count', 1)
-        target_required = target_shift.get('required_staff_count', 1)
+        requester_required = requester_shift.required_staff_count
+        target_required = target_shift.required_staff_count
         
         requester_current_count = len(requester_shift_assignments.get('data', []))
         target_current_count = len(target_shift_assignments.get('data', []))
@@ -337,37 +492,35 @@ async def check_staffing_node(state: SwapValidationState) -> Dict[str, Any]:
                 problems.append(f"Target's shift needs {target_required} staff, has {target_current_count}")
             message = "; ".join(problems)
         
-        check_result = {
-            "check_name": "staffing",
-            "passed": passed,
-            "severity": "soft",  # Manager can override if needed
-            "message": message,
-            "details": {
+        check_result = CheckResult(
+            check_name="staffing",
+            passed=passed,
+            severity="soft",  # Manager can override if needed
+            message=message,
+            details={
                 "requester_shift_required": requester_required,
                 "requester_shift_current": requester_current_count,
                 "target_shift_required": target_required,
                 "target_shift_current": target_current_count
             }
-        }
+        )
         
         logger.info(f"Staffing check: {'PASSED' if passed else 'NEEDS REVIEW'}")
         
         return {
-            **state,
             "staffing_check": check_result
         }
         
     except Exception as e:
         logger.error(f"Staffing check error: {str(e)}")
         return {
-            **state,
-            "staffing_check": {
-                "check_name": "staffing",
-                "passed": True,  # Don't block on error
-                "severity": "soft",
-                "message": f"Could not verify staffing: {str(e)}",
-                "details": {"error": str(e), "needs_manual_review": True}
-            }
+            "staffing_check": CheckResult(
+                check_name="staffing",
+                passed=True,  # Don't block on error
+                severity="soft",
+                message=f"Could not verify staffing: {str(e)}",
+                details={"error": str(e), "needs_manual_review": True}
+            )
         }
 
 
@@ -380,15 +533,6 @@ COMPLIANCE_RULES = {
 }
 
 
-def parse_shift_datetime(shift_data: Dict[str, Any], time_field: str) -> datetime:
-    date_str = shift_data.get('shift_date', '')
-    time_str = shift_data.get(time_field, '00:00:00')
-    try:
-        return datetime.fromisoformat(f"{date_str}T{time_str}".replace('Z', '+00:00'))
-    except:
-        return datetime.now()
-
-
 def calculate_rest_hours(shift1_end: datetime, shift2_start: datetime) -> float:
     delta = shift2_start - shift1_end
     return delta.total_seconds() / 3600
@@ -398,31 +542,24 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
     logger.info(f"Checking compliance for swap {state['swap_id']}")
     
     if state.get('error'):
-        return state
+        return {}
     
     violations = []
     warnings = []
     checks_performed = []
     
-    requester_shift = state.get('requester_shift_data', {})
-    target_shift = state.get('target_shift_data', {})
-    requester_data = state.get('requester_data', {})
-    target_data = state.get('target_data', {})
+    requester_shift = state['requester_shift_data']
+    target_shift = state['target_shift_data']
     
-    requester_name = requester_data.get('full_name', 'Requester')
-    target_name = target_data.get('full_name', 'Target Employee')
+    requester_name = state['requester_data'].name('Requester')
+    target_name = state['target_data'].name('Target Employee')
     
     try:
         checks_performed.append('minimum_rest_period')
         
-        requester_new_shift_start = parse_shift_datetime(target_shift, 'start_time')
-        requester_old_shift_end = parse_shift_datetime(requester_shift, 'end_time')
-        
-        target_new_shift_start = parse_shift_datetime(requester_shift, 'start_time')
-        target_old_shift_end = parse_shift_datetime(target_shift, 'end_time')
-        
-        rest_hours_requester = abs(calculate_rest_hours(requester_old_shift_end, requester_new_shift_start))
-        rest_hours_target = abs(calculate_rest_hours(target_old_shift_end, target_new_shift_start))
+        # Shift datetimes were parsed once in load_context.
+        rest_hours_requester = abs(calculate_rest_hours(requester_shift.end, target_shift.start))
+        rest_hours_target = abs(calculate_rest_hours(target_shift.end, requester_shift.start))
         
         min_rest = COMPLIANCE_RULES['min_rest_between_shifts_hours']
         
@@ -438,19 +575,8 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
         
         checks_performed.append('max_daily_hours')
         
-        def get_shift_hours(shift: Dict[str, Any]) -> float:
-            try:
-                start = parse_shift_datetime(shift, 'start_time')
-                end = parse_shift_datetime(shift, 'end_time')
-                hours = (end - start).total_seconds() / 3600
-                if hours < 0:
-                    hours += 24
-                return hours
-            except:
-                return 8
-        
-        requester_new_hours = get_shift_hours(target_shift)
-        target_new_hours = get_shift_hours(requester_shift)
+        requester_new_hours = target_shift.hours
+        target_new_hours = requester_shift.hours
         max_daily = COMPLIANCE_RULES['max_daily_hours']
         
         if requester_new_hours > max_daily:
@@ -461,8 +587,8 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
         
         checks_performed.append('night_shift_rules')
         
-        requester_new_type = target_shift.get('shift_type', 'day')
-        target_new_type = requester_shift.get('shift_type', 'day')
+        requester_new_type = target_shift.shift_type
+        target_new_type = requester_shift.shift_type
         
         if requester_new_type == 'night':
             warnings.append(f"{requester_name} will be switching to a night shift - verify they are eligible for night work")
@@ -473,8 +599,8 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
         checks_performed.append('weekly_hours_and_consecutive_days')
         
         requester_stats, target_stats = await asyncio.gather(
-            laravel_client.get_employee_shifts_stats(state['requester_id']),
-            laravel_client.get_employee_shifts_stats(state['target_employee_id']),
+            use_prefetched(state, "requester_shift_stats", lambda: laravel_client.get_employee_shifts_stats(state['requester_id'])),
+            use_prefetched(state, "target_shift_stats", lambda: laravel_client.get_employee_shifts_stats(state['target_employee_id'])),
             return_exceptions=True
         )
         
@@ -507,14 +633,13 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Compliance check error: {str(e)}")
         return {
-            **state,
-            "compliance_check": {
-                "check_name": "compliance",
-                "passed": True,
-                "severity": "soft",
-                "message": f"Could not fully verify compliance: {str(e)}",
-                "details": {"error": str(e), "needs_manual_review": True}
-            }
+            "compliance_check": CheckResult(
+                check_name="compliance",
+                passed=True,
+                severity="soft",
+                message=f"Could not fully verify compliance: {str(e)}",
+                details={"error": str(e), "needs_manual_review": True}
+            )
         }
     
     passed = len(violations) == 0
@@ -530,35 +655,34 @@ async def check_compliance_node(state: SwapValidationState) -> Dict[str, Any]:
         message = "All compliance checks passed"
         severity = "hard"
     
-    check_result = {
-        "check_name": "compliance",
-        "passed": passed,
-        "severity": severity,
-        "message": message,
-        "details": {
+    check_result = CheckResult(
+        check_name="compliance",
+        passed=passed,
+        severity=severity,
+        message=message,
+        details={
             "checks_performed": checks_performed,
             "violations": violations,
             "warnings": warnings,
             "rules_applied": COMPLIANCE_RULES
         }
-    }
+    )
     
     logger.info(f"Compliance check: {'PASSED' if passed else 'FAILED'} ({len(violations)} violations, {len(warnings)} warnings)")
     
     return {
-        **state,
         "compliance_check": check_result
     }
 
 
 # Node 6: Make Decision
 
-def generate_suggestions(failed_checks: List[Dict[str, Any]], state: SwapValidationState, all_checks: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+def generate_suggestions(failed_checks: List[CheckResult], state: SwapValidationState, all_checks: List[CheckResult] = None) -> List[Dict[str, Any]]:
     suggestions = []
     for check in failed_checks:
-        check_name = check.get('check_name')
-        details = check.get('details', {})
-        message = check.get('message', '')
+        check_name = check.check_name
+        details = check.details or {}
+        message = check.message
         
         if check_name == 'availability':
             if not details.get('requester_available', True):
@@ -665,12 +789,8 @@ def generate_suggestions(failed_checks: List[Dict[str, Any]], state: SwapValidat
     
    
     if not failed_checks and all_checks:
-        requester_shift = state.get('requester_shift_data', {})
-        target_shift = state.get('target_shift_data', {})
-        
-        
-        requester_type = requester_shift.get('shift_type', 'day')
-        target_type = target_shift.get('shift_type', 'day')
+        requester_type = state['requester_shift_data'].shift_type
+        target_type = state['target_shift_data'].shift_type
         
         if requester_type != target_type:
             if target_type == 'night':
@@ -694,9 +814,81 @@ def generate_suggestions(failed_checks: List[Dict[str, Any]], state: SwapValidat
     
     return suggestions
 
+CANONICAL_DECISION_CONTEXT_TEMPLATE = """
+Shift Swap Decision Analysis:
+
+SHIFTS INVOLVED:
+- Requester's current shift: {requester_shift_type} shift
+- Target's current shift: {target_shift_type} shift
+
+VALIDATION RESULTS:
+{check_lines}
+
+DECISION: {decision}
+CONFIDENCE: {confidence}
+
+Provide a clear, empathetic explanation that:
+1. States the decision (approved/rejected/needs review)
+2. Explains the main reason(s)
+3. If rejected or needs review, briefly mention what could help
+
+Address the requester as "you" and the other employee as "your colleague"; do not invent names, dates or numbers.
+Keep it professional but friendly, 2-3 sentences max.
+"""
+
+
+def build_decision_cache_inputs(
+    decision: str,
+    confidence: float,
+    all_checks: List[CheckResult],
+    requester_shift: ShiftRecord,
+    target_shift: ShiftRecord
+) -> Dict[str, Any]:
+    # Only what the canonical prompt shows: names, dates and free-text
+    # messages stay out so a cached explanation fits any swap with this key.
+    return {
+        "decision": decision,
+        "confidence": confidence,
+        "failed_checks": sorted(
+            (c.check_name, c.severity) for c in all_checks if not c.passed
+        ),
+        "passed_checks": sorted(c.check_name for c in all_checks if c.passed),
+        "requester_shift_type": requester_shift.shift_type or 'unknown',
+        "target_shift_type": target_shift.shift_type or 'unknown'
+    }
+
+
+def render_template_reasoning(
+    decision: str,
+    hard_failures: List[CheckResult],
+    soft_failures: List[CheckResult]
+) -> str:
+    if decision == "auto_approve":
+        return "All validation checks passed. This shift swap can be automatically approved."
+    if decision == "auto_reject":
+        reasons = "; ".join(c.message for c in hard_failures)
+        return f"This swap cannot proceed because a critical check failed: {reasons}."
+    reasons = "; ".join(c.message for c in soft_failures)
+    return f"Some concerns need manager review before this swap can be approved: {reasons}."
+
+
+def build_canonical_decision_context(inputs: Dict[str, Any]) -> str:
+    check_lines = [f" {name}: FAIL ({severity})" for name, severity in inputs["failed_checks"]]
+    check_lines += [f" {name}: PASS" for name in inputs["passed_checks"]]
+    return CANONICAL_DECISION_CONTEXT_TEMPLATE.format(
+        decision=inputs["decision"].upper(),
+        confidence=f"{inputs['confidence']:.0%}",
+        requester_shift_type=inputs["requester_shift_type"],
+        target_shift_type=inputs["target_shift_type"],
+        check_lines="\n".join(check_lines)
+    )
+
+
 async def make_decision_node(state: SwapValidationState) -> Dict[str, Any]:
     logger.info(f"Making decision for swap {state['swap_id']}")
     
+    release_prefetch(state)
+    
     all_checks = []
     hard_failures = []
     soft_failures = []
@@ -715,17 +907,16 @@ async def make_decision_node(state: SwapValidationState) -> Dict[str, Any]:
             
         all_checks.append(check)
         
-        if not check.get('passed', True):
-            if check.get('severity') == 'hard':
+        if not check.passed:
+            if check.severity == 'hard':
                 hard_failures.append(check)
-                risk_factors.append(f"[CRITICAL] {check['check_name']}: {check['message']}")
+                risk_factors.append(f"[CRITICAL] {check.check_name}: {check.message}")
             else:
                 soft_failures.append(check)
-                risk_factors.append(f"[WARNING] {check['check_name']}: {check['message']}")
+                risk_factors.append(f"[WARNING] {check.check_name}: {check.message}")
     
     if state.get('error'):
         return {
-            **state,
             "decision": "requires_review",
             "confidence": 0.0,
             "reasoning": f"Workflow encountered an error: {state['error']}",
@@ -743,28 +934,33 @@ async def make_decision_node(state: SwapValidationState) -> Dict[str, Any]:
         decision = "auto_approve"
         confidence = 0.9
     
-    requester_data = state.get('requester_data', {})
-    target_data = state.get('target_data', {})
-    requester_shift = state.get('requester_shift_data', {})
-    target_shift = state.get('target_shift_data', {})
+    requester_data = state['requester_data']
+    target_data = state['target_data']
+    requester_shift = state['requester_shift_data']
+    target_shift = state['target_shift_data']
     
-    decision_context = f"""
+    decision_inputs = None
+    if settings.llm_cache_enabled:
+        decision_inputs = build_decision_cache_inputs(decision, confidence, all_checks, requester_shift, target_shift)
+        decision_context = build_canonical_decision_context(decision_inputs)
+    else:
+        decision_context = f"""
 Shift Swap Decision Analysis:
 
 SWAP REQUEST:
 - Swap ID: {state['swap_id']}
-- Requested by: {requester_data.get('full_name', 'Unknown')}
-- Swap with: {target_data.get('full_name', 'Unknown')}
+- Requested by: {requester_data.name('Unknown')}
+- Swap with: {target_data.name('Unknown')}
 - Reason: {state.get('swap_reason', 'Not provided')}
 
 SHIFTS INVOLVED:
-- Requester's current shift: {requester_shift.get('shift_date', 'N/A')} ({requester_shift.get('shift_type', 'unknown')} shift)
-- Target's current shift: {target_shift.get('shift_date', 'N/A')} ({target_shift.get('shift_type', 'unknown')} shift)
+- Requester's current shift: {requester_shift.shift_date or 'N/A'} ({requester_shift.shift_type or 'unknown'} shift)
+- Target's current shift: {target_shift.shift_date or 'N/A'} ({target_shift.shift_type or 'unknown'} shift)
 
 VALIDATION RESULTS:
 {chr(10).join([
-    f" {c['check_name']}: PASS - {c['message']}" if c['passed'] 
-    else f" {c['check_name']}: FAIL ({c['severity']}) - {c['message']}"
+    f" {c.check_name}: PASS - {c.message}" if c.passed 
+    else f" {c.check_name}: FAIL ({c.severity}) - {c.message}"
     for c in all_checks
 ])}
 
@@ -779,33 +975,60 @@ Provide a clear, empathetic explanation that:
 Keep it professional but friendly, 2-3 sentences max.
 """
     
-    try:
-        ai_response = await openai_client.chat.completions.create(
+    decision_messages = [
+        {
+            "role": "system",
+            "content": "You are a friendly HR assistant helping explain shift swap decisions. Be clear, empathetic, and constructive. Use simple language that employees will understand."
+        },
+        {
+            "role": "user",
+            "content": decision_context
+        }
+    ]
+    
+    offline = uses_offline_llm(state)
+    
+    async def generate_reasoning(on_token=None, background: bool = False) -> str:
+        priority = llm_priority(state) + (BACKGROUND_PRIORITY if background else 0)
+        return await complete_chat(
+            messages=decision_messages,
             model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a friendly HR assistant helping explain shift swap decisions. Be clear, empathetic, and constructive. Use simple language that employees will understand."
-                },
-                {
-                    "role": "user",
-                    "content": decision_context
-                }
-            ],
             max_tokens=150,
-            temperature=0.4
+            temperature=0.4,
+            cache_kind="decision" if decision_inputs is not None else None,
+            cache_inputs=decision_inputs,
+            on_token=on_token,
+            priority=priority,
+            batcher=offline_explanations if offline and background else None
         )
-        
-        reasoning = ai_response.choices[0].message.content.strip()
-        
-    except Exception as e:
-        logger.error(f"Failed to generate AI reasoning: {str(e)}")
-        if decision == "auto_approve":
-            reasoning = "All validation checks passed. This shift swap can be automatically approved."
-        elif decision == "auto_reject":
-            reasoning = f"One or more critical checks failed: {', '.join([c['check_name'] for c in hard_failures])}. This swap cannot proceed."
-        else:
-            reasoning = f"Some concerns were identified that require manager review: {', '.join([c['check_name'] for c in soft_failures])}."
+    
+    RequestContext.emit("decision", {"decision": decision, "confidence": confidence})
+    
+    explanation_status = None
+    if RequestContext.is_shadow():
+        # Shadow runs only compare outcomes; skip the LLM.
+        reasoning = render_template_reasoning(decision, hard_failures, soft_failures)
+    elif settings.reasoning_mode == "deferred" or offline:
+        reasoning = render_template_reasoning(decision, hard_failures, soft_failures)
+        correlation_id = RequestContext.get_correlation_id()
+        if correlation_id:
+            explanation_store.schedule(
+                correlation_id, state['swap_id'], lambda: generate_reasoning(background=True),
+                pending_seconds=offline_explanations.completion_window_seconds if offline else None
+            )
+            explanation_status = "pending"
+    else:
+        on_token = None
+        if RequestContext.has_event_sink():
+            on_token = lambda token: RequestContext.emit("token", {"text": token})
+        try:
+            reasoning = await RequestContext.within_deadline(generate_reasoning(on_token), llm_deadline_reserve())
+        except asyncio.TimeoutError:
+            logger.warning("AI reasoning would overrun the request deadline, using template")
+            reasoning = render_template_reasoning(decision, hard_failures, soft_failures)
+        except Exception as e:
+            logger.error(f"Failed to generate AI reasoning: {str(e)}")
+            reasoning = render_template_reasoning(decision, hard_failures, soft_failures)
     
    
     all_failures = hard_failures + soft_failures
@@ -814,24 +1037,106 @@ Keep it professional but friendly, 2-3 sentences max.
     logger.info(f"Decision: {decision} (confidence: {confidence}, suggestions: {len(suggestions)})")
     
     return {
-        **state,
         "decision": decision,
         "confidence": confidence,
         "reasoning": reasoning,
+        "explanation_status": explanation_status,
         "risk_factors": risk_factors,
         "all_checks": all_checks,
         "suggestions": suggestions
     }
 
 def should_continue_after_availability(state: SwapValidationState) -> str:
-    check = state.get('availability_check') or {}  # Handle None
-    if not check.get('passed', True) and check.get('severity') == 'hard':
+    check = state.get('availability_check')
+    if check is not None and check.is_hard_failure:
         return "make_decision"  # Skip to decision on hard failure
     return "check_fatigue"
 
 
 def should_continue_after_fatigue(state: SwapValidationState) -> str:
-    check = state.get('fatigue_check') or {}  # Handle None
-    if not check.get('passed', True) and check.get('severity') == 'hard':
+    check = state.get('fatigue_check')
+    if check is not None and check.is_hard_failure:
         return "make_decision"  # Skip to decision on hard failure  
     return "check_staffing"
+
+
+def check_timeouts() -> Dict[str, float]:
+    return {
+        "availability": settings.check_timeout_seconds,
+        "fatigue": settings.fatigue_check_timeout_seconds,
+        "staffing": settings.check_timeout_seconds,
+        "compliance": settings.check_timeout_seconds
+    }
+
+
+PARALLEL_CHECKS = {
+    "availability": check_availability_node,
+    "fatigue": check_fatigue_node,
+    "staffing": check_staffing_node,
+    "compliance": check_compliance_node
+}
+
+# Same short-circuit points as the sequential graph's conditional edges.
+SHORT_CIRCUIT_CHECKS = ("availability", "fatigue")
+
+
+def timed_out_check(check_name: str, timeout: float) -> CheckResult:
+    return CheckResult(
+        check_name=check_name,
+        passed=False,
+        severity="soft",
+        message=f"The {check_name} check did not finish within {timeout:.0f}s",
+        details={"timeout_seconds": timeout, "needs_manual_review": True}
+    )
+
+
+async def run_checks_node(state: SwapValidationState) -> Dict[str, Any]:
+    """Run the independent checks concurrently and merge their results.
+
+    A hard failure from availability or fatigue cancels the checks still
+    running, mirroring the early exits of the sequential graph.
+    """
+    logger.info(f"Running checks in parallel for swap {state['swap_id']}")
+    
+    timeouts = check_timeouts()
+    
+    async def run_check(check_name: str) -> Optional[CheckResult]:
+        try:
+            result = await asyncio.wait_for(PARALLEL_CHECKS[check_name](state), timeout=timeouts[check_name])
+            return result.get(f"{check_name}_check")
+        except asyncio.TimeoutError:
+            logger.warning(f"{check_name} check timed out after {timeouts[check_name]}s")
+            return timed_out_check(check_name, timeouts[check_name])
+    
+    tasks = {
+        asyncio.create_task(run_check(check_name)): check_name
+        for check_name in PARALLEL_CHECKS
+    }
+    results: Dict[str, Any] = {}
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            short_circuit = False
+            for task in done:
+                check_name = tasks[task]
+                check = task.result()
+                results[f"{check_name}_check"] = check
+                if check is not None:
+                    RequestContext.emit("check", {"check": check.to_dict()})
+                
+                if check_name in SHORT_CIRCUIT_CHECKS and check is not None and check.is_hard_failure:
+                    short_circuit = True
+            
+            if short_circuit and pending:
+                cancelled = [tasks[task] for task in pending]
+                logger.info(f"Hard failure, cancelling remaining checks: {', '.join(cancelled)}")
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    return results
@@ -0,0 +1,207 @@
+import asyncio
+import itertools
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.config import get_settings
+from app.graph.llm import openai_client, complete_chat, BACKGROUND_PRIORITY
+from app.utils.request_context import RequestContext
+import logging
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class LocalBatchBackend:
+    """Stand-in for a batch completions API: sends the batch's requests
+    itself, a few at a time and behind every interactive call on the
+    OpenAI rate limiter."""
+
+    name = "local"
+    # Answers come back as soon as the rate limiter lets the requests through.
+    completion_window_seconds = 0.0
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(concurrency, 1)
+
+    async def run(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def complete(body: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await complete_chat(
+                    messages=body["messages"],
+                    model=body["model"],
+                    temperature=body["temperature"],
+                    max_tokens=body["max_tokens"],
+                    priority=BACKGROUND_PRIORITY
+                )
+
+        custom_ids = list(requests)
+        results = await asyncio.gather(*(complete(requests[custom_id]) for custom_id in custom_ids), return_exceptions=True)
+        answers = {}
+        for custom_id, result in zip(custom_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Offline request {custom_id} failed: {result}")
+            else:
+                answers[custom_id] = result
+        return answers
+
+
+class OpenAIBatchBackend:
+    """OpenAI's Batch API: upload the requests as JSONL, let OpenAI work
+    through them within its 24h window (at a discount and outside our
+    RPM/TPM quota), then download the answers."""
+
+    name = "openai"
+    completion_window_seconds = 24 * 3600.0
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+
+    async def run(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        lines = "\n".join(
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+            for custom_id, body in requests.items()
+        )
+        upload = await openai_client.files.create(file=("offline-batch.jsonl", lines.encode()), purpose="batch")
+        batch = await openai_client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted OpenAI batch {batch.id} with {len(requests)} requests")
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(self.poll_seconds)
+            batch = await openai_client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise Exception(f"OpenAI batch {batch.id} ended as {batch.status}")
+
+        output = await openai_client.files.content(batch.output_file_id)
+        answers = {}
+        for line in output.text.splitlines():
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                answers[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+        return answers
+
+
+def create_batch_backend():
+    if settings.offline_llm_backend == "openai":
+        if hasattr(openai_client, "batches"):
+            return OpenAIBatchBackend(settings.offline_llm_poll_seconds)
+        logger.warning("OFFLINE_LLM_BACKEND is 'openai' but this openai package has no Batch API, using the local backend")
+    return LocalBatchBackend(settings.offline_llm_local_concurrency)
+
+
+class OfflineBatchQueue:
+    """Completions nobody is waiting on right now, sent in bulk.
+
+    Jobs collect until `max_items` are queued or the oldest has waited
+    `interval_seconds`, then go to the backend as one batch. Same
+    complete(messages, priority) interface as CompletionBatcher, so
+    complete_chat can route cache misses through it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        interval_seconds: float,
+        max_items: int,
+        backend
+    ):
+        self.name = name
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.interval_seconds = interval_seconds
+        self.max_items = max(max_items, 1)
+        self.backend = backend
+        self._pending: List[Tuple[str, List[Dict[str, str]], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self._ids = itertools.count(1)
+        self._stats = {
+            "jobs": 0,
+            "batches": 0,
+            "completed": 0,
+            "failed": 0,
+            "last_batch_seconds": None
+        }
+
+    @property
+    def completion_window_seconds(self) -> float:
+        # Longest a job can wait for its answer: queued for one interval,
+        # then however long the backend may take (plus a poll for OpenAI).
+        poll = getattr(self.backend, "poll_seconds", 0.0)
+        return self.interval_seconds + self.backend.completion_window_seconds + poll
+
+    async def complete(self, messages: List[Dict[str, str]], priority: float = 0.0) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((f"{self.name}-{next(self._ids)}", messages, future))
+        self._stats["jobs"] += 1
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.interval_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        jobs = [job for job in self._pending if not job[2].done()]
+        self._pending = []
+        if not jobs:
+            return
+        task = asyncio.create_task(self._run(jobs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, jobs: List[Tuple[str, List[Dict[str, str]], asyncio.Future]]):
+        RequestContext.fork()
+        self._stats["batches"] += 1
+        started = time.perf_counter()
+        requests = {
+            custom_id: {
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens
+            }
+            for custom_id, messages, _ in jobs
+        }
+        try:
+            answers = await self.backend.run(requests)
+        except Exception as e:
+            logger.error(f"Offline {self.name} batch of {len(jobs)} failed: {e}")
+            answers = {}
+        self._stats["last_batch_seconds"] = round(time.perf_counter() - started, 1)
+
+        for custom_id, _, future in jobs:
+            if future.done():
+                continue
+            if custom_id in answers:
+                self._stats["completed"] += 1
+                future.set_result(answers[custom_id])
+            else:
+                self._stats["failed"] += 1
+                future.set_exception(Exception(f"No answer for {custom_id} in the offline batch"))
+        logger.info(f"Offline {self.name} batch done: {len(answers)}/{len(jobs)} answered")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "backend": self.backend.name,
+            "pending": len(self._pending),
+            "running_batches": len(self._tasks),
+            "completion_window_seconds": self.completion_window_seconds,
+            "min_days_ahead": settings.offline_llm_min_days_ahead
+        }
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Dict, Any, Callable, Awaitable
+
+from app.graph.tools import laravel_client
+from app.utils.request_context import RequestContext
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchStats:
+    def __init__(self):
+        self._stats = {
+            "issued": 0,
+            "used": 0,
+            "wasted": 0,
+            "failed": 0,
+            "fallback_fetches": 0
+        }
+        self._wasted_by_key: Dict[str, int] = {}
+
+    def record(self, field: str, count: int = 1):
+        if RequestContext.is_shadow():
+            return
+        self._stats[field] += count
+
+    def record_wasted(self, key: str):
+        if RequestContext.is_shadow():
+            return
+        self._stats["wasted"] += 1
+        self._wasted_by_key[key] = self._wasted_by_key.get(key, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        issued = self._stats["issued"]
+        return {
+            **self._stats,
+            "waste_rate_percent": round(self._stats["wasted"] / issued * 100, 2) if issued else 0,
+            "wasted_by_key": dict(self._wasted_by_key)
+        }
+
+
+prefetch_stats = PrefetchStats()
+
+
+def plan_id_prefetch(state: Dict[str, Any]) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    # Everything the checks need that only depends on the swap IDs.
+    return {
+        "requester_fatigue": lambda: laravel_client.get_fatigue_score(state['requester_id']),
+        "target_fatigue": lambda: laravel_client.get_fatigue_score(state['target_employee_id']),
+        "requester_shift_assignments": lambda: laravel_client.get_shift_assignments(state['requester_shift_id']),
+        "target_shift_assignments": lambda: laravel_client.get_shift_assignments(state['target_shift_id']),
+        "requester_shift_stats": lambda: laravel_client.get_employee_shifts_stats(state['requester_id']),
+        "target_shift_stats": lambda: laravel_client.get_employee_shifts_stats(state['target_employee_id'])
+    }
+
+
+def plan_date_prefetch(
+    state: Dict[str, Any],
+    requester_shift: Dict[str, Any],
+    target_shift: Dict[str, Any]
+) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    # Each employee's availability is checked on the date of the shift they take over.
+    return {
+        "requester_availability": lambda: laravel_client.get_employee_availability(
+            state['requester_id'], target_shift.get('shift_date')
+        ),
+        "target_availability": lambda: laravel_client.get_employee_availability(
+            state['target_employee_id'], requester_shift.get('shift_date')
+        )
+    }
+
+
+def start_prefetch(plan: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, asyncio.Task]:
+    prefetch_stats.record("issued", len(plan))
+    return {key: asyncio.create_task(fetch()) for key, fetch in plan.items()}
+
+
+async def cancel_prefetch(tasks: Dict[str, asyncio.Task]):
+    for task in tasks.values():
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for key in tasks:
+        prefetch_stats.record_wasted(key)
+
+
+async def use_prefetched(state: Dict[str, Any], key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Await the prefetch for `key` (and only that one), or fetch it now if
+    it wasn't prefetched, was cancelled or failed."""
+    task = (state.get('prefetched') or {}).get(key)
+    if task is not None and not task.cancelled():
+        ctx = RequestContext.get()
+        if ctx:
+            ctx.setdefault("prefetch_used", set()).add(key)
+        try:
+            result = await task
+        except Exception as e:
+            # The node fetches it itself and handles the error as before.
+            prefetch_stats.record("failed")
+            logger.warning(f"Prefetch of {key} failed: {e}")
+        else:
+            prefetch_stats.record("used")
+            return result
+
+    prefetch_stats.record("fallback_fetches")
+    return await fetch()
+
+
+def release_prefetch(state: Dict[str, Any]):
+    """Cancel the prefetches no check read (e.g. after an early hard
+    failure) and count them as wasted round trips. Runs once per request:
+    make_decision_node calls it, and main again in case a deadline cut
+    the graph short."""
+    ctx = RequestContext.get()
+    if ctx:
+        if ctx.get("prefetch_released"):
+            return
+        ctx["prefetch_released"] = True
+    used = ctx.get("prefetch_used", set())
+    for key, task in (state.get('prefetched') or {}).items():
+        if key in used:
+            continue
+        if task.done():
+            if not task.cancelled():
+                task.exception()  # retrieved, so asyncio doesn't log it as unhandled
+        else:
+            task.cancel()
+        prefetch_stats.record_wasted(key)
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+def parse_shift_datetime(shift_date: Optional[str], time_str: Optional[str]) -> datetime:
+    try:
+        return datetime.fromisoformat(f"{shift_date or ''}T{time_str or '00:00:00'}".replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.now()
+
+
+def parse_shift_day(shift_date: Any) -> Optional[datetime]:
+    if not isinstance(shift_date, str):
+        return shift_date
+    try:
+        return datetime.fromisoformat(shift_date.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class EmployeeRecord:
+    """The parts of an agent/employees payload the graph uses."""
+    id: Optional[int]
+    full_name: Optional[str]
+    is_active: Optional[bool] = None
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "EmployeeRecord":
+        return cls(
+            id=data.get('id'),
+            full_name=data.get('full_name'),
+            is_active=data.get('is_active')
+        )
+
+    def name(self, default: str) -> str:
+        return self.full_name or default
+
+
+@dataclass(slots=True)
+class ShiftRecord:
+    """A shift with its dates parsed once when the context is loaded."""
+    id: Optional[int]
+    shift_date: Optional[str]
+    shift_type: Optional[str]
+    required_staff_count: int
+    start: datetime
+    end: datetime
+    day: Optional[datetime]
+    department_id: Optional[int] = None
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "ShiftRecord":
+        shift_date = data.get('shift_date')
+        return cls(
+            id=data.get('id'),
+            shift_date=shift_date,
+            shift_type=data.get('shift_type', 'day'),
+            required_staff_count=data.get('required_staff_count', 1),
+            start=parse_shift_datetime(shift_date, data.get('start_time')),
+            end=parse_shift_datetime(shift_date, data.get('end_time')),
+            day=parse_shift_day(shift_date),
+            department_id=data.get('department_id')
+        )
+
+    @property
+    def hours(self) -> float:
+        hours = (self.end - self.start).total_seconds() / 3600
+        if hours < 0:
+            hours += 24  # overnight shift
+        return hours
+
+
+@dataclass(slots=True)
+class CheckResult:
+    check_name: str
+    passed: bool
+    severity: str
+    message: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_hard_failure(self) -> bool:
+        return not self.passed and self.severity == 'hard'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "check_name": self.check_name,
+            "passed": self.passed,
+            "severity": self.severity,
+            "message": self.message,
+            "details": self.details
+        }
@@ -1,6 +1,7 @@
 
 from typing import Optional, List, Dict, Any
 from typing_extensions import TypedDict
+from app.graph.records import EmployeeRecord, ShiftRecord, CheckResult
 class SwapValidationState(TypedDict):   
     swap_id: int
     requester_id: int
@@ -10,21 +11,24 @@ class SwapValidationState(TypedDict):
     swap_reason: Optional[str]
     
   
-    requester_data: Optional[Dict[str, Any]]      
-    target_data: Optional[Dict[str, Any]]         
-    requester_shift_data: Optional[Dict[str, Any]]  
-    target_shift_data: Optional[Dict[str, Any]]     
+    requester_data: Optional[EmployeeRecord]
+    target_data: Optional[EmployeeRecord]
+    requester_shift_data: Optional[ShiftRecord]
+    target_shift_data: Optional[ShiftRecord]
+    prefetched: Optional[Dict[str, Any]]
     
    
-    availability_check: Optional[Dict[str, Any]]
-    fatigue_check: Optional[Dict[str, Any]]
-    staffing_check: Optional[Dict[str, Any]]
-    compliance_check: Optional[Dict[str, Any]]
+    availability_check: Optional[CheckResult]
+    fatigue_check: Optional[CheckResult]
+    staffing_check: Optional[CheckResult]
+    compliance_check: Optional[CheckResult]
     
    
     decision: Optional[str]        
     confidence: Optional[float]    
     reasoning: Optional[str]       
+    explanation_status: Optional[str]
     risk_factors: List[str]         
-    all_checks: List[Dict[str, Any]]  
+    all_checks: List[CheckResult]
+    suggestions: List[Dict[str, Any]]
     error: Optional[str]            
@@ -1,59 +1,514 @@
 import httpx
 from app.config import get_settings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Deque
+from collections import deque
 from datetime import datetime, timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
 import logging
 import jwt
 import asyncio
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from app.utils.cache import get_cache, CacheKeys
-from app.utils.request_context import get_logger
+import random
+import time
+from app.utils.cache import (
+    get_cache,
+    get_single_flight,
+    CacheKeys,
+    CachePolicy,
+    CachePolicies,
+    PushInvalidatedCachePolicies
+)
+from app.utils.request_context import RequestContext, get_logger
 
 settings = get_settings()
 logger = get_logger(__name__)
 
 
+class LookupBatch:
+    def __init__(self):
+        self.tasks: Dict[str, asyncio.Future] = {}
+        self.deduplicated = 0
+    
+    @property
+    def unique_lookups(self) -> int:
+        return len(self.tasks)
+
+
+# Set while a bulk validation runs so every swap in the batch shares lookups.
+_lookup_batch: ContextVar[Optional[LookupBatch]] = ContextVar('lookup_batch', default=None)
+
+
+class BulkLoader:
+    """Coalesces single-ID lookups made in the same event-loop tick into one
+    bulk request (`{endpoint}?ids=1,2,3`).
+
+    IDs the bulk response doesn't contain are fetched one by one, and if the
+    bulk route itself is missing the loader falls back to per-ID calls for a
+    while before trying it again.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        bulk_endpoint: str,
+        fetch_bulk: Callable[[str], Awaitable[Any]],
+        fetch_one: Callable[[int], Awaitable[Dict[str, Any]]],
+        max_batch: int = 50,
+        unavailable_retry_seconds: float = 300
+    ):
+        self.name = name
+        self.bulk_endpoint = bulk_endpoint
+        self._fetch_bulk = fetch_bulk
+        self._fetch_one = fetch_one
+        self.max_batch = max_batch
+        self.unavailable_retry_seconds = unavailable_retry_seconds
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        self._tasks: set = set()
+        self._dispatch_scheduled = False
+        self._unavailable_until = 0.0
+        self._stats = {
+            "loads": 0,
+            "bulk_requests": 0,
+            "bulk_ids": 0,
+            "fallback_ids": 0,
+            "bulk_failures": 0
+        }
+    
+    def bulk_available(self) -> bool:
+        return time.time() >= self._unavailable_until
+    
+    async def load(self, entity_id: int) -> Dict[str, Any]:
+        self._stats["loads"] += 1
+        if not self.bulk_available():
+            self._stats["fallback_ids"] += 1
+            return await self._fetch_one(entity_id)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(entity_id, []).append(future)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            asyncio.get_running_loop().call_soon(self._dispatch)
+        return await future
+    
+    def _dispatch(self):
+        self._dispatch_scheduled = False
+        pending, self._pending = self._pending, {}
+        ids = list(pending)
+        for start in range(0, len(ids), self.max_batch):
+            chunk = {entity_id: pending[entity_id] for entity_id in ids[start:start + self.max_batch]}
+            task = asyncio.create_task(self._run_batch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, waiters: Dict[int, List[asyncio.Future]]):
+        # The batch serves several requests; don't run it under (and against
+        # the deadline of) whichever one happened to schedule the dispatch.
+        RequestContext.fork()
+        error: BaseException = Exception(f"Bulk {self.name} lookup was cancelled")
+        try:
+            await self._resolve_batch(waiters)
+        except Exception as e:
+            logger.error(f"Bulk {self.name} batch failed: {e}")
+            error = e
+        finally:
+            # Nobody may be left waiting on a future this batch owned.
+            for futures in waiters.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+    
+    async def _resolve_batch(self, waiters: Dict[int, List[asyncio.Future]]):
+        results: Dict[int, Any] = {}
+        if len(waiters) > 1:
+            try:
+                results = await self._load_bulk(list(waiters))
+            except Exception as e:
+                self._stats["bulk_failures"] += 1
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (404, 405):
+                    self._unavailable_until = time.time() + self.unavailable_retry_seconds
+                    logger.warning(f"Bulk {self.name} route unavailable, using per-ID lookups")
+                else:
+                    logger.warning(f"Bulk {self.name} lookup failed, using per-ID lookups: {e}")
+        
+        missing = [entity_id for entity_id in waiters if entity_id not in results]
+        if missing:
+            if len(waiters) > 1:
+                self._stats["fallback_ids"] += len(missing)
+            fetched = await asyncio.gather(
+                *(self._fetch_one(entity_id) for entity_id in missing),
+                return_exceptions=True
+            )
+            results.update(zip(missing, fetched))
+        
+        for entity_id, futures in waiters.items():
+            result = results[entity_id]
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
+    async def _load_bulk(self, ids: List[int]) -> Dict[int, Any]:
+        self._stats["bulk_requests"] += 1
+        self._stats["bulk_ids"] += len(ids)
+        data = await self._fetch_bulk(f"{self.bulk_endpoint}?ids={','.join(str(i) for i in ids)}")
+        items = data.get('data', []) if isinstance(data, dict) else data
+        return {item['id']: item for item in items or [] if isinstance(item, dict) and 'id' in item}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "bulk_available": self.bulk_available(),
+            "pending": len(self._pending),
+            "running_batches": len(self._tasks)
+        }
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Groups endpoints by route, e.g. agent/employees/7/availability?date=...
+    -> employees/{id}/availability, so one failing route doesn't take down
+    the others."""
+    path = endpoint.split("?", 1)[0].strip("/").removeprefix("agent/")
+    return "/".join("{id}" if segment.isdigit() else segment for segment in path.split("/"))
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    # Errors that say Laravel is unhealthy; a 404 or 422 means it answered fine.
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
 class CircuitBreaker:
-    def __init__(self, failure_threshold: int = 5, timeout_seconds: int = 60):
+    """Opens after `failure_threshold` consecutive upstream failures. Once
+    `timeout_seconds` have passed it goes HALF_OPEN and lets exactly one
+    probe through; everyone else is rejected until that probe resolves."""
+    
+    def __init__(self, name: str = "laravel", failure_threshold: int = 5, timeout_seconds: int = 60):
+        self.name = name
         self.failure_count = 0
         self.failure_threshold = failure_threshold
         self.timeout_seconds = timeout_seconds
-        self.last_failure_time: Optional[datetime] = None
+        self.opened_at: Optional[float] = None
         self.state = "CLOSED"
+        self._probe_in_flight = False
+        self._stats = {
+            "opened": 0,
+            "rejected": 0,
+            "probes": 0
+        }
     
-    def call_failed(self):
-        self.failure_count += 1
-        self.last_failure_time = datetime.now()
+    def _open(self):
+        self.state = "OPEN"
+        self.opened_at = time.monotonic()
+        self._stats["opened"] += 1
+    
+    def call_failed(self, probe: bool = False):
+        if probe:
+            self._probe_in_flight = False
+            self._open()
+            logger.warning(f"Circuit breaker {self.name} probe failed, OPEN again")
+            return
+        if self.state != "CLOSED":
+            return  # calls that started before the breaker opened
         
+        self.failure_count += 1
         if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
-            logger.warning(f"Circuit breaker OPEN after {self.failure_count} failures")
+            self._open()
+            logger.warning(f"Circuit breaker {self.name} OPEN after {self.failure_count} failures")
     
-    def call_succeeded(self):
+    def call_succeeded(self, probe: bool = False):
+        if probe:
+            self._probe_in_flight = False
+            self.state = "CLOSED"
+            logger.info(f"Circuit breaker {self.name} CLOSED - probe succeeded")
+        elif self.state != "CLOSED":
+            return  # only the probe decides when to close
         self.failure_count = 0
-        self.state = "CLOSED"
+    
+    def release_probe(self):
+        # The probe ended without telling us anything (cancelled, auth error...);
+        # stay HALF_OPEN so the next call probes instead.
+        if self._probe_in_flight:
+            self._probe_in_flight = False
     
     def can_attempt(self) -> bool:
         if self.state == "CLOSED":
             return True
         
         if self.state == "OPEN":
-            if self.last_failure_time and \
-               datetime.now() - self.last_failure_time > timedelta(seconds=self.timeout_seconds):
-                self.state = "HALF_OPEN"
-                logger.info("Circuit breaker HALF_OPEN - allowing test request")
-                return True
+            if time.monotonic() - self.opened_at < self.timeout_seconds:
+                self._stats["rejected"] += 1
+                return False
+            self.state = "HALF_OPEN"
+            logger.info(f"Circuit breaker {self.name} HALF_OPEN - allowing one probe")
+        
+        if self._probe_in_flight:
+            self._stats["rejected"] += 1
             return False
+        self._probe_in_flight = True
+        self._stats["probes"] += 1
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "probe_in_flight": self._probe_in_flight,
+            "open_for_seconds": round(time.monotonic() - self.opened_at, 1)
+                if self.state != "CLOSED" and self.opened_at is not None else None
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps concurrent Laravel requests with a limit that follows upstream latency.
+    
+    AIMD against a latency baseline: while responses come back within
+    `latency_tolerance` x the fastest recent round trip, the limit grows by
+    about one per round trip of requests; when latency climbs past that,
+    or requests time out or get a 5xx, it is cut by `backoff_ratio` (at
+    most once per round trip). Requests over the limit wait in FIFO order,
+    for up to `max_wait_seconds`.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        max_wait_seconds: float = 5.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._min_rtt: Optional[float] = None
+        self._smoothed_rtt: Optional[float] = None
+        self._last_decrease = 0.0
+        self._stats = {
+            "acquired": 0,
+            "queued": 0,
+            "queue_timeouts": 0,
+            "peak_queue": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "increases": 0,
+            "decreases": 0
+        }
+    
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+    
+    def _abandon(self, waiter: asyncio.Future):
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    async def acquire(self):
+        self._stats["acquired"] += 1
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
         
-        return True  # HALF_OPEN: allow one attempt
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        self._stats["peak_queue"] = max(self._stats["peak_queue"], len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait_seconds)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None, None)  # handed a slot just as we were cancelled
+            else:
+                self._abandon(waiter)
+            raise
+        finally:
+            waited_ms = (time.perf_counter() - started) * 1000
+            self._stats["wait_ms_total"] += waited_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited_ms)
+        
+        if not waiter.done():
+            self._abandon(waiter)
+            self._stats["queue_timeouts"] += 1
+            raise Exception(
+                f"Laravel concurrency limit ({int(self.limit)}) reached, "
+                f"gave up after waiting {self.max_wait_seconds}s"
+            )
+    
+    def release(self, rtt: Optional[float], ok: Optional[bool]):
+        """Frees the slot. `ok` is None when the request says nothing about
+        upstream health (e.g. it was cancelled)."""
+        self.in_flight -= 1
+        if ok is not None:
+            self._record(rtt, ok)
+        self._wake()
+    
+    def _record(self, rtt: float, ok: bool):
+        now = time.monotonic()
+        if ok:
+            # The baseline follows the fastest responses but creeps up, so a
+            # permanently slower upstream eventually becomes the new normal.
+            if self._min_rtt is None or rtt < self._min_rtt:
+                self._min_rtt = rtt
+            else:
+                self._min_rtt += (rtt - self._min_rtt) * 0.001
+            self._smoothed_rtt = rtt if self._smoothed_rtt is None else self._smoothed_rtt * 0.8 + rtt * 0.2
+        
+        congested = not ok or self._smoothed_rtt > self._min_rtt * self.latency_tolerance
+        if congested:
+            if self.limit > self.min_limit and now - self._last_decrease >= (self._smoothed_rtt or 0):
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                self._stats["decreases"] += 1
+        elif self.limit < self.max_limit and self.in_flight * 2 >= self.limit:
+            # Only grow while the limit is actually being used.
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._stats["increases"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        queued = self._stats["queued"]
+        return {
+            **self._stats,
+            "wait_ms_total": round(self._stats["wait_ms_total"], 1),
+            "wait_ms_max": round(self._stats["wait_ms_max"], 1),
+            "avg_wait_ms": round(self._stats["wait_ms_total"] / queued, 1) if queued else 0.0,
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_length": len(self._waiters),
+            "min_rtt_ms": round(self._min_rtt * 1000, 1) if self._min_rtt is not None else None,
+            "smoothed_rtt_ms": round(self._smoothed_rtt * 1000, 1) if self._smoothed_rtt is not None else None
+        }
+
+
+class RetryBudget:
+    """Caps retries and hedges at `ratio` of request traffic.
+    
+    Every request deposits `ratio` tokens and every retry or hedge spends
+    one. `min_per_second` tokens trickle in regardless, so a quiet service
+    can still retry the odd failure; during an incident the balance drains
+    and retries stop instead of multiplying the load.
+    """
+    
+    def __init__(self, ratio: float, min_per_second: float, max_balance: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self.balance = max_balance
+        self._refilled_at = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+    
+    def deposit(self):
+        self.balance = min(self.max_balance, self.balance + self.ratio)
+    
+    def try_spend(self) -> bool:
+        self._refill()
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "ratio": self.ratio,
+            "min_per_second": self.min_per_second,
+            "balance": round(self.balance, 2)
+        }
+
+
+class EndpointTraffic:
+    """Request, retry and hedge counts for one endpoint family, plus its
+    recent latencies for the hedge delay."""
+    
+    def __init__(self, window: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._p95: Optional[float] = None
+        self._since_p95 = 0
+        self.counts = {
+            "requests": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "hedges_denied": 0
+        }
+    
+    def record_latency(self, seconds: float):
+        self._latencies.append(seconds)
+        self._since_p95 += 1
+        if self._since_p95 >= 20:
+            self._p95 = None
+    
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+    
+    def p95(self) -> Optional[float]:
+        if self._p95 is None and self._latencies:
+            ordered = sorted(self._latencies)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_p95 = 0
+        return self._p95
+    
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            **self.counts,
+            "latency_samples": self.samples,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
 
 
 class JWTTokenManager:
-    def __init__(self):
+    """Holds the agent's Laravel JWT.
+
+    Reads are lock-free: get_valid_token() returns the current token while
+    it is valid, and a background task logs in again well before it
+    expires. Logins are single-flight, so at most one runs at a time no
+    matter how many requests find the token missing.
+    """
+    
+    def __init__(self, get_http_client: Callable[[], httpx.AsyncClient]):
+        self._get_http_client = get_http_client
         self.token: Optional[str] = None
         self.token_expiry: Optional[datetime] = None
-        self.refresh_token: Optional[str] = None
-        self._lock = asyncio.Lock()  # Prevent concurrent logins
+        self._token_obtained_at: Optional[datetime] = None
+        self._login_task: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._token_changed = asyncio.Event()
+        self._stats = {
+            "logins": 0,
+            "blocked_requests": 0,
+            "background_refreshes": 0,
+            "refresh_failures": 0,
+            "consecutive_failures": 0,
+            "last_login_at": None,
+            "last_login_ms": None,
+            "last_error": None
+        }
         
     def _decode_token_expiry(self, token: str) -> datetime:
         try:
@@ -75,94 +530,293 @@ class JWTTokenManager:
         return datetime.now() < (self.token_expiry - timedelta(minutes=5))
     
     async def get_valid_token(self) -> str:
-        async with self._lock:  
-            if self.is_token_valid():
-                return self.token
-            
-           
-            if self.refresh_token:
-                try:
-                    await self._refresh_token()
-                    if self.is_token_valid():
-                        return self.token
-                except Exception as e:
-                    logger.warning(f"Token refresh failed: {e}, will login again")
-            
-         
-            await self._login()
-            return self.token
+        token = self.token
+        if token is not None and self.is_token_valid():
+            return token
+        
+        # Only reached before the first login or when background refresh
+        # has fallen behind; every waiting request shares the one login.
+        self._stats["blocked_requests"] += 1
+        return await self.login()
+    
+    async def login(self) -> str:
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.ensure_future(self._login())
+        # Shield so a cancelled request doesn't abort the login others wait on.
+        await asyncio.shield(self._login_task)
+        return self.token
+    
+    def invalidate(self, token: Optional[str] = None):
+        # Drop the token after a 401, unless another request already replaced it.
+        if token is None or token == self.token:
+            self.token = None
+            self.token_expiry = None
     
     async def _login(self):
         logger.info("Logging in to Laravel API...")
+        started = time.perf_counter()
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{settings.laravel_api_base_url}login",
-                    json={
-                        "email": settings.laravel_agent_email,
-                        "password": settings.laravel_agent_password
-                    },
-                    timeout=10.0
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-              
-                if not self.token:
-                    set_cookie = response.headers.get('set-cookie', '')
-                    if 'auth_token=' in set_cookie:
-                       
-                        cookie_parts = set_cookie.split(';')
-                        for part in cookie_parts:
-                            if part.strip().startswith('auth_token='):
-                                self.token = part.strip().replace('auth_token=', '')
-                                logger.info("Token extracted from Set-Cookie header")
-                                break
-                    
-                    if not self.token:
-                        raise Exception("No token in login response or cookies")
-                
-                self.token_expiry = self._decode_token_expiry(self.token)
-                
-                logger.info(f"Login successful. Token valid until {self.token_expiry}")
-                
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Login failed with status {e.response.status_code}: {e.response.text}")
-                raise Exception(f"Authentication failed: {e.response.text}")
-            except Exception as e:
-                logger.error(f"Login error: {str(e)}")
-                raise
+        client = self._get_http_client()
+        try:
+            response = await client.post(
+                f"{settings.laravel_api_base_url}login",
+                json={
+                    "email": settings.laravel_agent_email,
+                    "password": settings.laravel_agent_password
+                },
+                timeout=10.0
+            )
+            
+            response.raise_for_status()
+            
+            # Laravel returns the JWT only as the auth_token cookie.
+            token = None
+            set_cookie = response.headers.get('set-cookie', '')
+            if 'auth_token=' in set_cookie:
+               
+                cookie_parts = set_cookie.split(';')
+                for part in cookie_parts:
+                    if part.strip().startswith('auth_token='):
+                        token = part.strip().replace('auth_token=', '')
+                        logger.info("Token extracted from Set-Cookie header")
+                        break
+            
+            if not token:
+                raise Exception("No token in login response or cookies")
+            
+            # The pooled client keeps a cookie jar; the agent authenticates with
+            # the bearer header only, so don't let the login cookie ride along.
+            client.cookies.clear()
+            self.token_expiry = self._decode_token_expiry(token)
+            self.token = token
+            self._token_obtained_at = datetime.now()
+            self._token_changed.set()
+            
+            self._stats["logins"] += 1
+            self._stats["consecutive_failures"] = 0
+            self._stats["last_login_at"] = datetime.now().isoformat()
+            self._stats["last_login_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"Login successful. Token valid until {self.token_expiry}")
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Login failed with status {e.response.status_code}: {e.response.text}")
+            self._stats["last_error"] = f"HTTP {e.response.status_code}"
+            raise Exception(f"Authentication failed: {e.response.text}")
+        except Exception as e:
+            logger.error(f"Login error: {str(e)}")
+            self._stats["last_error"] = str(e)
+            raise
     
-    async def _refresh_token(self):
-        logger.info("Refreshing JWT token...")
-        async with httpx.AsyncClient() as client:
+    def _seconds_until_refresh(self) -> Optional[float]:
+        if self.token is None or self.token_expiry is None:
+            return None
+        margin = timedelta(seconds=settings.jwt_refresh_margin_seconds)
+        if self._token_obtained_at is not None:
+            # Short-lived tokens: refresh at half-life rather than immediately.
+            margin = min(margin, (self.token_expiry - self._token_obtained_at) / 2)
+        refresh_at = self.token_expiry - margin
+        return (refresh_at - datetime.now()).total_seconds()
+    
+    async def _refresh_loop(self):
+        backoff = 5.0
+        while True:
+            self._token_changed.clear()
+            delay = self._seconds_until_refresh()
+            if delay is None or delay > 0:
+                try:
+                    # Wake early if a login elsewhere replaces the token.
+                    await asyncio.wait_for(self._token_changed.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            
             try:
-                response = await client.post(
-                    f"{settings.laravel_api_base_url}/auth/refresh",
-                    headers={"Authorization": f"Bearer {self.token}"},
-                    timeout=10.0
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                self.token = data.get('access_token') or data.get('token')
-                self.token_expiry = self._decode_token_expiry(self.token)
-                
-                logger.info(f"Token refreshed. Valid until {self.token_expiry}")
-                
+                await self.login()
+                self._stats["background_refreshes"] += 1
+                backoff = 5.0
             except Exception as e:
-                logger.warning(f"Token refresh failed: {str(e)}")
-                raise
+                self._stats["refresh_failures"] += 1
+                self._stats["consecutive_failures"] += 1
+                logger.warning(f"Background token refresh failed, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+    
+    def start_refresher(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop_refresher(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        next_refresh = self._seconds_until_refresh()
+        return {
+            **self._stats,
+            "refresher_running": self._refresh_task is not None and not self._refresh_task.done(),
+            "refresh_margin_seconds": settings.jwt_refresh_margin_seconds,
+            "next_refresh_in_seconds": round(max(next_refresh, 0), 1) if next_refresh is not None else None,
+            "login_in_progress": self._login_task is not None and not self._login_task.done()
+        }
 
 
 class LaravelAPIClient:
     def __init__(self):
         self.base_url = settings.laravel_api_base_url
-        self.token_manager = JWTTokenManager()
-        self.timeout = 10.0
-        self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout_seconds=60)
+        self.timeout = settings.laravel_http_timeout_seconds
+        self.token_manager = JWTTokenManager(self.get_http_client)
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.laravel_concurrency_initial,
+            min_limit=settings.laravel_concurrency_min,
+            max_limit=min(settings.laravel_concurrency_max, settings.laravel_http_max_connections),
+            latency_tolerance=settings.laravel_concurrency_latency_tolerance,
+            max_wait_seconds=settings.laravel_concurrency_max_wait_seconds
+        )
+        self.retry_budget = RetryBudget(
+            settings.laravel_retry_budget_ratio,
+            settings.laravel_retry_budget_min_per_second
+        )
+        self._traffic: Dict[str, EndpointTraffic] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._http2_enabled = False
+        self._in_flight = 0
+        self._pool_stats = {
+            "requests": 0,
+            # Requests sent while max_connections were already in flight. Only
+            # an estimate: with HTTP/2 they share a connection instead of
+            # waiting, and httpcore's own queue isn't visible from here.
+            "waits_estimate": 0,
+            "peak_in_flight": 0
+        }
+        self.policies = PushInvalidatedCachePolicies if settings.cache_push_invalidation else CachePolicies
+        # Bumped on every invalidation so fetches that started earlier
+        # don't write pre-change data back into the cache.
+        self._invalidation_epoch = 0
+        self._refresh_tasks: set = set()
+        self._revalidation_stats = {
+            "stale_served": 0,
+            "refresh_ahead": 0,
+            "background_refreshes": 0,
+            "refresh_failures": 0
+        }
+        self._loaders: Dict[str, BulkLoader] = {}
+        if settings.laravel_bulk_lookups:
+            self._loaders = {
+                "employees": BulkLoader(
+                    "employees", "agent/employees", self._get,
+                    lambda employee_id: self._get(f"agent/employees/{employee_id}"),
+                    max_batch=settings.laravel_bulk_max_ids
+                ),
+                "shifts": BulkLoader(
+                    "shifts", "agent/shifts", self._get,
+                    lambda shift_id: self._get(f"agent/shifts/{shift_id}"),
+                    max_batch=settings.laravel_bulk_max_ids
+                )
+            }
+    
+    def _build_http_client(self) -> httpx.AsyncClient:
+        http2 = settings.laravel_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("LARAVEL_HTTP2 is enabled but the 'h2' package is missing, falling back to HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.laravel_http_max_connections,
+            max_keepalive_connections=settings.laravel_http_max_keepalive_connections,
+            keepalive_expiry=settings.laravel_http_keepalive_expiry_seconds
+        )
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            uds=settings.laravel_uds_path or None,
+            limits=limits
+        )
+        self._http2_enabled = http2
+        
+        # httpx advertises and decodes gzip/deflate out of the box, and brotli
+        # as well when the 'brotli' extra is installed.
+        client = httpx.AsyncClient(transport=self._transport, timeout=self.timeout)
+        logger.info(
+            f"HTTP client ready (max_connections={limits.max_connections}, "
+            f"http2={http2}, uds={settings.laravel_uds_path or 'off'})"
+        )
+        return client
+    
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._build_http_client()
+        return self._http_client
+    
+    async def start(self):
+        self.get_http_client()
+        self.token_manager.start_refresher()
+    
+    async def warm_up(self, connections: int) -> int:
+        """Open `connections` keep-alive connections to Laravel ahead of the
+        first swap, using its unauthenticated /up health route."""
+        client = self.get_http_client()
+        url = httpx.URL(self.base_url).join("/up")
+        
+        async def ping():
+            response = await client.get(url, timeout=self.timeout)
+            return response.status_code
+        
+        results = await asyncio.gather(*(ping() for _ in range(max(connections, 1))), return_exceptions=True)
+        failures = [r for r in results if isinstance(r, Exception)]
+        if len(failures) == len(results):
+            raise failures[0]
+        return len(results) - len(failures)
+    
+    async def aclose(self):
+        await self.token_manager.stop_refresher()
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+            logger.info("HTTP client closed")
+        self._http_client = None
+        self._transport = None
+    
+    def _connection_counts(self) -> Optional[Dict[str, int]]:
+        # httpx has no public pool API; this reads httpcore internals, so any
+        # change there just turns the counts off instead of breaking /health.
+        pool = getattr(self._transport, "_pool", None)
+        if pool is None:
+            return None
+        try:
+            in_use = idle = 0
+            for connection in list(pool.connections):
+                if connection.is_idle():
+                    idle += 1
+                else:
+                    in_use += 1
+            waiting = sum(
+                1 for pool_request in list(getattr(pool, "_requests", []))
+                if getattr(pool_request, "connection", None) is None
+            )
+        except Exception as e:
+            logger.debug(f"Could not read httpcore pool state: {e}")
+            return None
+        return {"in_use": in_use, "idle": idle, "waiting": waiting}
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        counts = self._connection_counts()
+        
+        return {
+            "open": self._http_client is not None and not self._http_client.is_closed,
+            "http2": self._http2_enabled,
+            "uds": bool(settings.laravel_uds_path),
+            "max_connections": settings.laravel_http_max_connections,
+            "in_use": counts["in_use"] if counts else None,
+            "idle": counts["idle"] if counts else None,
+            "waiting": counts["waiting"] if counts else None,
+            "in_flight": self._in_flight,
+            **self._pool_stats
+        }
     
     async def _get_headers(self) -> Dict[str, str]:
         token = await self.token_manager.get_valid_token()
@@ -172,138 +826,419 @@ class LaravelAPIClient:
             "Accept": "application/json"
         }
     
-    async def _make_request(self, endpoint: str) -> Dict[str, Any]:
+    def _breaker_for(self, endpoint: str) -> CircuitBreaker:
+        family = endpoint_family(endpoint)
+        breaker = self.circuit_breakers.get(family)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                family,
+                failure_threshold=settings.laravel_breaker_failure_threshold,
+                timeout_seconds=settings.laravel_breaker_reset_seconds
+            )
+            self.circuit_breakers[family] = breaker
+        return breaker
+    
+    def _enter_breaker(self, endpoint: str):
+        breaker = self._breaker_for(endpoint)
+        if not breaker.can_attempt():
+            raise Exception(f"Circuit breaker OPEN for {breaker.name} - Laravel API unavailable after too many failures")
+        return breaker, breaker.state == "HALF_OPEN"
+    
+    def _record_outcome(self, breaker: CircuitBreaker, probe: bool, error: Optional[BaseException] = None):
+        if error is None or (isinstance(error, httpx.HTTPStatusError) and not is_upstream_failure(error)):
+            breaker.call_succeeded(probe)
+        elif is_upstream_failure(error):
+            breaker.call_failed(probe)
+    
+    async def _send(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         headers = await self._get_headers()
+        client = self.get_http_client()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        await self.limiter.acquire()
+        try:
+            timeout = RequestContext.bound_timeout(self.timeout, endpoint)
+        except Exception:
+            self.limiter.release(None, None)
+            raise
+        self._pool_stats["requests"] += 1
+        if self._in_flight >= settings.laravel_http_max_connections:
+            self._pool_stats["waits_estimate"] += 1
+        self._in_flight += 1
+        self._pool_stats["peak_in_flight"] = max(self._pool_stats["peak_in_flight"], self._in_flight)
+        started = time.perf_counter()
+        healthy: Optional[bool] = None
+        try:
+            response = await client.request(
+                method,
                 f"{self.base_url}{endpoint}",
                 headers=headers,
-                timeout=self.timeout
+                timeout=timeout,
+                **kwargs
             )
-            response.raise_for_status()
-            data = response.json()
+            healthy = response.status_code < 500 and response.status_code != 429
+        except httpx.TransportError:
+            healthy = False
+            raise
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - started
+            self.limiter.release(elapsed, healthy)
+        
+        if healthy:
+            self._traffic_for(endpoint).record_latency(elapsed)
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        if isinstance(data, dict) and 'payload' in data:
+            return data['payload']
+        return data
+    
+    async def _make_request(self, endpoint: str) -> Dict[str, Any]:
+        return await self._send("GET", endpoint)
+    
+    def _traffic_for(self, endpoint: str) -> EndpointTraffic:
+        family = endpoint_family(endpoint)
+        traffic = self._traffic.get(family)
+        if traffic is None:
+            traffic = self._traffic[family] = EndpointTraffic()
+        return traffic
+    
+    def _hedge_delay(self, traffic: EndpointTraffic) -> Optional[float]:
+        if not settings.laravel_hedging or traffic.samples < settings.laravel_hedge_min_samples:
+            return None
+        return max(traffic.p95(), settings.laravel_hedge_min_delay_ms / 1000)
+    
+    async def _hedged_request(self, endpoint: str, traffic: EndpointTraffic) -> Dict[str, Any]:
+        """GETs are idempotent: if the first request hasn't answered by the
+        endpoint's p95, send a second one and take whichever succeeds first."""
+        delay = self._hedge_delay(traffic)
+        if delay is None:
+            return await self._make_request(endpoint)
+        
+        primary = asyncio.ensure_future(self._make_request(endpoint))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            
+            # Hedging an overloaded upstream only adds to the pile.
+            if self.limiter.in_flight >= self.limiter.limit or not self.retry_budget.try_spend():
+                traffic.counts["hedges_denied"] += 1
+                return await primary
             
-            if isinstance(data, dict) and 'payload' in data:
-                return data['payload']
-            return data
+            traffic.counts["hedges"] += 1
+            hedge = asyncio.ensure_future(self._make_request(endpoint))
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            traffic.counts["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter, so clients that failed together don't retry together.
+        cap = min(settings.laravel_retry_backoff_max_seconds, settings.laravel_retry_backoff_base_seconds * 2 ** attempt)
+        return random.uniform(0, cap)
+    
+    async def _retry_allowed(self, traffic: EndpointTraffic, attempt: int, reason: str) -> bool:
+        if attempt >= 2:
+            return False
+        
+        wait_time = self._backoff(attempt)
+        remaining = RequestContext.time_remaining()
+        if remaining is not None and wait_time >= remaining:
+            logger.warning(f"{reason}, no time left before the request deadline - not retrying")
+            return False
+        
+        if not self.retry_budget.try_spend():
+            traffic.counts["retries_denied"] += 1
+            logger.warning(f"{reason}, retry budget exhausted - not retrying")
+            return False
+        
+        traffic.counts["retries"] += 1
+        logger.warning(f"{reason}, retrying in {wait_time:.2f}s...")
+        await asyncio.sleep(wait_time)
+        return True
     
     async def _get(self, endpoint: str) -> Dict[str, Any]:
-         
-        if not self.circuit_breaker.can_attempt():
-            raise Exception(f"Circuit breaker OPEN - Laravel API unavailable after too many failures")
+        breaker, probe = self._enter_breaker(endpoint)
+        traffic = self._traffic_for(endpoint)
+        traffic.counts["requests"] += 1
+        self.retry_budget.deposit()
         
         try:
             for attempt in range(3):
                 try:
-                    result = await self._make_request(endpoint)
-                    self.circuit_breaker.call_succeeded()
+                    result = await self._hedged_request(endpoint, traffic)
+                    self._record_outcome(breaker, probe)
                     return result
                     
                 except httpx.HTTPStatusError as e:
                     if e.response.status_code == 401 and attempt == 0:
                         logger.warning("Got 401, forcing re-login...")
-                        self.token_manager.token = None
+                        used = e.request.headers.get("Authorization", "").removeprefix("Bearer ")
+                        self.token_manager.invalidate(used or None)
                         continue
                     elif e.response.status_code >= 500:
-                        if attempt < 2:
-                            wait_time = (2 ** attempt)  # 1s, 2s
-                            logger.warning(f"Server error {e.response.status_code}, retrying in {wait_time}s...")
-                            await asyncio.sleep(wait_time)
+                        if await self._retry_allowed(traffic, attempt, f"Server error {e.response.status_code}"):
                             continue
                     raise
                     
                 except (httpx.ConnectError, httpx.TimeoutException) as e:
-                    if attempt < 2:
-                        wait_time = (2 ** attempt)
-                        logger.warning(f"Network error, retrying in {wait_time}s: {e}")
-                        await asyncio.sleep(wait_time)
+                    if await self._retry_allowed(traffic, attempt, f"Network error ({e})"):
                         continue
                     raise
             
             raise Exception(f"Failed to fetch {endpoint} after 3 attempts")
             
         except Exception as e:
-            self.circuit_breaker.call_failed()
+            self._record_outcome(breaker, probe, e)
             logger.error(f"API GET error for {endpoint}: {str(e)}")
             raise
+        finally:
+            if probe:
+                breaker.release_probe()
     
-    async def get_employee(self, employee_id: int) -> Dict[str, Any]:
-        """Fetch employee data with caching (10 min TTL)."""
+    async def post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        breaker, probe = self._enter_breaker(endpoint)
+        try:
+            result = await self._send("POST", endpoint, json=payload)
+            self._record_outcome(breaker, probe)
+            return result
+        except Exception as e:
+            self._record_outcome(breaker, probe, e)
+            raise
+        finally:
+            if probe:
+                breaker.release_probe()
+    
+    def get_upstream_stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limiter.get_stats(),
+            "retry_budget": self.retry_budget.get_stats(),
+            "hedging": settings.laravel_hedging,
+            "breakers": {
+                family: breaker.get_stats()
+                for family, breaker in sorted(self.circuit_breakers.items())
+            },
+            "endpoints": {
+                family: traffic.get_stats()
+                for family, traffic in sorted(self._traffic.items())
+            }
+        }
+    
+    @contextmanager
+    def lookup_batch(self):
+        batch = LookupBatch()
+        token = _lookup_batch.set(batch)
+        try:
+            yield batch
+        finally:
+            _lookup_batch.reset(token)
+    
+    async def _batched(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        batch = _lookup_batch.get()
+        if batch is None:
+            return await fetch()
+        
+        task = batch.tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_shared(fetch))
+            batch.tasks[key] = task
+        else:
+            batch.deduplicated += 1
+            logger.debug(f"{key} shared within batch")
+        
+        # Shield so one cancelled (or timed-out) swap doesn't cancel the lookup
+        # for the others; each swap still gives up at its own deadline.
+        return await RequestContext.within_deadline(asyncio.shield(task))
+    
+    @staticmethod
+    async def _run_shared(fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        # Like BulkLoader._run_batch: the lookup serves every swap in the
+        # batch, not just the one that happened to ask first.
+        RequestContext.fork()
+        return await fetch()
+    
+    async def _cached_get(
+        self,
+        cache_key: str,
+        endpoint: str,
+        policy: CachePolicy,
+        fetch: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
         cache = get_cache()
-        cache_key = CacheKeys.employee(employee_id)
         
-        # Check cache first
-        cached = await cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Employee {employee_id} from cache")
-            return cached
+        entry = await cache.get_entry(cache_key)
+        if entry is not None:
+            if entry.is_expired():
+                # Inside the grace window: answer now, refresh behind the caller.
+                self._revalidation_stats["stale_served"] += 1
+                logger.debug(f"{cache_key} served stale, revalidating")
+                self._schedule_refresh(cache_key, endpoint, policy, fetch)
+            elif policy.refresh_ahead and entry.hits >= policy.hot_hits and \
+                    entry.expires_at - time.time() < policy.refresh_ahead:
+                self._revalidation_stats["refresh_ahead"] += 1
+                self._schedule_refresh(cache_key, endpoint, policy, fetch)
+            else:
+                logger.debug(f"{cache_key} from cache")
+            return entry.value
         
-        logger.debug(f"Fetching employee {employee_id} from API")
-        result = await self._get(f"agent/employees/{employee_id}")
+        # Concurrent misses for the same key share one upstream fetch.
+        return await get_single_flight().do(
+            cache_key,
+            lambda: self._fetch_and_cache(cache_key, endpoint, policy, fetch)
+        )
+    
+    async def _fetch_and_cache(
+        self,
+        cache_key: str,
+        endpoint: str,
+        policy: CachePolicy,
+        fetch: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
+        logger.debug(f"Fetching {endpoint} from API")
+        epoch = self._invalidation_epoch
+        result = await (fetch() if fetch else self._get(endpoint))
         
-        # Cache for 10 minutes (employee data rarely changes)
-        await cache.set(cache_key, result, ttl=600)
+        if epoch != self._invalidation_epoch:
+            logger.debug(f"{cache_key} invalidated during fetch, not caching")
+            return result
+        
+        grace = policy.grace if settings.cache_stale_while_revalidate else 0
+        await get_cache().set(cache_key, result, ttl=policy.ttl, grace=grace)
         return result
     
-    async def get_employee_availability(self, employee_id: int, date: str) -> Dict[str, Any]:
-        """Fetch employee availability with caching (2 min TTL)."""
-        cache = get_cache()
-        cache_key = CacheKeys.availability(employee_id, date)
-        
-        cached = await cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Availability for {employee_id} on {date} from cache")
-            return cached
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        endpoint: str,
+        policy: CachePolicy,
+        fetch: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+    ):
+        single_flight = get_single_flight()
+        if single_flight.in_flight(cache_key):
+            return
         
-        logger.debug(f"Checking availability for employee {employee_id} on {date}")
-        result = await self._get(f"agent/employees/{employee_id}/availability?date={date}")
+        async def refresh():
+            # Outlives the request that triggered it: no deadline, no sink.
+            RequestContext.fork()
+            try:
+                await single_flight.do(
+                    cache_key,
+                    lambda: self._fetch_and_cache(cache_key, endpoint, policy, fetch)
+                )
+                self._revalidation_stats["background_refreshes"] += 1
+            except Exception as e:
+                self._revalidation_stats["refresh_failures"] += 1
+                logger.warning(f"Background refresh of {cache_key} failed: {e}")
         
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def invalidate(self, patterns: List[str]) -> int:
+        self._invalidation_epoch += 1
+        cache = get_cache()
+        removed = 0
+        for pattern in patterns:
+            removed += await cache.delete_pattern(pattern)
+        logger.info(f"Invalidated {removed} cache entries", extra={"patterns": patterns})
+        return removed
+    
+    def get_bulk_stats(self) -> Dict[str, Any]:
+        return {name: loader.get_stats() for name, loader in self._loaders.items()}
+    
+    def _loader_fetch(self, loader_name: str, entity_id: int) -> Optional[Callable[[], Awaitable[Dict[str, Any]]]]:
+        loader = self._loaders.get(loader_name)
+        if loader is None:
+            return None
+        return lambda: loader.load(entity_id)
+    
+    def get_revalidation_stats(self) -> Dict[str, Any]:
+        return {
+            **self._revalidation_stats,
+            "refreshing": len(self._refresh_tasks)
+        }
+    
+    async def get_employee(self, employee_id: int) -> Dict[str, Any]:
+        """Fetch employee data with caching (10 min TTL, hours with push invalidation)."""
+        cache_key = CacheKeys.employee(employee_id)
+        # Cache for 10 minutes (employee data rarely changes)
+        return await self._batched(
+            cache_key,
+            lambda: self._cached_get(
+                cache_key,
+                f"agent/employees/{employee_id}",
+                self.policies.EMPLOYEE,
+                self._loader_fetch("employees", employee_id)
+            )
+        )
+    
+    async def get_employee_availability(self, employee_id: int, date: str) -> Dict[str, Any]:
+        """Fetch employee availability with caching (2 min TTL, 1h with push invalidation)."""
+        cache_key = CacheKeys.availability(employee_id, date)
         # Cache for 2 minutes (availability can change)
-        await cache.set(cache_key, result, ttl=120)
-        return result
+        return await self._batched(
+            cache_key,
+            lambda: self._cached_get(
+                cache_key,
+                f"agent/employees/{employee_id}/availability?date={date}",
+                self.policies.AVAILABILITY
+            )
+        )
     
     async def get_fatigue_score(self, employee_id: int, date: str = None) -> Dict[str, Any]:
-        """Fetch fatigue score with caching (5 min TTL)."""
-        cache = get_cache()
+        """Fetch fatigue score with caching (5 min TTL, 2h with push invalidation)."""
         cache_key = CacheKeys.fatigue(employee_id)
-        
-        cached = await cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Fatigue score for {employee_id} from cache")
-            return cached
-        
-        logger.debug(f"Fetching fatigue score for employee {employee_id}")
-        result = await self._get(f"agent/fatigue-scores/{employee_id}")
-        
-        # Cache for 5 minutes
-        await cache.set(cache_key, result, ttl=300)
-        return result
+        return await self._batched(
+            cache_key,
+            lambda: self._cached_get(cache_key, f"agent/fatigue-scores/{employee_id}", self.policies.FATIGUE)
+        )
     
     async def get_shift(self, shift_id: int) -> Dict[str, Any]:
-        """Fetch shift data with caching (5 min TTL)."""
-        cache = get_cache()
+        """Fetch shift data with caching (5 min TTL, 3h with push invalidation)."""
         cache_key = CacheKeys.shift(shift_id)
-        
-        cached = await cache.get(cache_key)
-        if cached is not None:
-            logger.debug(f"Shift {shift_id} from cache")
-            return cached
-        
-        logger.debug(f"Fetching shift {shift_id}")
-        result = await self._get(f"agent/shifts/{shift_id}")
-        
-        # Cache for 5 minutes
-        await cache.set(cache_key, result, ttl=300)
-        return result
+        return await self._batched(
+            cache_key,
+            lambda: self._cached_get(
+                cache_key,
+                f"agent/shifts/{shift_id}",
+                self.policies.SHIFT,
+                self._loader_fetch("shifts", shift_id)
+            )
+        )
     
     async def get_shift_assignments(self, shift_id: int) -> Dict[str, Any]:
         logger.debug(f"Fetching assignments for shift {shift_id}")
-        return await self._get(f"agent/shifts/{shift_id}/assignments")
+        return await self._maybe_cached_get(
+            CacheKeys.shift_assignments(shift_id),
+            f"agent/shifts/{shift_id}/assignments",
+            self.policies.SHIFT_ASSIGNMENTS
+        )
     
     async def get_employee_shifts_stats(self, employee_id: int) -> Dict[str, Any]:
         logger.debug(f"Fetching shifts stats for employee {employee_id}")
-        return await self._get(f"agent/employees/{employee_id}/shifts")
+        return await self._maybe_cached_get(
+            CacheKeys.employee_shifts(employee_id),
+            f"agent/employees/{employee_id}/shifts",
+            self.policies.EMPLOYEE_SHIFTS
+        )
+    
+    async def _maybe_cached_get(self, cache_key: str, endpoint: str, policy: Optional[CachePolicy]) -> Dict[str, Any]:
+        if policy is None:
+            return await self._batched(cache_key, lambda: self._get(endpoint))
+        return await self._batched(cache_key, lambda: self._cached_get(cache_key, endpoint, policy))
 
 
 laravel_client = LaravelAPIClient()
\ No newline at end of file
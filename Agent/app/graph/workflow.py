@@ -1,3 +1,4 @@
+from typing import Dict, Optional
 from langgraph.graph import StateGraph, END
 from app.graph.state import SwapValidationState
 from app.graph.nodes import (
@@ -7,24 +8,76 @@ from app.graph.nodes import (
     check_staffing_node,
     check_compliance_node,
     make_decision_node,
+    run_checks_node,
     should_continue_after_availability,
     should_continue_after_fatigue
 )
+from app.graph.executor import (
+    DirectExecutor,
+    ShadowExecutor,
+    NodeFunction,
+    SEQUENTIAL_ROUTES,
+    PARALLEL_ROUTES
+)
+from app.utils.request_context import deadline_checked
+from app.config import get_settings
 import logging
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
-def create_validation_workflow() -> StateGraph:
+VALIDATION_NODES: Dict[str, NodeFunction] = {
+    "load_context": load_context_node,
+    "check_availability": check_availability_node,
+    "check_fatigue": check_fatigue_node,
+    "check_staffing": check_staffing_node,
+    "check_compliance": check_compliance_node,
+    "run_checks": run_checks_node,
+    "make_decision": make_decision_node
+}
+
+
+def with_deadline_checks(nodes: Dict[str, NodeFunction]) -> Dict[str, NodeFunction]:
+    return {name: deadline_checked(name)(node) for name, node in nodes.items()}
+
+
+def create_parallel_validation_workflow(nodes: Optional[Dict[str, NodeFunction]] = None) -> StateGraph:
+    logger.info("Building parallel validation workflow graph...")
+    nodes = with_deadline_checks({**VALIDATION_NODES, **(nodes or {})})
+
+    workflow = StateGraph(SwapValidationState)
+    workflow.add_node("load_context", nodes["load_context"])
+    workflow.add_node("run_checks", nodes["run_checks"])
+    workflow.add_node("make_decision", nodes["make_decision"])
+    workflow.set_entry_point("load_context")
+    workflow.add_edge("load_context", "run_checks")
+    workflow.add_edge("run_checks", "make_decision")
+    workflow.add_edge("make_decision", END)
+
+    logger.info("Workflow graph compiled successfully")
+    return workflow.compile()
+
+
+def create_validation_workflow(
+    parallel: Optional[bool] = None,
+    nodes: Optional[Dict[str, NodeFunction]] = None
+) -> StateGraph:
+    if parallel is None:
+        parallel = settings.validation_execution_mode == "parallel"
+    if parallel:
+        return create_parallel_validation_workflow(nodes)
+
     logger.info("Building validation workflow graph...")
+    nodes = with_deadline_checks({**VALIDATION_NODES, **(nodes or {})})
 
     workflow = StateGraph(SwapValidationState)
-    workflow.add_node("load_context", load_context_node)
-    workflow.add_node("check_availability", check_availability_node)
-    workflow.add_node("check_fatigue", check_fatigue_node)
-    workflow.add_node("check_staffing", check_staffing_node)
-    workflow.add_node("check_compliance", check_compliance_node)
-    workflow.add_node("make_decision", make_decision_node)
+    workflow.add_node("load_context", nodes["load_context"])
+    workflow.add_node("check_availability", nodes["check_availability"])
+    workflow.add_node("check_fatigue", nodes["check_fatigue"])
+    workflow.add_node("check_staffing", nodes["check_staffing"])
+    workflow.add_node("check_compliance", nodes["check_compliance"])
+    workflow.add_node("make_decision", nodes["make_decision"])
     workflow.set_entry_point("load_context")
     workflow.add_edge("load_context", "check_availability")
     workflow.add_conditional_edges(
@@ -46,9 +99,47 @@ def create_validation_workflow() -> StateGraph:
     workflow.add_edge("check_staffing", "check_compliance")
     workflow.add_edge("check_compliance", "make_decision")
     workflow.add_edge("make_decision", END)
-    
+
     logger.info("Workflow graph compiled successfully")
     return workflow.compile()
 
 
-validation_app = create_validation_workflow()
+def create_direct_executor(
+    parallel: Optional[bool] = None,
+    nodes: Optional[Dict[str, NodeFunction]] = None
+) -> DirectExecutor:
+    if parallel is None:
+        parallel = settings.validation_execution_mode == "parallel"
+    return DirectExecutor(
+        with_deadline_checks({**VALIDATION_NODES, **(nodes or {})}),
+        PARALLEL_ROUTES if parallel else SEQUENTIAL_ROUTES
+    )
+
+
+def create_validation_app():
+    """The executor main.py runs: LangGraph or the direct executor
+    (GRAPH_EXECUTOR), optionally shadowed by the other one
+    (GRAPH_SHADOW_SAMPLE_RATE)."""
+    executors = {
+        "langgraph": create_validation_workflow,
+        "direct": create_direct_executor
+    }
+    primary_name = settings.graph_executor if settings.graph_executor in executors else "langgraph"
+    primary = executors[primary_name]()
+    logger.info(f"Validation executor: {primary_name}")
+
+    if settings.graph_shadow_sample_rate <= 0:
+        return primary
+
+    shadow_name = "direct" if primary_name == "langgraph" else "langgraph"
+    logger.info(f"Shadowing {settings.graph_shadow_sample_rate:.0%} of validations on {shadow_name}")
+    return ShadowExecutor(
+        primary,
+        executors[shadow_name](),
+        settings.graph_shadow_sample_rate,
+        primary_name,
+        shadow_name
+    )
+
+
+validation_app = create_validation_app()
@@ -1,13 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.models import SwapValidationRequest, SwapValidationResponse
+from app.models import (
+    SwapValidationRequest,
+    SwapValidationResponse,
+    BulkSwapValidationResponse,
+    CacheInvalidationRequest,
+    ValidationCheckResult
+)
 from app.graph.tools import laravel_client
-from app.utils.request_context import RequestContext, get_logger
-from app.utils.cache import get_cache
+from app.graph.prefetch import prefetch_stats, release_prefetch
+from app.utils.request_context import RequestContext, DeadlineExceeded, get_logger
+from app.utils.cache import get_cache, get_single_flight, CacheKeys
+from app.utils.llm_cache import get_llm_cache
+from app.utils.startup import StartupTracker
+from app.utils.rate_limiter import openai_rate_limiter
+import asyncio
+import hmac
+import importlib
+import json
 import logging
+import sys
 import time
 from datetime import datetime
+from typing import List, Optional, Dict, Any, AsyncIterator
 
 settings = get_settings()
 
@@ -31,15 +48,92 @@ logging.basicConfig(level=settings.log_level)
 logger = get_logger(__name__)
 
 
+startup = StartupTracker(settings.startup_budget_ms)
+_warm_up_task: Optional[asyncio.Task] = None
+
+
+async def compile_graph():
+    # LangGraph, LangChain and OpenAI are only imported here, off the event loop.
+    await asyncio.to_thread(importlib.import_module, "app.graph.workflow")
+
+
+async def authenticate():
+    delay = 1.0
+    while True:
+        try:
+            await laravel_client.token_manager.get_valid_token()
+            logger.info("Pre-authentication successful")
+            return
+        except Exception as e:
+            logger.error(f"Pre-authentication failed: {e}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+
+async def warm_up(retry_delay: float = 1.0):
+    async def graph_phase():
+        async with startup.phase("graph"):
+            await compile_graph()
+    
+    async def network_phase():
+        if not startup.phase_ok("auth"):
+            async with startup.phase("auth"):
+                await authenticate()
+        async with startup.phase("connections"):
+            await laravel_client.warm_up(settings.startup_warm_connections)
+    
+    delay = retry_delay
+    while True:
+        # Only the phases that haven't succeeded yet, so /ready recovers
+        # once whatever failed comes back.
+        phases = []
+        if not startup.phase_ok("graph"):
+            phases.append(asyncio.create_task(graph_phase()))
+        if not startup.phase_ok("connections"):
+            phases.append(asyncio.create_task(network_phase()))
+        
+        try:
+            await asyncio.gather(*phases)
+            break
+        except Exception as e:
+            # Don't leave a sibling (e.g. the auth retry loop) running on its own.
+            for task in phases:
+                task.cancel()
+            await asyncio.gather(*phases, return_exceptions=True)
+            logger.error(f"Warm-up failed: {e}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+    startup.finish()
+
+
 @app.on_event("startup")
 async def startup_event():
+    global _warm_up_task
     logger.info("Starting SmartShift AI Agent...")
-    try:
-        await laravel_client.token_manager.get_valid_token()
-        logger.info("Pre-authentication successful")
-    except Exception as e:
-        logger.error(f"Pre-authentication failed: {e}")
-        logger.warning("Agent will attempt to login on first request")
+    await laravel_client.start()
+    get_cache().start_sweeper(settings.cache_sweep_interval_seconds)
+    get_llm_cache().load()
+    get_llm_cache().start_autosave(settings.llm_cache_save_interval_seconds)
+    # Serve /health right away; /ready flips once warm-up is done.
+    _warm_up_task = asyncio.create_task(warm_up())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down SmartShift AI Agent...")
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+    from app.graph.explanations import explanation_store
+    await explanation_store.shutdown()
+    # Only if a validation ever ran; don't build the graph just to shut it down.
+    workflow = sys.modules.get("app.graph.workflow")
+    if workflow is not None and hasattr(workflow.validation_app, "shutdown"):
+        await workflow.validation_app.shutdown()
+    await get_cache().stop_sweeper()
+    await get_cache().aclose()
+    await get_llm_cache().stop_autosave()
+    get_llm_cache().save()
+    await laravel_client.aclose()
 
 
 @app.get("/health")
@@ -55,7 +149,37 @@ async def health_check():
         "cache": {
             "hit_rate_percent": cache_stats["hit_rate_percent"],
             "size": cache_stats["size"]
-        }
+        },
+        "http_pool": laravel_client.get_pool_stats(),
+        "upstream": laravel_client.get_upstream_stats(),
+        "openai": openai_rate_limiter.get_stats()
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    status = {
+        **startup.get_status(),
+        "laravel_authenticated": laravel_client.token_manager.is_token_valid(),
+        "graph_loaded": hasattr(sys.modules.get("app.graph.workflow"), "validation_app")
+    }
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
+@app.get("/api/graph/stats")
+async def graph_stats():
+    from app.graph.executor import ShadowExecutor
+    from app.graph.nodes import fatigue_batcher, offline_explanations
+    from app.graph.workflow import validation_app
+    
+    return {
+        "executor": settings.graph_executor,
+        "execution_mode": settings.validation_execution_mode,
+        "shadow": validation_app.get_stats() if isinstance(validation_app, ShadowExecutor) else None,
+        "llm_batching": {"fatigue": fatigue_batcher.get_stats()} if settings.llm_batch_fatigue else None,
+        "offline_llm": offline_explanations.get_stats() if settings.offline_llm_enabled else None
     }
 
 
@@ -66,14 +190,15 @@ async def auth_status():
     return {
         "authenticated": token_valid,
         "token_expiry": laravel_client.token_manager.token_expiry.isoformat() if laravel_client.token_manager.token_expiry else None,
-        "time_until_expiry": str(laravel_client.token_manager.token_expiry - datetime.now()) if laravel_client.token_manager.token_expiry else None
+        "time_until_expiry": str(laravel_client.token_manager.token_expiry - datetime.now()) if laravel_client.token_manager.token_expiry else None,
+        "refresh": laravel_client.token_manager.get_stats()
     }
 
 
 @app.post("/api/auth/refresh")
 async def force_refresh():
     try:
-        await laravel_client.token_manager._login()
+        await laravel_client.token_manager.login()
         return {
             "status": "success",
             "token_expiry": laravel_client.token_manager.token_expiry.isoformat()
@@ -91,7 +216,47 @@ async def cache_stats():
         "hit_rate_percent": stats["hit_rate_percent"],
         "size": stats["size"],
         "max_size": stats["max_size"],
-        "evictions": stats["evictions"]
+        "evictions": stats["evictions"],
+        "expiry": stats["expiry"],
+        "memory": stats["memory"],
+        "stale_hits": stats["stale_hits"],
+        "single_flight": get_single_flight().get_stats(),
+        "revalidation": laravel_client.get_revalidation_stats(),
+        "bulk_lookups": laravel_client.get_bulk_stats(),
+        "tiers": stats.get("tiers"),
+        "llm": get_llm_cache().get_stats(),
+        "prefetch": prefetch_stats.get_stats()
+    }
+
+
+@app.post("/api/cache/invalidate")
+async def invalidate_cache(
+    request: CacheInvalidationRequest,
+    x_agent_token: Optional[str] = Header(default=None)
+):
+    if not settings.agent_api_token:
+        raise HTTPException(status_code=503, detail="Cache invalidation is not configured")
+    if not x_agent_token or not hmac.compare_digest(x_agent_token, settings.agent_api_token):
+        raise HTTPException(status_code=401, detail="Invalid agent token")
+    
+    patterns = list(request.keys) + list(request.patterns)
+    for event in request.events:
+        try:
+            patterns.extend(CacheKeys.for_entity(
+                event.entity,
+                entity_id=event.id,
+                employee_id=event.employee_id,
+                shift_id=event.shift_id,
+                date=event.date
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    
+    removed = await laravel_client.invalidate(patterns)
+    return {
+        "status": "invalidated",
+        "removed": removed,
+        "patterns": patterns
     }
 
 
@@ -101,106 +266,350 @@ async def clear_cache():
     return {"status": "cleared"}
 
 
-@app.post("/api/validate-swap", response_model=SwapValidationResponse)
-async def validate_swap(request: SwapValidationRequest):
+def build_initial_state(request: SwapValidationRequest) -> Dict[str, Any]:
+    return {
+        "swap_id": request.swap_id,
+        "requester_id": request.requester_id,
+        "requester_shift_id": request.requester_shift_id,
+        "target_employee_id": request.target_employee_id,
+        "target_shift_id": request.target_shift_id,
+        "swap_reason": request.swap_reason,
+        # Initialize optional fields
+        "requester_data": None,
+        "target_data": None,
+        "requester_shift_data": None,
+        "target_shift_data": None,
+        "prefetched": None,
+        "availability_check": None,
+        "fatigue_check": None,
+        "staffing_check": None,
+        "compliance_check": None,
+        "decision": None,
+        "confidence": None,
+        "reasoning": None,
+        "explanation_status": None,
+        "risk_factors": [],
+        "all_checks": [],
+        "suggestions": [],
+        "error": None
+    }
+
+
+STREAM_CHECK_KEYS = {
+    "check_availability": "availability_check",
+    "check_fatigue": "fatigue_check",
+    "check_staffing": "staffing_check",
+    "check_compliance": "compliance_check"
+}
+
+
+def build_response(
+    request: SwapValidationRequest,
+    final_state: Dict[str, Any],
+    start_time: float,
+    correlation_id: str
+) -> SwapValidationResponse:
+    processing_time = int((time.time() - start_time) * 1000)
+    
+    ctx = RequestContext.get()
+    node_timings = ctx.get("node_timings", {})
+    
+    checks = []
+    for check in final_state.get("all_checks", []):
+        checks.append(ValidationCheckResult(
+            check_name=check.check_name,
+            passed=check.passed,
+            severity=check.severity,
+            message=check.message,
+            details=check.details
+        ))
+    
+    validation_passed = final_state.get("decision") != "auto_reject"
+    
+    response = SwapValidationResponse(
+        swap_id=request.swap_id,
+        decision=final_state.get("decision", "requires_review"),
+        confidence=final_state.get("confidence", 0.0),
+        reasoning=final_state.get("reasoning", "Validation completed"),
+        validation_passed=validation_passed,
+        checks=checks,
+        risk_factors=final_state.get("risk_factors", []),
+        suggestions=final_state.get("suggestions", []),
+        processing_time_ms=processing_time,
+        correlation_id=correlation_id,
+        explanation_status=final_state.get("explanation_status")
+    )
+    
+    logger.info(
+        f"Validation complete: {response.decision}",
+        extra={
+            "decision": response.decision,
+            "confidence": response.confidence,
+            "processing_time_ms": processing_time,
+            "node_timings": node_timings
+        }
+    )
+    return response
+
+
+def build_error_response(request: SwapValidationRequest, error: Exception, start_time: float) -> SwapValidationResponse:
+    processing_time = int((time.time() - start_time) * 1000)
+    return SwapValidationResponse(
+        swap_id=request.swap_id,
+        decision="requires_review",
+        confidence=0.0,
+        reasoning=f"Validation workflow encountered an error: {str(error)}",
+        validation_passed=False,
+        checks=[],
+        risk_factors=["System error - manual review required"],
+        suggestions=["Please try again or contact support"],
+        processing_time_ms=processing_time
+    )
+
+
+def build_deadline_response(
+    request: SwapValidationRequest,
+    partial_state: Dict[str, Any],
+    start_time: float,
+    correlation_id: str
+) -> SwapValidationResponse:
+    processing_time = int((time.time() - start_time) * 1000)
+    
+    completed = [partial_state[key] for key in STREAM_CHECK_KEYS.values() if partial_state.get(key) is not None]
+    unfinished = [key.removesuffix("_check") for key in STREAM_CHECK_KEYS.values() if partial_state.get(key) is None]
+    
+    logger.warning(
+        f"Validation deadline reached with {len(completed)} checks finished",
+        extra={"processing_time_ms": processing_time, "unfinished_checks": unfinished}
+    )
+    return SwapValidationResponse(
+        swap_id=request.swap_id,
+        decision="requires_review",
+        confidence=0.0,
+        reasoning=(
+            "Validation did not finish within its time budget. "
+            + (f"Unfinished checks: {', '.join(unfinished)}." if unfinished else "No decision was reached.")
+        ),
+        validation_passed=False,
+        checks=[ValidationCheckResult(**check.to_dict()) for check in completed],
+        risk_factors=["Validation deadline exceeded - manual review required"]
+            + [check.message for check in completed if not check.passed],
+        suggestions=["Review the unfinished checks manually"],
+        processing_time_ms=processing_time,
+        correlation_id=correlation_id
+    )
+
+
+def resolve_deadline(deadline_ms: Optional[float]) -> Optional[float]:
+    """Monotonic deadline for a validation: the caller's X-Request-Deadline-Ms
+    when sent, otherwise VALIDATION_DEADLINE_SECONDS (0 disables it)."""
+    budget = deadline_ms / 1000 if deadline_ms else settings.validation_deadline_seconds
+    if budget <= 0:
+        return None
+    return time.monotonic() + budget
+
+
+def graph_time_limit() -> Optional[float]:
+    # Stop the graph early enough to still answer within the deadline.
+    remaining = RequestContext.time_remaining()
+    if remaining is None:
+        return None
+    return max(remaining - settings.validation_deadline_reserve_ms / 1000, 0)
+
+
+async def run_graph(validation_app, state: Dict[str, Any]):
+    # Merge node updates as they arrive, so a deadline cut still leaves the
+    # checks that finished in `state`.
+    try:
+        async for update in validation_app.astream(state, stream_mode="updates"):
+            for node_update in update.values():
+                if node_update:
+                    state.update(node_update)
+    finally:
+        release_prefetch(state)
+
+
+async def run_validation(request: SwapValidationRequest, deadline: Optional[float] = None) -> SwapValidationResponse:
     from app.graph.workflow import validation_app
-    from app.models import ValidationCheckResult
     
     start_time = time.time()
     
     correlation_id = RequestContext.new(
         swap_id=request.swap_id,
-        extra={"requester_id": request.requester_id, "target_id": request.target_employee_id}
+        extra={"requester_id": request.requester_id, "target_id": request.target_employee_id},
+        deadline=deadline if deadline is not None else resolve_deadline(None)
     )
+    final_state = build_initial_state(request)
     
     try:
         logger.info(f"Validating swap {request.swap_id}", extra={"correlation_id": correlation_id})
         
-        initial_state = {
-            "swap_id": request.swap_id,
-            "requester_id": request.requester_id,
-            "requester_shift_id": request.requester_shift_id,
-            "target_employee_id": request.target_employee_id,
-            "target_shift_id": request.target_shift_id,
-            "swap_reason": request.swap_reason,
-            # Initialize optional fields
-            "requester_data": None,
-            "target_data": None,
-            "requester_shift_data": None,
-            "target_shift_data": None,
-            "availability_check": None,
-            "fatigue_check": None,
-            "staffing_check": None,
-            "compliance_check": None,
-            "decision": None,
-            "confidence": None,
-            "reasoning": None,
-            "risk_factors": [],
-            "all_checks": [],
-            "suggestions": [],
-            "error": None
-        }
-        
         logger.info("Starting validation workflow...")
-        final_state = await validation_app.ainvoke(initial_state)
+        await asyncio.wait_for(run_graph(validation_app, final_state), timeout=graph_time_limit())
         
-        processing_time = int((time.time() - start_time) * 1000)
+        return build_response(request, final_state, start_time, correlation_id)
         
-        ctx = RequestContext.get()
-        node_timings = ctx.get("node_timings", {})
-        
-        checks = []
-        for check in final_state.get("all_checks", []):
-            checks.append(ValidationCheckResult(
-                check_name=check.get("check_name", "unknown"),
-                passed=check.get("passed", False),
-                severity=check.get("severity", "hard"),
-                message=check.get("message", ""),
-                details=check.get("details")
-            ))
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        return build_deadline_response(request, final_state, start_time, correlation_id)
+    except Exception as e:
+        logger.error(f"Validation failed: {str(e)}", exc_info=True)
         
-        validation_passed = final_state.get("decision") != "auto_reject"
         
-        response = SwapValidationResponse(
+        return build_error_response(request, e, start_time)
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_validation_events(request: SwapValidationRequest, deadline: Optional[float] = None) -> AsyncIterator[str]:
+    from app.graph.workflow import validation_app
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        start_time = time.time()
+        correlation_id = RequestContext.new(
             swap_id=request.swap_id,
-            decision=final_state.get("decision", "requires_review"),
-            confidence=final_state.get("confidence", 0.0),
-            reasoning=final_state.get("reasoning", "Validation completed"),
-            validation_passed=validation_passed,
-            checks=checks,
-            risk_factors=final_state.get("risk_factors", []),
-            suggestions=final_state.get("suggestions", []),
-            processing_time_ms=processing_time,
-            correlation_id=correlation_id
+            extra={"requester_id": request.requester_id, "target_id": request.target_employee_id},
+            deadline=deadline
         )
+        # make_decision_node streams its explanation through this sink.
+        RequestContext.set_event_sink(lambda event, data: queue.put_nowait(format_sse(event, data)))
+        queue.put_nowait(format_sse("started", {"swap_id": request.swap_id, "correlation_id": correlation_id}))
+        final_state = build_initial_state(request)
         
-        logger.info(
-            f"Validation complete: {response.decision}",
-            extra={
-                "decision": response.decision,
-                "confidence": response.confidence,
-                "processing_time_ms": processing_time,
-                "node_timings": node_timings
-            }
-        )
-        return response
-        
-    except Exception as e:
-        logger.error(f"Validation failed: {str(e)}", exc_info=True)
-        
+        async def stream_graph():
+            try:
+                async for update in validation_app.astream(final_state, stream_mode="updates"):
+                    for node_name, node_update in update.items():
+                        node_update = node_update or {}
+                        final_state.update(node_update)
+                    
+                        event = {"node": node_name, "elapsed_ms": round(RequestContext.get_elapsed_ms(), 1)}
+                        if node_name in STREAM_CHECK_KEYS:
+                            check = node_update.get(STREAM_CHECK_KEYS[node_name])
+                            event["check"] = check.to_dict() if check is not None else None
+                        elif node_update.get("error"):
+                            event["error"] = node_update["error"]
+                        queue.put_nowait(format_sse("node", event))
+            finally:
+                release_prefetch(final_state)
         
-        processing_time = int((time.time() - start_time) * 1000)
-        return SwapValidationResponse(
-            swap_id=request.swap_id,
-            decision="requires_review",
-            confidence=0.0,
-            reasoning=f"Validation workflow encountered an error: {str(e)}",
-            validation_passed=False,
-            checks=[],
-            risk_factors=["System error - manual review required"],
-            suggestions=["Please try again or contact support"],
-            processing_time_ms=processing_time
+        try:
+            try:
+                await asyncio.wait_for(stream_graph(), timeout=graph_time_limit())
+                response = build_response(request, final_state, start_time, correlation_id)
+            except (asyncio.TimeoutError, DeadlineExceeded):
+                response = build_deadline_response(request, final_state, start_time, correlation_id)
+            except Exception as e:
+                logger.error(f"Streaming validation failed: {str(e)}", exc_info=True)
+                queue.put_nowait(format_sse("error", {"message": str(e)}))
+                response = build_error_response(request, e, start_time)
+            
+            queue.put_nowait(format_sse("result", response.model_dump()))
+        finally:
+            # Even if building the response fails, the stream has to end.
+            queue.put_nowait(None)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            yield message
+    finally:
+        # The client may disconnect mid-stream; don't leave the graph running.
+        if not producer.done():
+            producer.cancel()
+
+
+@app.get("/api/validate-swap/stream")
+async def validate_swap_stream_get(
+    request: SwapValidationRequest = Depends(),
+    x_request_deadline_ms: Optional[float] = Header(default=None)
+):
+    return StreamingResponse(
+        stream_validation_events(request, resolve_deadline(x_request_deadline_ms)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/validate-swap/stream")
+async def validate_swap_stream(
+    request: SwapValidationRequest,
+    x_request_deadline_ms: Optional[float] = Header(default=None)
+):
+    return StreamingResponse(
+        stream_validation_events(request, resolve_deadline(x_request_deadline_ms)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/explanations/{correlation_id}")
+async def get_explanation(correlation_id: str):
+    from app.graph.explanations import explanation_store
+    
+    explanation = explanation_store.get(correlation_id)
+    if explanation is None:
+        raise HTTPException(status_code=404, detail="No explanation for this correlation id")
+    return explanation
+
+
+@app.post("/api/validate-swap", response_model=SwapValidationResponse)
+async def validate_swap(
+    request: SwapValidationRequest,
+    x_request_deadline_ms: Optional[float] = Header(default=None)
+):
+    return await run_validation(request, resolve_deadline(x_request_deadline_ms))
+
+
+@app.post("/api/validate-swaps", response_model=BulkSwapValidationResponse)
+async def validate_swaps(
+    requests: List[SwapValidationRequest],
+    x_request_deadline_ms: Optional[float] = Header(default=None)
+):
+    if len(requests) > settings.bulk_validation_max_swaps:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.bulk_validation_max_swaps} swaps can be validated per batch"
         )
+    
+    start_time = time.time()
+    semaphore = asyncio.Semaphore(settings.bulk_validation_concurrency)
+    # A caller's deadline covers the whole batch; otherwise each swap gets
+    # the configured budget once it starts.
+    batch_deadline = resolve_deadline(x_request_deadline_ms) if x_request_deadline_ms else None
+    
+    async def run_limited(request: SwapValidationRequest) -> SwapValidationResponse:
+        async with semaphore:
+            return await run_validation(request, batch_deadline)
+    
+    # Every swap in the batch shares one lookup table, so an employee or shift
+    # referenced by several swaps is fetched from Laravel once.
+    with laravel_client.lookup_batch() as batch:
+        results = await asyncio.gather(*(run_limited(request) for request in requests))
+    
+    processing_time = int((time.time() - start_time) * 1000)
+    logger.info(
+        f"Bulk validation complete: {len(results)} swaps",
+        extra={
+            "upstream_lookups": batch.unique_lookups,
+            "deduplicated_lookups": batch.deduplicated,
+            "processing_time_ms": processing_time
+        }
+    )
+    
+    return BulkSwapValidationResponse(
+        results=results,
+        total=len(results),
+        upstream_lookups=batch.unique_lookups,
+        deduplicated_lookups=batch.deduplicated,
+        processing_time_ms=processing_time
+    )
 
 
 if __name__ == "__main__":
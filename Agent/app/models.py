@@ -30,4 +30,30 @@ class SwapValidationResponse(BaseModel):
     suggestions: List[Any]  
     processing_time_ms: int
     correlation_id: Optional[str] = None  
+    # "pending" when the LLM explanation is generated after the response
+    explanation_status: Optional[str] = None
 
+
+
+
+class BulkSwapValidationResponse(BaseModel):
+    results: List[SwapValidationResponse]
+    total: int
+    upstream_lookups: int
+    deduplicated_lookups: int
+    processing_time_ms: int
+
+
+
+class CacheInvalidationEvent(BaseModel):
+    entity: str  # employee | shift | assignment | availability | fatigue
+    id: Optional[int] = None
+    employee_id: Optional[int] = None
+    shift_id: Optional[int] = None
+    date: Optional[str] = None
+
+
+class CacheInvalidationRequest(BaseModel):
+    events: List[CacheInvalidationEvent] = []
+    keys: List[str] = []
+    patterns: List[str] = []
@@ -1,102 +1,385 @@
 import asyncio
+import fnmatch
+import heapq
+import json
+import itertools
 import time
 import logging
-from typing import Optional, Dict, Any, Callable, TypeVar
+import sys
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple, TypeVar
+from abc import ABC, abstractmethod
 from functools import wraps
 from dataclasses import dataclass
 from collections import OrderedDict
 
+from app.utils.request_context import RequestContext
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
+def _debug_enabled() -> bool:
+    # Hits are sub-microsecond; don't build log strings nobody will see.
+    return logger.isEnabledFor(logging.DEBUG)
+
+
 @dataclass
 class CacheEntry:
     value: Any
     created_at: float
     ttl_seconds: float
     hits: int = 0
+    grace_seconds: float = 0
+    size_bytes: int = 0
     
     def is_expired(self) -> bool:
        
-        return time.time() > (self.created_at + self.ttl_seconds)
+        return time.time() > self.expires_at
+    
+    def is_past_grace(self) -> bool:
+        return time.time() > self.stale_until
+    
+    @property
+    def expires_at(self) -> float:
+        return self.created_at + self.ttl_seconds
+    
+    @property
+    def stale_until(self) -> float:
+        # Past expires_at but before stale_until, the entry may be served stale.
+        return self.expires_at + self.grace_seconds
     
     def age_seconds(self) -> float:
         return time.time() - self.created_at
 
 
-class InMemoryCache:
-    def __init__(self, max_size: int = 1000, default_ttl: float = 300):
+# Rough per-entry bookkeeping: the CacheEntry, its OrderedDict slot and heap item.
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size of a JSON-like value (dicts, lists, scalars)."""
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
+
+
+def key_namespace(key: str) -> str:
+    return key.split(":", 1)[0] + ":"
+
+
+def _has_wildcard(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
+class CacheBackend(ABC):
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+    
+    @abstractmethod
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        ...
+    
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, grace: float = 0):
+        ...
+    
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        ...
+    
+    @abstractmethod
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete every key matching a glob pattern such as 'availability:12:*'."""
+        ...
+    
+    @abstractmethod
+    async def clear(self):
+        ...
+    
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        ...
+    
+    def start_sweeper(self, interval_seconds: float):
+        pass
+    
+    async def stop_sweeper(self):
+        pass
+    
+    async def aclose(self):
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """LRU + TTL cache.
+
+    Every operation is synchronous, so a hit never yields to the event loop
+    and no operation can interleave with another: the cache is only used
+    from the event loop thread, so it needs no locks (or shards). Entries
+    are kept in access order, so the LRU victim is always the first one.
+
+    Expiry times are indexed in a min-heap of (stale_until, seq, key), so a
+    sweep only touches entries that have actually expired. The heap holds
+    keys rather than entries, so it never keeps an evicted value alive;
+    an item whose key was overwritten, deleted or evicted is skipped when
+    it surfaces, by checking the live entry's own stale_until.
+
+    With max_bytes set, each value's size is estimated when it is stored and
+    LRU entries are evicted until the new one fits the byte budget, on top
+    of the max_size entry cap.
+    """
+    
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: float = 300,
+        max_bytes: Optional[int] = None
+    ):
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._lock = asyncio.Lock()
         self._max_size = max_size
+        self._max_bytes = max_bytes
         self._default_ttl = default_ttl
         self._stats = {
             "hits": 0,
             "misses": 0,
-            "evictions": 0
+            "evictions": 0,
+            "stale_hits": 0
+        }
+        self._bytes_used = 0
+        self._bytes_by_namespace: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._expiry_seq = itertools.count()
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._sweep_stats = {
+            "sweeps": 0,
+            "expired_reclaimed": 0,
+            "last_sweep_ms": 0.0,
+            "max_sweep_ms": 0.0
         }
     
-    async def get(self, key: str) -> Optional[Any]:
-        async with self._lock:
-            entry = self._cache.get(key)
-            
-            if entry is None:
-                self._stats["misses"] += 1
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    def _account(self, key: str, entry: Optional[CacheEntry], sign: int):
+        if entry is None:
+            return
+        namespace = key_namespace(key)
+        self._bytes_used += sign * entry.size_bytes
+        remaining = self._bytes_by_namespace.get(namespace, 0) + sign * entry.size_bytes
+        if remaining > 0:
+            self._bytes_by_namespace[namespace] = remaining
+        else:
+            self._bytes_by_namespace.pop(namespace, None)
+    
+    def _lookup(self, key: str, allow_stale: bool) -> Optional[CacheEntry]:
+        entry = self._cache.get(key)
+        
+        if entry is None:
+            self._stats["misses"] += 1
+            if _debug_enabled():
                 logger.debug(f"Cache MISS: {key}")
-                return None
-            
-            if entry.is_expired():
+            return None
+        
+        if entry.is_expired():
+            if entry.is_past_grace():
                 del self._cache[key]
+                self._account(key, entry, -1)
                 self._stats["misses"] += 1
-                logger.debug(f"Cache EXPIRED: {key}")
+                if _debug_enabled():
+                    logger.debug(f"Cache EXPIRED: {key}")
                 return None
-            self._cache.move_to_end(key)
-            entry.hits += 1
-            self._stats["hits"] += 1
-            
+            if not allow_stale:
+                self._stats["misses"] += 1
+                return None
+            self._stats["stale_hits"] += 1
+        
+        self._cache.move_to_end(key)
+        entry.hits += 1
+        self._stats["hits"] += 1
+        
+        if _debug_enabled():
             logger.debug(f"Cache HIT: {key} (age: {entry.age_seconds():.1f}s)")
-            return entry.value
+        return entry
+    
+    def get_nowait(self, key: str) -> Optional[Any]:
+        entry = self._lookup(key, allow_stale=False)
+        return entry.value if entry is not None else None
     
-    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
-        async with self._lock:
+    def get_entry_nowait(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry even if it is stale but still inside its grace window."""
+        return self._lookup(key, allow_stale=True)
+    
+    def set_nowait(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        grace: float = 0,
+        created_at: Optional[float] = None,
+        hits: int = 0
+    ) -> Optional[CacheEntry]:
+        size_bytes = 0
+        if self._max_bytes is not None:
+            size_bytes = estimate_size(value) + sys.getsizeof(key) + ENTRY_OVERHEAD_BYTES
+            if size_bytes > self._max_bytes:
+                logger.warning(f"Cache SKIP: {key} ({size_bytes} bytes exceeds the whole budget)")
+                self.delete_nowait(key)
+                return None
+        
+        if key not in self._cache:
             while len(self._cache) >= self._max_size:
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
-                self._stats["evictions"] += 1
-                logger.debug(f"Cache EVICT: {oldest_key}")
-            
-            self._cache[key] = CacheEntry(
-                value=value,
-                created_at=time.time(),
-                ttl_seconds=ttl or self._default_ttl
-            )
+                if not self._evict_lru():
+                    break
+        if self._max_bytes is not None:
+            replaced = self._cache.get(key)
+            freed = replaced.size_bytes if replaced is not None else 0
+            while self._bytes_used - freed + size_bytes > self._max_bytes:
+                if not self._evict_lru(exclude=key):
+                    break
+        
+        entry = CacheEntry(
+            value=value,
+            created_at=created_at or time.time(),
+            ttl_seconds=ttl or self._default_ttl,
+            hits=hits,
+            grace_seconds=grace,
+            size_bytes=size_bytes
+        )
+        self._account(key, self._cache.pop(key, None), -1)
+        self._cache[key] = entry
+        self._account(key, entry, +1)
+        heapq.heappush(self._expiry_heap, (entry.stale_until, next(self._expiry_seq), key))
+        if _debug_enabled():
             logger.debug(f"Cache SET: {key} (ttl: {ttl or self._default_ttl}s)")
+        return entry
     
-    async def delete(self, key: str) -> bool:
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
+    def _evict_lru(self, exclude: Optional[str] = None) -> bool:
+        for oldest_key in self._cache:
+            if oldest_key != exclude:
+                break  # the key being replaced is skipped; its bytes are already credited
+        else:
             return False
+        self._account(oldest_key, self._cache.pop(oldest_key), -1)
+        self._stats["evictions"] += 1
+        logger.debug(f"Cache EVICT: {oldest_key}")
+        return True
+    
+    def delete_nowait(self, key: str) -> bool:
+        entry = self._cache.pop(key, None)
+        self._account(key, entry, -1)
+        return entry is not None
+    
+    def delete_pattern_nowait(self, pattern: str) -> int:
+        if not _has_wildcard(pattern):
+            return int(self.delete_nowait(pattern))
+        
+        prefix = pattern[:-1] if pattern.endswith("*") and not _has_wildcard(pattern[:-1]) else None
+        matched = [
+            key for key in self._cache
+            if (key.startswith(prefix) if prefix is not None else fnmatch.fnmatchcase(key, pattern))
+        ]
+        for key in matched:
+            self._account(key, self._cache.pop(key), -1)
+        return len(matched)
+    
+    def items_nowait(self) -> List[Tuple[str, CacheEntry]]:
+        return list(self._cache.items())
+    
+    async def get(self, key: str) -> Optional[Any]:
+        return self.get_nowait(key)
+    
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self.get_entry_nowait(key)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, grace: float = 0):
+        self.set_nowait(key, value, ttl, grace)
+    
+    async def delete(self, key: str) -> bool:
+        return self.delete_nowait(key)
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        return self.delete_pattern_nowait(pattern)
     
     async def clear(self):
-        async with self._lock:
-            self._cache.clear()
-            logger.info("Cache cleared")
+        self._cache.clear()
+        self._expiry_heap.clear()
+        self._bytes_used = 0
+        self._bytes_by_namespace.clear()
+        logger.info("Cache cleared")
     
-    async def cleanup_expired(self):
-        async with self._lock:
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if entry.is_expired()
-            ]
-            for key in expired_keys:
+    def sweep_expired(self) -> int:
+        started = time.perf_counter()
+        now = time.time()
+        removed = 0
+        
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            _, _, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # A rewritten key may not have expired yet; its own item comes later.
+            if entry is not None and entry.stale_until < now:
                 del self._cache[key]
-            
-            if expired_keys:
-                logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+                self._account(key, entry, -1)
+                removed += 1
+        
+        # Overwrites leave superseded items behind; rebuild once they dominate.
+        live = len(self)
+        if len(heap) > 2 * live + 64:
+            self._expiry_heap = [
+                (entry.stale_until, next(self._expiry_seq), key)
+                for key, entry in self._cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+        
+        duration_ms = (time.perf_counter() - started) * 1000
+        self._sweep_stats["sweeps"] += 1
+        self._sweep_stats["expired_reclaimed"] += removed
+        self._sweep_stats["last_sweep_ms"] = round(duration_ms, 3)
+        self._sweep_stats["max_sweep_ms"] = max(self._sweep_stats["max_sweep_ms"], round(duration_ms, 3))
+        
+        if removed and _debug_enabled():
+            logger.debug(f"Cleaned up {removed} expired cache entries in {duration_ms:.2f}ms")
+        return removed
+    
+    async def cleanup_expired(self):
+        self.sweep_expired()
+    
+    async def _run_sweeper(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.error(f"Cache sweep failed: {e}")
+    
+    def start_sweeper(self, interval_seconds: float):
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._run_sweeper(interval_seconds))
+            logger.info(f"Cache expiry sweeper started (every {interval_seconds}s)")
+    
+    async def stop_sweeper(self):
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
     
     def get_stats(self) -> Dict[str, Any]:
         total = self._stats["hits"] + self._stats["misses"]
@@ -104,20 +387,382 @@ class InMemoryCache:
         
         return {
             **self._stats,
-            "size": len(self._cache),
+            "size": len(self),
             "max_size": self._max_size,
+            "hit_rate_percent": round(hit_rate, 2),
+            "expiry": {
+                **self._sweep_stats,
+                "indexed": len(self._expiry_heap)
+            },
+            "memory": {
+                "bytes_used": self._bytes_used,
+                "max_bytes": self._max_bytes,
+                "bytes_by_namespace": dict(self._bytes_by_namespace)
+            }
+        }
+
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "leaders": 0,
+            "coalesced_waiters": 0,
+            "errors": 0
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None:
+            self._stats["coalesced_waiters"] += 1
+            logger.debug(f"Single-flight JOIN: {key}")
+            return await RequestContext.within_deadline(asyncio.shield(task))
+        
+        self._stats["leaders"] += 1
+        task = asyncio.ensure_future(self._run(fn))
+        self._calls[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        # Shield so a cancelled (or timed-out) caller doesn't cancel the fetch
+        # other waiters share; each waiter gives up at its own deadline.
+        return await RequestContext.within_deadline(asyncio.shield(task))
+    
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[T]]) -> T:
+        # The fetch serves every waiter, not just the leader that started it.
+        RequestContext.fork()
+        return await fn()
+    
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+    
+    def _finish(self, key: str, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["errors"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "in_flight": len(self._calls)
+        }
+
+
+
+class RedisCache(CacheBackend):
+    """Shared cache on a Redis-protocol server, used as the L2 tier.
+
+    Values are stored as JSON envelopes carrying their own TTL metadata so
+    stale-while-revalidate works the same as in memory; the server-side
+    expiry covers ttl + grace. Connection errors count as misses.
+    """
+    
+    def __init__(self, url: str, key_prefix: str = "smartshift:agent:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=two_tier with a Redis URL needs the 'redis' package") from e
+        
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._key_prefix = key_prefix
+        self._channel = f"{key_prefix}invalidations"
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "errors": 0
+        }
+    
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        try:
+            raw = await self._client.get(self._key_prefix + key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"L2 cache GET failed for {key}: {e}")
+            return None
+        
+        if raw is None:
+            self._stats["misses"] += 1
+            return None
+        
+        try:
+            envelope = json.loads(raw)
+            entry = CacheEntry(
+                value=envelope["value"],
+                created_at=float(envelope["created_at"]),
+                ttl_seconds=float(envelope["ttl"]),
+                grace_seconds=float(envelope.get("grace", 0))
+            )
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            # Not one of our envelopes (or written by an incompatible
+            # version): drop it rather than fail every read of the key.
+            self._stats["errors"] += 1
+            logger.warning(f"L2 cache entry for {key} is unreadable, deleting it: {e}")
+            await self.delete(key)
+            self._stats["misses"] += 1
+            return None
+        if entry.is_past_grace():
+            self._stats["misses"] += 1
+            return None
+        if entry.is_expired():
+            self._stats["stale_hits"] += 1
+        self._stats["hits"] += 1
+        return entry
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = await self.get_entry(key)
+        if entry is None or entry.is_expired():
+            return None
+        return entry.value
+    
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, grace: float = 0):
+        ttl = ttl or 300
+        envelope = {"value": value, "created_at": time.time(), "ttl": ttl, "grace": grace}
+        try:
+            await self._client.set(
+                self._key_prefix + key,
+                json.dumps(envelope),
+                px=int((ttl + grace) * 1000)
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"L2 cache SET failed for {key}: {e}")
+    
+    async def delete(self, key: str) -> bool:
+        try:
+            return bool(await self._client.delete(self._key_prefix + key))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"L2 cache DELETE failed for {key}: {e}")
+            return False
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        try:
+            keys = [key async for key in self._client.scan_iter(match=self._key_prefix + pattern)]
+            if not keys:
+                return 0
+            return await self._client.delete(*keys)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"L2 cache DELETE {pattern} failed: {e}")
+            return 0
+    
+    async def clear(self):
+        await self.delete_pattern("*")
+    
+    async def publish_invalidation(self, pattern: str):
+        try:
+            await self._client.publish(self._channel, pattern)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Invalidation broadcast for {pattern} failed: {e}")
+    
+    async def listen_invalidations(self, on_pattern: Callable[[str], Any]):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    data = message["data"]
+                    on_pattern(data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.aclose()
+    
+    async def aclose(self):
+        await self._client.aclose()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._stats["hits"] + self._stats["misses"]
+        hit_rate = (self._stats["hits"] / total * 100) if total > 0 else 0
+        
+        return {
+            **self._stats,
+            "evictions": 0,
+            "size": None,
+            "max_size": None,
             "hit_rate_percent": round(hit_rate, 2)
         }
 
 
+class TwoTierCache(CacheBackend):
+    """In-process L1 in front of a shared L2.
+
+    Reads try L1 first and fall through to L2 when L1 has nothing fresh;
+    L2 hits are copied into L1 with their original timestamps so both
+    tiers expire together. Writes go to both tiers. Deletes are broadcast
+    through the L2 (when it supports it) so other workers drop their L1
+    copies too.
+    """
+    
+    def __init__(self, l1: InMemoryCache, l2: CacheBackend):
+        self.l1 = l1
+        self.l2 = l2
+        self._listener_task: Optional[asyncio.Task] = None
+        # Per lookup, however many tiers it touched; the tiers' own stats
+        # count every access they see.
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0
+        }
+    
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        local = self.l1.get_entry_nowait(key)
+        if local is not None and not local.is_expired():
+            return local
+        
+        shared = await self.l2.get_entry(key)
+        if shared is None:
+            return local
+        if local is not None and local.created_at >= shared.created_at:
+            return local
+        
+        # Keep the access count the key has built up so far, so refresh-ahead
+        # still sees a hot key after it has been promoted.
+        hits = max(local.hits if local is not None else 0, shared.hits + 1)
+        promoted = self.l1.set_nowait(
+            key,
+            shared.value,
+            ttl=shared.ttl_seconds,
+            grace=shared.grace_seconds,
+            created_at=shared.created_at,
+            hits=hits
+        )
+        return promoted or shared
+    
+    def _count(self, entry: Optional[CacheEntry], allow_stale: bool) -> Optional[CacheEntry]:
+        if entry is None or (entry.is_expired() and not allow_stale):
+            self._stats["misses"] += 1
+            return None
+        if entry.is_expired():
+            self._stats["stale_hits"] += 1
+        self._stats["hits"] += 1
+        return entry
+    
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self._count(await self._lookup(key), allow_stale=True)
+    
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._count(await self._lookup(key), allow_stale=False)
+        return entry.value if entry is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, grace: float = 0):
+        self.l1.set_nowait(key, value, ttl, grace)
+        await self.l2.set(key, value, ttl, grace)
+    
+    async def delete(self, key: str) -> bool:
+        local = self.l1.delete_nowait(key)
+        shared = await self.l2.delete(key)
+        await self._broadcast(key)
+        return local or shared
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        local = self.l1.delete_pattern_nowait(pattern)
+        shared = await self.l2.delete_pattern(pattern)
+        await self._broadcast(pattern)
+        return max(local, shared)
+    
+    async def _broadcast(self, pattern: str):
+        publish = getattr(self.l2, "publish_invalidation", None)
+        if publish is not None:
+            await publish(pattern)
+    
+    async def _listen(self):
+        while True:
+            try:
+                await self.l2.listen_invalidations(self.l1.delete_pattern_nowait)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Invalidation listener dropped, reconnecting: {e}")
+                await asyncio.sleep(1)
+    
+    async def clear(self):
+        await self.l1.clear()
+        await self.l2.clear()
+        await self._broadcast("*")
+    
+    def start_sweeper(self, interval_seconds: float):
+        self.l1.start_sweeper(interval_seconds)
+        if hasattr(self.l2, "listen_invalidations") and self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen())
+    
+    async def stop_sweeper(self):
+        await self.l1.stop_sweeper()
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+    
+    async def aclose(self):
+        await self.l2.aclose()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        l1 = self.l1.get_stats()
+        l2 = self.l2.get_stats()
+        total = self._stats["hits"] + self._stats["misses"]
+        hit_rate = (self._stats["hits"] / total * 100) if total > 0 else 0
+        
+        return {
+            **self._stats,
+            "evictions": l1["evictions"],
+            "size": l1["size"],
+            "max_size": l1["max_size"],
+            "hit_rate_percent": round(hit_rate, 2),
+            "expiry": l1["expiry"],
+            "memory": l1["memory"],
+            "tiers": {
+                "l1": l1,
+                "l2": l2
+            }
+        }
+
+
 
-_cache = InMemoryCache(max_size=500, default_ttl=300)
+_cache: Optional[CacheBackend] = None
+_single_flight = SingleFlight()
+
+
+def _create_cache() -> CacheBackend:
+    from app.config import get_settings
+    settings = get_settings()
+    
+    l1 = InMemoryCache(
+        max_size=settings.cache_max_entries,
+        default_ttl=300,
+        max_bytes=settings.cache_max_bytes
+    )
+    if settings.cache_backend == "memory":
+        return l1
+    
+    if settings.cache_backend != "two_tier":
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.cache_backend}")
+    
+    if settings.cache_redis_url:
+        l2 = RedisCache(settings.cache_redis_url)
+        logger.info("Cache backend: in-process L1 + Redis L2")
+    else:
+        # Process-local stand-in so the two-tier path can run without a server.
+        l2 = InMemoryCache(max_size=5000, default_ttl=300)
+        logger.warning("CACHE_BACKEND=two_tier without CACHE_REDIS_URL, using a local L2 stand-in")
+    return TwoTierCache(l1, l2)
 
 
-def get_cache() -> InMemoryCache:
+def get_cache() -> CacheBackend:
+    global _cache
+    if _cache is None:
+        _cache = _create_cache()
     return _cache
 
 
+def get_single_flight() -> SingleFlight:
+    return _single_flight
+
+
 def cached(ttl: float = 300, key_prefix: str = ""):
     def decorator(func: Callable) -> Callable:
         @wraps(func)
@@ -126,13 +771,14 @@ def cached(ttl: float = 300, key_prefix: str = ""):
             if kwargs:
                 cache_key += f":{':'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))}"
 
-            cached_value = await _cache.get(cache_key)
+            cache = get_cache()
+            cached_value = await cache.get(cache_key)
             if cached_value is not None:
                 return cached_value
 
             result = await func(*args, **kwargs)
 
-            await _cache.set(cache_key, result, ttl)
+            await cache.set(cache_key, result, ttl)
             
             return result
         
@@ -143,6 +789,38 @@ def cached(ttl: float = 300, key_prefix: str = ""):
 
 
 
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    # How long past ttl a value may still be served while it is refreshed.
+    grace: float = 0
+    # Keys with at least hot_hits hits are refreshed this long before ttl.
+    refresh_ahead: float = 0
+    hot_hits: int = 3
+
+
+class CachePolicies:
+    EMPLOYEE = CachePolicy(ttl=600, grace=300, refresh_ahead=60)
+    SHIFT = CachePolicy(ttl=300, grace=120, refresh_ahead=30)
+    FATIGUE = CachePolicy(ttl=300, grace=120, refresh_ahead=30)
+    AVAILABILITY = CachePolicy(ttl=120, grace=30, refresh_ahead=15)
+    # These change with every assignment, so they are only cached when
+    # Laravel pushes invalidations.
+    SHIFT_ASSIGNMENTS: Optional[CachePolicy] = None
+    EMPLOYEE_SHIFTS: Optional[CachePolicy] = None
+
+
+class PushInvalidatedCachePolicies(CachePolicies):
+    # Laravel calls /api/cache/invalidate on every change, so the TTLs here
+    # are only a safety net for missed events.
+    EMPLOYEE = CachePolicy(ttl=6 * 3600, grace=600, refresh_ahead=300)
+    SHIFT = CachePolicy(ttl=3 * 3600, grace=600, refresh_ahead=300)
+    FATIGUE = CachePolicy(ttl=2 * 3600, grace=300, refresh_ahead=300)
+    AVAILABILITY = CachePolicy(ttl=3600, grace=120, refresh_ahead=120)
+    SHIFT_ASSIGNMENTS = CachePolicy(ttl=3600, grace=60)
+    EMPLOYEE_SHIFTS = CachePolicy(ttl=3600, grace=60)
+
+
 class CacheKeys:
     
     @staticmethod
@@ -160,3 +838,46 @@ class CacheKeys:
     @staticmethod
     def availability(employee_id: int, date: str) -> str:
         return f"availability:{employee_id}:{date}"
+    
+    @staticmethod
+    def shift_assignments(shift_id: int) -> str:
+        return f"shift_assignments:{shift_id}"
+    
+    @staticmethod
+    def employee_shifts(employee_id: int) -> str:
+        return f"employee_shifts:{employee_id}"
+    
+    @staticmethod
+    def for_entity(
+        entity: str,
+        entity_id: Optional[int] = None,
+        employee_id: Optional[int] = None,
+        shift_id: Optional[int] = None,
+        date: Optional[str] = None
+    ) -> List[str]:
+        """Keys and patterns to drop when Laravel reports a change to an entity."""
+        if entity in ("employee", "availability", "fatigue"):
+            employee_id = entity_id if entity_id is not None else employee_id
+            if employee_id is None:
+                raise ValueError(f"{entity} changes need an employee id")
+        elif entity == "shift":
+            shift_id = entity_id if entity_id is not None else shift_id
+            if shift_id is None:
+                raise ValueError("shift changes need a shift id")
+        elif entity == "assignment":
+            if shift_id is None or employee_id is None:
+                raise ValueError("assignment changes need shift_id and employee_id")
+        else:
+            raise ValueError(f"Unknown entity type: {entity}")
+        
+        if entity == "employee":
+            return [CacheKeys.employee(employee_id), CacheKeys.employee_shifts(employee_id)]
+        if entity == "availability":
+            if date:
+                return [CacheKeys.availability(employee_id, date)]
+            return [f"availability:{employee_id}:*"]
+        if entity == "fatigue":
+            return [CacheKeys.fatigue(employee_id)]
+        if entity == "shift":
+            return [CacheKeys.shift(shift_id), CacheKeys.shift_assignments(shift_id)]
+        return [CacheKeys.shift_assignments(shift_id), CacheKeys.employee_shifts(employee_id)]
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+from typing import Optional, Dict, Any
+
+from app.utils.cache import InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Completions keyed on canonicalized prompt inputs.
+
+    Callers pass only the inputs the prompt is built from (bucketed scores,
+    decision, failed check names, model, temperature), so two swaps that
+    would produce the same prompt share one completion. Entries can be
+    persisted to a JSON file and reloaded on startup; with autosave running,
+    new entries are written out every interval, so a crash loses at most
+    one interval's worth.
+    """
+    
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 86400, path: Optional[str] = None):
+        self._cache = InMemoryCache(max_size=max_entries, default_ttl=ttl_seconds)
+        self._ttl_seconds = ttl_seconds
+        self._path = path
+        self._dirty = False
+        self._autosave_task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def make_key(kind: str, inputs: Dict[str, Any]) -> str:
+        canonical = json.dumps({"kind": kind, **inputs}, sort_keys=True, separators=(",", ":"), default=str)
+        return f"llm:{kind}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+    
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get_nowait(key)
+    
+    def set(self, key: str, content: str):
+        self._cache.set_nowait(key, content, ttl=self._ttl_seconds)
+        self._dirty = True
+    
+    def load(self):
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load LLM cache from {self._path}: {e}")
+            return
+        
+        loaded = 0
+        now = time.time()
+        for key, item in stored.items():
+            if item["created_at"] + item["ttl"] <= now:
+                continue
+            self._cache.set_nowait(key, item["content"], ttl=item["ttl"], created_at=item["created_at"])
+            loaded += 1
+        logger.info(f"Loaded {loaded} LLM responses from {self._path}")
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        self._dirty = False
+        return {
+            key: {"content": entry.value, "created_at": entry.created_at, "ttl": entry.ttl_seconds}
+            for key, entry in self._cache.items_nowait()
+            if not entry.is_expired()
+        }
+    
+    def _write(self, stored: Dict[str, Any]) -> bool:
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self._path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not persist LLM cache to {self._path}: {e}")
+            return False
+    
+    def save(self):
+        if not self._path or not self._dirty:
+            return
+        if not self._write(self._snapshot()):
+            self._dirty = True
+    
+    async def save_async(self):
+        # Snapshot on the event loop, write the file off it.
+        if not self._path or not self._dirty:
+            return
+        if not await asyncio.to_thread(self._write, self._snapshot()):
+            self._dirty = True
+    
+    async def _run_autosave(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.save_async()
+            except Exception as e:
+                logger.error(f"LLM cache autosave failed: {e}")
+    
+    def start_autosave(self, interval_seconds: float):
+        if not self._path or interval_seconds <= 0:
+            return
+        if self._autosave_task is None or self._autosave_task.done():
+            self._autosave_task = asyncio.create_task(self._run_autosave(interval_seconds))
+            logger.info(f"LLM cache autosave started (every {interval_seconds}s)")
+    
+    async def stop_autosave(self):
+        if self._autosave_task is not None:
+            self._autosave_task.cancel()
+            try:
+                await self._autosave_task
+            except asyncio.CancelledError:
+                pass
+            self._autosave_task = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        return {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate_percent": stats["hit_rate_percent"],
+            "size": stats["size"],
+            "max_size": stats["max_size"],
+            "persistent": self._path is not None
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _llm_cache
+    if _llm_cache is None:
+        from app.config import get_settings
+        settings = get_settings()
+        _llm_cache = LLMResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            path=settings.llm_cache_path
+        )
+    return _llm_cache
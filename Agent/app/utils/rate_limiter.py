@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Rough token cost of a chat completion as OpenAI counts it against
+    TPM: the prompt (~4 characters per token plus per-message overhead)
+    and the requested max_tokens. Actual usage is settled afterwards."""
+    prompt = sum(len(message.get("content") or "") // 4 + 4 for message in messages) + 3
+    return prompt + max_tokens
+
+
+def retry_after_seconds(headers: Any, default: float = 1.0, ceiling: float = 60.0) -> float:
+    if headers is None:
+        return default
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return min(max(float(value) / scale, 0.0), ceiling)
+        except ValueError:
+            continue  # an HTTP date; not worth parsing for a pause this short
+    return default
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        self.refill(now)
+        return max(amount - self.level, 0.0) / self.rate
+
+    def take(self, amount: float):
+        # May go negative when actual usage exceeds the estimate; later
+        # callers then wait for the debt to be repaid.
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class OpenAIRateLimiter:
+    """Client-side RPM/TPM limits for OpenAI calls.
+
+    Two token buckets (requests and tokens per minute) refill continuously.
+    Callers that can't go straight away wait in priority order (lower
+    first, FIFO within a priority), and a 429's Retry-After pauses the
+    whole queue instead of letting every caller hit the limit again.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._queue: List[Tuple[float, int, asyncio.Future, int]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {
+            "granted": 0,
+            "queued": 0,
+            "queue_timeouts": 0,
+            "peak_queue": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "rate_limited": 0,
+            "estimated_tokens": 0,
+            "actual_tokens": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = max(self._paused_until - now, 0.0)
+        if self._requests is not None:
+            wait = max(wait, self._requests.time_until(1, now))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.time_until(tokens, now))
+        return wait
+
+    def _take(self, tokens: int):
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+        self._stats["granted"] += 1
+        self._stats["estimated_tokens"] += tokens
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._queue:
+            _, _, waiter, tokens = self._queue[0]
+            if waiter.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._wait_time(tokens, now)
+            if wait > 0:
+                # Strict priority: nothing behind the head goes first.
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._take(tokens)
+            waiter.set_result(None)
+
+    async def acquire(self, tokens: int, priority: float = 0.0, max_wait_seconds: Optional[float] = 10.0) -> int:
+        """Wait for room for one request of `tokens` tokens and return the
+        amount charged, to pass to settle() once the real usage is known.
+        max_wait_seconds=None waits for as long as it takes."""
+        if self._tokens is not None:
+            tokens = min(tokens, int(self._tokens.capacity))
+        if not self.enabled:
+            return tokens
+
+        if not self._queue and self._wait_time(tokens, time.monotonic()) <= 0:
+            self._take(tokens)
+            return tokens
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter, tokens))
+        self._stats["queued"] += 1
+        self._stats["peak_queue"] = max(self._stats["peak_queue"], len(self._queue))
+        self._dispatch()
+
+        started = time.perf_counter()
+        try:
+            timeout = max(max_wait_seconds, 0.0) if max_wait_seconds is not None else None
+            await asyncio.wait({waiter}, timeout=timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.settle(tokens, 0)
+            else:
+                waiter.cancel()
+                self._dispatch()
+            raise
+        finally:
+            waited_ms = (time.perf_counter() - started) * 1000
+            self._stats["wait_ms_total"] += waited_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited_ms)
+
+        if not waiter.done():
+            waiter.cancel()
+            self._dispatch()
+            self._stats["queue_timeouts"] += 1
+            raise Exception(f"OpenAI rate limit queue: no capacity within {max_wait_seconds:.1f}s")
+        return tokens
+
+    def settle(self, charged: int, actual: int):
+        """Correct the token bucket once a call's real usage is known."""
+        self._stats["actual_tokens"] += actual
+        if self._tokens is None:
+            return
+        if actual < charged:
+            self._tokens.give_back(charged - actual)
+        else:
+            self._tokens.take(actual - charged)
+
+    def pause(self, seconds: float):
+        self._stats["rate_limited"] += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"OpenAI rate limited, pausing the queue for {seconds:.1f}s")
+        try:
+            self._dispatch()
+        except RuntimeError:
+            pass  # no running loop; the pause applies to the next acquire
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        for bucket in (self._requests, self._tokens):
+            if bucket is not None:
+                bucket.refill(now)
+        queued = self._stats["queued"]
+        return {
+            **self._stats,
+            "wait_ms_total": round(self._stats["wait_ms_total"], 1),
+            "wait_ms_max": round(self._stats["wait_ms_max"], 1),
+            "avg_wait_ms": round(self._stats["wait_ms_total"] / queued, 1) if queued else 0.0,
+            "queue_depth": sum(1 for _, _, waiter, _ in self._queue if not waiter.done()),
+            "rpm_limit": int(self._requests.capacity) if self._requests is not None else None,
+            "tpm_limit": int(self._tokens.capacity) if self._tokens is not None else None,
+            "requests_available": round(self._requests.level, 1) if self._requests is not None else None,
+            "tokens_available": round(self._tokens.level) if self._tokens is not None else None,
+            "paused_for_seconds": round(max(self._paused_until - now, 0.0), 1)
+        }
+
+
+openai_rate_limiter = OpenAIRateLimiter(settings.openai_rpm_limit, settings.openai_tpm_limit)
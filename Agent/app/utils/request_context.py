@@ -1,34 +1,60 @@
 import uuid
+import asyncio
 import logging
 import time
 from contextvars import ContextVar
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Awaitable, TypeVar
 from functools import wraps
 from datetime import datetime
 
 request_context: ContextVar[Dict[str, Any]] = ContextVar('request_context', default={})
 
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    pass
+
 
 class RequestContext:
     
     @staticmethod
-    def new(swap_id: int, extra: Optional[Dict[str, Any]] = None) -> str:
+    def new(swap_id: int, extra: Optional[Dict[str, Any]] = None, deadline: Optional[float] = None) -> str:
+        # deadline is a time.monotonic() timestamp; None means no budget.
         correlation_id = str(uuid.uuid4())[:8]  
         context = {
             "correlation_id": correlation_id,
             "swap_id": swap_id,
             "start_time": time.time(),
             "node_timings": {},
+            "deadline": deadline,
             **(extra or {})
         }
         
         request_context.set(context)
         return correlation_id
     
+    @staticmethod
+    def fork(**overrides) -> Dict[str, Any]:
+        # A private copy for background work spawned from a request: same
+        # correlation id, but its own timings, no streaming sink and no
+        # deadline (the response it would protect has already been sent).
+        context = {
+            key: value for key, value in request_context.get().items()
+            if key not in ("event_sink", "prefetch_used", "prefetch_released", "deadline")
+        }
+        context.update({"start_time": time.time(), "node_timings": {}, **overrides})
+        request_context.set(context)
+        return context
+    
     @staticmethod
     def get() -> Dict[str, Any]:
         return request_context.get()
     
+    @staticmethod
+    def is_shadow() -> bool:
+        return bool(request_context.get().get("shadow"))
+    
     @staticmethod
     def get_correlation_id() -> Optional[str]:
         ctx = request_context.get()
@@ -40,6 +66,52 @@ class RequestContext:
         if ctx:
             ctx.setdefault("node_timings", {})[node_name] = duration_ms
     
+    @staticmethod
+    def set_event_sink(sink: Callable[[str, Dict[str, Any]], None]):
+        ctx = request_context.get()
+        if ctx:
+            ctx["event_sink"] = sink
+    
+    @staticmethod
+    def has_event_sink() -> bool:
+        return "event_sink" in request_context.get()
+    
+    @staticmethod
+    def emit(event: str, data: Dict[str, Any]):
+        # Progress events for streaming clients; a no-op for plain requests.
+        sink = request_context.get().get("event_sink")
+        if sink is not None:
+            sink(event, data)
+    
+    @staticmethod
+    def time_remaining() -> Optional[float]:
+        deadline = request_context.get().get("deadline")
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+    
+    @staticmethod
+    def check_deadline(step: str):
+        remaining = RequestContext.time_remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before {step}")
+    
+    @staticmethod
+    def bound_timeout(timeout: float, step: str) -> float:
+        """`timeout`, shortened so it ends at the request's deadline."""
+        RequestContext.check_deadline(step)
+        remaining = RequestContext.time_remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+    
+    @staticmethod
+    async def within_deadline(awaitable: Awaitable[T], reserve_seconds: float = 0.0) -> T:
+        """Await `awaitable`, cancelling it (asyncio.TimeoutError) if it would
+        run into the last `reserve_seconds` before the deadline."""
+        remaining = RequestContext.time_remaining()
+        if remaining is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, timeout=max(remaining - reserve_seconds, 0))
+    
     @staticmethod
     def get_elapsed_ms() -> float:
         ctx = request_context.get()
@@ -93,7 +165,7 @@ def timed_node(node_name: str):
                 
                 check_key = f"{node_name.replace('check_', '')}_check"
                 check_result = result.get(check_key) if isinstance(result, dict) else None
-                passed = check_result.get("passed") if check_result else None
+                passed = getattr(check_result, "passed", None)
                 
                 logger.info(
                     f"Completed {node_name}",
@@ -124,5 +196,17 @@ def timed_node(node_name: str):
     return decorator
 
 
+def deadline_checked(node_name: str):
+    # Nodes don't start once the request's deadline has passed.
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(state, *args, **kwargs):
+            RequestContext.check_deadline(node_name)
+            return await func(state, *args, **kwargs)
+        
+        return wrapper
+    return decorator
+
+
 def get_logger(name: str) -> CorrelatedLogger:
     return CorrelatedLogger(name)
@@ -0,0 +1,62 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Times the warm-up phases and latches readiness once they've all succeeded."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.phases[name] = {
+                "ok": False,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": str(e)
+            }
+            raise
+        self.phases[name] = {
+            "ok": True,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def phase_ok(self, name: str) -> bool:
+        return self.phases.get(name, {}).get("ok", False)
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+        elapsed_ms = self.elapsed_ms
+        if elapsed_ms > self.budget_ms:
+            logger.warning(f"Warm-up took {elapsed_ms:.0f}ms (budget {self.budget_ms:.0f}ms)", extra={"phases": self.phases})
+        else:
+            logger.info(f"Warm-up complete in {elapsed_ms:.0f}ms", extra={"phases": self.phases})
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def elapsed_ms(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return (end - self.started_at) * 1000
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "budget_ms": self.budget_ms,
+            "within_budget": self.elapsed_ms <= self.budget_ms,
+            "phases": self.phases
+        }
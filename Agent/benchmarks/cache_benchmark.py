@@ -0,0 +1,140 @@
+"""Cache hit-path micro-benchmark.
+
+Compares the lock-free InMemoryCache (synchronous hit path) against the
+previous design (one asyncio.Lock around every call) with many concurrent tasks reading a
+hot key set, the way concurrent swap validations hit employee/shift keys.
+
+Each candidate runs --repeat times, interleaved so that machine noise hits
+both alike, and the median run is reported with the spread of ops/s.
+Absolute figures vary a lot between machines and Python versions; compare
+the two rows of one invocation, not numbers across machines.
+
+Run from the Agent directory:
+
+    python -m benchmarks.cache_benchmark --tasks 2000 --ops 50
+"""
+import argparse
+import asyncio
+import logging
+import platform
+import statistics
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.utils.cache import CacheEntry, InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class GlobalLockCache:
+    # Baseline: the original cache (one asyncio.Lock around every call).
+    def __init__(self, max_size: int = 1000, default_ttl: float = 300):
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._max_size = max_size
+        self._default_ttl = default_ttl
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        async with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                logger.debug(f"Cache MISS: {key}")
+                return None
+            if entry.is_expired():
+                del self._cache[key]
+                self._stats["misses"] += 1
+                logger.debug(f"Cache EXPIRED: {key}")
+                return None
+            self._cache.move_to_end(key)
+            entry.hits += 1
+            self._stats["hits"] += 1
+            logger.debug(f"Cache HIT: {key} (age: {entry.age_seconds():.1f}s)")
+            return entry.value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        async with self._lock:
+            while len(self._cache) >= self._max_size:
+                oldest_key = next(iter(self._cache))
+                del self._cache[oldest_key]
+                self._stats["evictions"] += 1
+            self._cache[key] = CacheEntry(
+                value=value,
+                created_at=time.time(),
+                ttl_seconds=ttl or self._default_ttl
+            )
+            logger.debug(f"Cache SET: {key} (ttl: {ttl or self._default_ttl}s)")
+
+
+async def run(cache, tasks: int, ops: int, keys: int):
+    for i in range(keys):
+        await cache.set(f"employee:{i}", {"id": i, "full_name": f"Employee {i}"})
+
+    latencies = []
+    start_barrier = asyncio.Event()
+
+    async def worker(worker_id: int):
+        await start_barrier.wait()
+        for op in range(ops):
+            key = f"employee:{(worker_id + op) % keys}"
+            started = time.perf_counter_ns()
+            await cache.get(key)
+            latencies.append(time.perf_counter_ns() - started)
+            if op % 10 == 0:
+                # Give other tasks a turn, like a node awaiting I/O would.
+                await asyncio.sleep(0)
+
+    workers = [asyncio.create_task(worker(i)) for i in range(tasks)]
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    start_barrier.set()
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[int(len(latencies) * 0.99)] / 1000,
+        "mean_us": statistics.fmean(latencies) / 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache hit-path benchmark")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    candidates = {
+        "global_lock": lambda: GlobalLockCache(max_size=500),
+        "lock_free": lambda: InMemoryCache(max_size=500)
+    }
+
+    print(
+        f"{args.tasks} concurrent tasks x {args.ops} gets over {args.keys} hot keys, "
+        f"median of {args.repeat} (Python {platform.python_version()})"
+    )
+    results = {name: [] for name in candidates}
+    for _ in range(max(args.repeat, 1)):
+        for name, factory in candidates.items():
+            results[name].append(asyncio.run(run(factory(), args.tasks, args.ops, args.keys)))
+
+    for name, runs in results.items():
+        runs.sort(key=lambda result: result["ops_per_sec"])
+        result = runs[len(runs) // 2]
+        print(
+            f"{name:>12}: {result['ops_per_sec']:>12,.0f} ops/s "
+            f"({runs[0]['ops_per_sec']:,.0f}-{runs[-1]['ops_per_sec']:,.0f})  "
+            f"p50 {result['p50_us']:7.2f}us  p99 {result['p99_us']:7.2f}us  "
+            f"mean {result['mean_us']:7.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read once at import; give the required ones harmless values.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("LARAVEL_API_BASE_URL", "http://laravel.test/api/")
+os.environ.setdefault("LARAVEL_AGENT_EMAIL", "agent@test.local")
+os.environ.setdefault("LARAVEL_AGENT_PASSWORD", "secret")
@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.graph.tools import BulkLoader
+from app.utils.request_context import RequestContext
+
+
+def make_loader(fetch_bulk, fetched_one: list) -> BulkLoader:
+    async def fetch_one(entity_id):
+        fetched_one.append(entity_id)
+        return {"id": entity_id, "source": "single"}
+
+    return BulkLoader("employees", "agent/employees", fetch_bulk, fetch_one, max_batch=2)
+
+
+@pytest.mark.asyncio
+async def test_coalesces_and_fetches_missing_ids_one_by_one():
+    endpoints, fetched_one = [], []
+
+    async def fetch_bulk(endpoint):
+        endpoints.append(endpoint)
+        # Id 2 is missing from the response.
+        return {"data": [{"id": 1, "source": "bulk"}]}
+
+    loader = make_loader(fetch_bulk, fetched_one)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3), loader.load(1))
+
+    # max_batch=2: ids 1 and 2 go in one bulk call, 3 is alone in its chunk.
+    assert [r["source"] for r in results] == ["bulk", "single", "single", "bulk"]
+    assert endpoints == ["agent/employees?ids=1,2"]
+    assert fetched_one == [2, 3]
+    assert loader.get_stats()["running_batches"] == 0
+
+
+@pytest.mark.asyncio
+async def test_missing_bulk_route_falls_back_to_per_id_lookups():
+    fetched_one = []
+
+    async def fetch_bulk(endpoint):
+        request = httpx.Request("GET", f"http://laravel.test/api/{endpoint}")
+        raise httpx.HTTPStatusError("not found", request=request, response=httpx.Response(404, request=request))
+
+    loader = make_loader(fetch_bulk, fetched_one)
+    results = await asyncio.gather(loader.load(1), loader.load(2))
+
+    assert [r["id"] for r in results] == [1, 2]
+    assert not loader.bulk_available()
+    assert await loader.load(5) == {"id": 5, "source": "single"}
+    assert fetched_one == [1, 2, 5]
+    assert loader.get_stats()["fallback_ids"] == 3
+
+
+@pytest.mark.asyncio
+async def test_unexpected_batch_error_fails_every_waiter():
+    async def fetch_bulk(endpoint):
+        return {"data": []}
+
+    loader = make_loader(fetch_bulk, [])
+
+    async def broken(waiters):
+        raise RuntimeError("bug")
+
+    loader._resolve_batch = broken
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True),
+        timeout=1
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_outside_the_scheduling_request_context():
+    seen = []
+
+    async def fetch_bulk(endpoint):
+        seen.append(RequestContext.time_remaining())
+        return {"data": [{"id": 1}, {"id": 2}]}
+
+    RequestContext.new(swap_id=1, deadline=asyncio.get_running_loop().time() + 0.001)
+    loader = make_loader(fetch_bulk, [])
+    await asyncio.gather(loader.load(1), loader.load(2))
+
+    assert seen == [None]
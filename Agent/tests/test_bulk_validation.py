@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.graph.tools import laravel_client
+from app.utils.request_context import RequestContext
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_shared_within_a_batch_only():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {"id": 1}
+
+    with laravel_client.lookup_batch() as batch:
+        results = await asyncio.gather(*(laravel_client._batched("employee:1", fetch) for _ in range(3)))
+        await laravel_client._batched("shift:2", fetch)
+
+    assert results == [{"id": 1}] * 3
+    assert (batch.unique_lookups, batch.deduplicated) == (2, 2)
+    assert len(calls) == 2
+
+    # Outside the batch every call goes upstream again.
+    await laravel_client._batched("employee:1", fetch)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_first_swaps_deadline_does_not_cap_the_shared_lookup():
+    release = asyncio.Event()
+    seen_deadlines = []
+
+    async def fetch():
+        seen_deadlines.append(RequestContext.time_remaining())
+        await release.wait()
+        return {"id": 1}
+
+    async def swap(swap_id, deadline):
+        RequestContext.new(swap_id=swap_id, deadline=deadline)
+        return await laravel_client._batched("employee:1", fetch)
+
+    with laravel_client.lookup_batch():
+        hurried = asyncio.create_task(swap(1, time.monotonic() + 0.01))
+        await asyncio.sleep(0)
+        patient = asyncio.create_task(swap(2, None))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await hurried
+        release.set()
+
+        assert await patient == {"id": 1}
+    assert seen_deadlines == [None]
+
+
+def test_bulk_endpoint_rejects_oversized_batches(monkeypatch):
+    monkeypatch.setattr(main.settings, "bulk_validation_max_swaps", 2)
+    swap = {"swap_id": 1, "requester_id": 1, "requester_shift_id": 10, "target_employee_id": 2, "target_shift_id": 20}
+
+    response = TestClient(main.app).post("/api/validate-swaps", json=[swap] * 3)
+
+    assert response.status_code == 413
@@ -0,0 +1,99 @@
+import gc
+import sys
+import time
+import weakref
+
+from app.utils.cache import ENTRY_OVERHEAD_BYTES, InMemoryCache, estimate_size
+
+
+class Payload:
+    pass
+
+
+def test_eviction_is_lru():
+    cache = InMemoryCache(max_size=4)
+    for i in range(4):
+        cache.set_nowait(f"shift:{i}", i)
+    cache.get_nowait("shift:0")
+    cache.get_nowait("shift:1")
+    cache.set_nowait("shift:4", 4)
+    cache.set_nowait("shift:5", 5)
+    assert sorted(key for key, _ in cache.items_nowait()) == ["shift:0", "shift:1", "shift:4", "shift:5"]
+    assert cache.get_stats()["evictions"] == 2
+
+
+def test_sweep_skips_keys_rewritten_with_a_later_expiry():
+    cache = InMemoryCache(max_size=100, default_ttl=60)
+    cache.set_nowait("employee:1", "old", ttl=0.01)
+    cache.set_nowait("employee:2", "expired", ttl=0.01)
+    # Same key written again: its old heap item surfaces first and must be skipped.
+    cache.set_nowait("employee:1", "fresh", ttl=60)
+    time.sleep(0.05)
+
+    assert cache.sweep_expired() == 1
+    assert cache.get_nowait("employee:1") == "fresh"
+    assert cache.get_nowait("employee:2") is None
+    assert cache.get_stats()["expiry"]["indexed"] == 1
+
+
+def test_sweep_rebuilds_heap_full_of_superseded_items():
+    cache = InMemoryCache(max_size=100, default_ttl=60)
+    for i in range(200):
+        cache.set_nowait("shift:1", i)
+    assert cache.get_stats()["expiry"]["indexed"] == 200
+
+    assert cache.sweep_expired() == 0
+    assert cache.get_stats()["expiry"]["indexed"] == 1
+    assert cache.get_nowait("shift:1") == 199
+
+
+def test_heap_does_not_keep_deleted_values_alive():
+    cache = InMemoryCache(max_size=100, default_ttl=60)
+    value = Payload()
+    ref = weakref.ref(value)
+    cache.set_nowait("employee:1", value)
+
+    cache.delete_nowait("employee:1")
+    del value
+    gc.collect()
+
+    assert ref() is None
+    assert cache.get_stats()["expiry"]["indexed"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    value = {"id": 1, "full_name": "x" * 500}
+    entry_bytes = estimate_size(value) + sys.getsizeof("employee:0") + ENTRY_OVERHEAD_BYTES
+    cache = InMemoryCache(max_size=100, max_bytes=entry_bytes * 3)
+    for i in range(3):
+        cache.set_nowait(f"employee:{i}", dict(value, id=i))
+    cache.get_nowait("employee:0")  # now most recently used
+
+    cache.set_nowait("employee:3", dict(value, id=3))
+
+    assert cache.get_nowait("employee:1") is None
+    assert cache.get_nowait("employee:0") is not None
+    memory = cache.get_stats()["memory"]
+    assert memory["bytes_used"] <= entry_bytes * 3
+    assert memory["bytes_by_namespace"] == {"employee:": memory["bytes_used"]}
+
+
+def test_value_larger_than_the_budget_is_not_stored():
+    cache = InMemoryCache(max_size=100, max_bytes=1000)
+    cache.set_nowait("shift:1", {"id": 1})
+
+    cache.set_nowait("shift:1", {"notes": "x" * 5000})
+
+    assert cache.get_nowait("shift:1") is None
+    assert cache.get_stats()["memory"]["bytes_used"] == 0
+
+
+def test_pattern_delete_matches_prefixes_and_globs():
+    cache = InMemoryCache(max_size=100)
+    for day in range(1, 11):
+        cache.set_nowait(f"availability:3:2026-01-{day:02d}", True)
+    cache.set_nowait("availability:30:2026-01-01", True)
+
+    assert cache.delete_pattern_nowait("availability:3:*") == 10
+    assert cache.delete_pattern_nowait("availability:*:2026-01-01") == 1
+    assert len(cache) == 0
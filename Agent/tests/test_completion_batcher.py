@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from app.graph import llm
+from app.graph.llm import CompletionBatcher, parse_batch_answers
+
+
+def make_batcher(max_items=3):
+    return CompletionBatcher(
+        name="test",
+        system_prompt="Explain the decision.",
+        model="gpt-4o-mini",
+        temperature=0.3,
+        max_tokens_per_item=50,
+        window_ms=20,
+        max_items=max_items
+    )
+
+
+def user_prompt(text):
+    return [{"role": "system", "content": "Explain the decision."}, {"role": "user", "content": text}]
+
+
+def test_parse_batch_answers_keeps_only_usable_entries():
+    content = json.dumps({"1": " first ", "2": "", "3": 7, "4": "out of range", "x": "no number", "0": "zero"})
+
+    assert parse_batch_answers(content, 3) == {0: "first"}
+
+
+def test_parse_batch_answers_rejects_non_objects():
+    with pytest.raises(ValueError):
+        parse_batch_answers('["first", "second"]', 2)
+    with pytest.raises(json.JSONDecodeError):
+        parse_batch_answers("1. first\n2. second", 2)
+
+
+@pytest.mark.asyncio
+async def test_batch_answers_each_caller(monkeypatch):
+    calls = []
+
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0, **kwargs):
+        calls.append((messages, max_tokens, priority, kwargs))
+        return json.dumps({"1": "answer a", "2": "answer b"})
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    batcher = make_batcher()
+
+    answers = await asyncio.gather(
+        batcher.complete(user_prompt("swap a"), priority=5.0),
+        batcher.complete(user_prompt("swap b"), priority=1.0)
+    )
+
+    assert answers == ["answer a", "answer b"]
+    messages, max_tokens, priority, kwargs = calls[0]
+    assert len(calls) == 1
+    assert messages[1]["content"] == "Item 1:\nswap a\n\nItem 2:\nswap b"
+    assert max_tokens == 50 * 2 + 20
+    assert priority == 1.0
+    assert kwargs["response_format"] == {"type": "json_object"}
+    assert batcher.get_stats()["batched_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_items_missing_from_the_batch_answer_fall_back_to_single_calls(monkeypatch):
+    singles = []
+
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0, **kwargs):
+        if "response_format" in kwargs:
+            return json.dumps({"1": "answer a"})
+        singles.append(messages[-1]["content"])
+        return f"single {messages[-1]['content']}"
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    batcher = make_batcher()
+
+    answers = await asyncio.gather(
+        batcher.complete(user_prompt("swap a")),
+        batcher.complete(user_prompt("swap b"))
+    )
+
+    assert answers == ["answer a", "single swap b"]
+    assert singles == ["swap b"]
+    assert batcher.get_stats()["fallback_items"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unparseable_batch_falls_back_for_every_item(monkeypatch):
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0, **kwargs):
+        if "response_format" in kwargs:
+            return "Sure! Here are the answers: ..."
+        if messages[-1]["content"] == "swap b":
+            raise Exception("openai down")
+        return "single answer"
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    batcher = make_batcher()
+
+    results = await asyncio.gather(
+        batcher.complete(user_prompt("swap a")),
+        batcher.complete(user_prompt("swap b")),
+        return_exceptions=True
+    )
+
+    assert results[0] == "single answer"
+    assert str(results[1]) == "openai down"
+    stats = batcher.get_stats()
+    assert stats["failed_batches"] == 1
+    assert stats["fallback_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_full_batch_goes_out_without_waiting_for_the_window(monkeypatch):
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0, **kwargs):
+        return json.dumps({"1": "a", "2": "b"})
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    batcher = make_batcher(max_items=2)
+    batcher.window_seconds = 60
+
+    answers = await asyncio.wait_for(asyncio.gather(
+        batcher.complete(user_prompt("swap a")),
+        batcher.complete(user_prompt("swap b"))
+    ), timeout=1)
+
+    assert answers == ["a", "b"]
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from app import main
+from app.graph import workflow
+from app.graph.records import CheckResult
+from app.models import SwapValidationRequest
+from app.utils.request_context import DeadlineExceeded, RequestContext, deadline_checked
+
+
+def swap_request():
+    return SwapValidationRequest(
+        swap_id=1, requester_id=1, requester_shift_id=10, target_employee_id=2, target_shift_id=20
+    )
+
+
+class HangingGraph:
+    """Finishes two of the checks, then never gets any further."""
+
+    async def astream(self, state, stream_mode="updates"):
+        yield {"check_availability": {
+            "availability_check": CheckResult("availability", True, "hard", "Target is free")
+        }}
+        yield {"check_staffing": {
+            "staffing_check": CheckResult("staffing", False, "soft", "Department would be short")
+        }}
+        await asyncio.sleep(60)
+        yield {"make_decision": {"decision": "approve"}}
+
+
+@pytest.mark.asyncio
+async def test_validation_past_its_deadline_returns_partial_checks(monkeypatch):
+    monkeypatch.setattr(workflow, "validation_app", HangingGraph())
+    monkeypatch.setattr(main.settings, "validation_deadline_reserve_ms", 0)
+
+    started = time.monotonic()
+    response = await main.run_validation(swap_request(), deadline=time.monotonic() + 0.2)
+
+    assert time.monotonic() - started < 2
+    assert response.decision == "requires_review"
+    assert not response.validation_passed
+    assert [check.check_name for check in response.checks] == ["availability", "staffing"]
+    assert "Unfinished checks: fatigue, compliance." in response.reasoning
+    assert response.risk_factors == [
+        "Validation deadline exceeded - manual review required",
+        "Department would be short"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_nodes_do_not_start_after_the_deadline():
+    calls = []
+
+    @deadline_checked("check_fatigue")
+    async def node(state):
+        calls.append(state)
+        return {}
+
+    RequestContext.new(swap_id=1, deadline=time.monotonic() + 60)
+    assert await node({"swap_id": 1}) == {}
+
+    RequestContext.new(swap_id=1, deadline=time.monotonic() - 1)
+    with pytest.raises(DeadlineExceeded):
+        await node({"swap_id": 1})
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_within_deadline_keeps_the_reserve():
+    RequestContext.new(swap_id=1, deadline=time.monotonic() + 0.3)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await RequestContext.within_deadline(asyncio.sleep(1), reserve_seconds=0.25)
+
+    RequestContext.new(swap_id=1)
+    assert await RequestContext.within_deadline(asyncio.sleep(0, result="done"), reserve_seconds=5) == "done"
+
+
+def test_resolve_deadline_prefers_the_callers_budget(monkeypatch):
+    monkeypatch.setattr(main.settings, "validation_deadline_seconds", 25.0)
+    now = time.monotonic()
+
+    assert main.resolve_deadline(500) == pytest.approx(now + 0.5, abs=0.1)
+    assert main.resolve_deadline(None) == pytest.approx(now + 25.0, abs=0.1)
+
+    monkeypatch.setattr(main.settings, "validation_deadline_seconds", 0)
+    assert main.resolve_deadline(None) is None
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.graph.executor import DirectExecutor, ShadowExecutor, END
+from app.graph.records import CheckResult
+
+ROUTES = {"load_context": "make_decision", "make_decision": END}
+
+
+def make_executor(decision: str, seen_states: list) -> DirectExecutor:
+    async def load_context(state):
+        seen_states.append(dict(state))
+        return {"error": None}
+
+    async def make_decision(state):
+        return {
+            "decision": decision,
+            "confidence": 0.9,
+            "all_checks": [CheckResult("availability", decision != "auto_reject", "hard", decision)]
+        }
+
+    return DirectExecutor({"load_context": load_context, "make_decision": make_decision}, ROUTES)
+
+
+async def run_like_main(executor, state):
+    # main.run_graph merges every update into the caller's dict.
+    async for update in executor.astream(state, stream_mode="updates"):
+        for node_update in update.values():
+            if node_update:
+                state.update(node_update)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_shadow_mismatch_is_reported():
+    primary_seen, shadow_seen = [], []
+    executor = ShadowExecutor(
+        make_executor("auto_approve", primary_seen),
+        make_executor("auto_reject", shadow_seen),
+        sample_rate=1.0,
+        primary_name="primary",
+        shadow_name="shadow"
+    )
+
+    state = await run_like_main(executor, {"swap_id": 7, "decision": None, "all_checks": []})
+    await asyncio.gather(*executor._tasks)
+
+    assert state["decision"] == "auto_approve"
+    stats = executor.get_stats()
+    assert stats["runs"] == 1
+    assert stats["mismatches"] == 1
+    differences = stats["last_mismatch"]["differences"]
+    assert any(difference.startswith("decision:") for difference in differences)
+    assert any(difference.startswith("availability:") for difference in differences)
+
+
+@pytest.mark.asyncio
+async def test_shadow_starts_from_the_initial_state():
+    shadow_seen = []
+    executor = ShadowExecutor(
+        make_executor("auto_approve", []),
+        make_executor("auto_approve", shadow_seen),
+        sample_rate=1.0,
+        primary_name="primary",
+        shadow_name="shadow"
+    )
+
+    await run_like_main(executor, {"swap_id": 7, "decision": None, "all_checks": []})
+    await asyncio.gather(*executor._tasks)
+
+    assert shadow_seen == [{"swap_id": 7, "decision": None, "all_checks": []}]
+    assert executor.get_stats()["matches"] == 1
@@ -0,0 +1,171 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.graph import nodes
+from app.graph.explanations import ExplanationStore
+from app.graph.offline import OfflineBatchQueue, OpenAIBatchBackend, LocalBatchBackend
+from app.graph.records import CheckResult, EmployeeRecord, ShiftRecord
+from app.utils.request_context import RequestContext
+
+
+def make_queue(backend) -> OfflineBatchQueue:
+    return OfflineBatchQueue(
+        "decision", model="gpt-4o", temperature=0.4, max_tokens=150,
+        interval_seconds=60, max_items=50, backend=backend
+    )
+
+
+class RecordingBackend:
+    name = "recording"
+    completion_window_seconds = 0.0
+
+    def __init__(self, answer_ids=None, error=None):
+        self.batches = []
+        self.answer_ids = answer_ids
+        self.error = error
+
+    async def run(self, requests):
+        self.batches.append(requests)
+        if self.error is not None:
+            raise self.error
+        return {
+            custom_id: f"answer to {body['messages'][-1]['content']}"
+            for custom_id, body in requests.items()
+            if self.answer_ids is None or custom_id in self.answer_ids
+        }
+
+
+@pytest.mark.asyncio
+async def test_offline_queue_sends_jobs_as_one_batch():
+    backend = RecordingBackend()
+    queue = OfflineBatchQueue(
+        "decision", model="gpt-4o", temperature=0.4, max_tokens=150,
+        interval_seconds=0.05, max_items=10, backend=backend
+    )
+
+    answers = await asyncio.gather(*(
+        queue.complete([{"role": "user", "content": f"swap {i}"}], priority=1000.0) for i in range(3)
+    ))
+
+    assert answers == ["answer to swap 0", "answer to swap 1", "answer to swap 2"]
+    assert len(backend.batches) == 1
+    body = next(iter(backend.batches[0].values()))
+    assert (body["model"], body["temperature"], body["max_tokens"]) == ("gpt-4o", 0.4, 150)
+
+
+@pytest.mark.asyncio
+async def test_offline_jobs_without_an_answer_fail():
+    backend = RecordingBackend(answer_ids={"decision-1"})
+    queue = OfflineBatchQueue(
+        "decision", model="gpt-4o", temperature=0.4, max_tokens=150,
+        interval_seconds=60, max_items=2, backend=backend
+    )
+
+    results = await asyncio.wait_for(asyncio.gather(
+        queue.complete([{"role": "user", "content": "swap a"}]),
+        queue.complete([{"role": "user", "content": "swap b"}]),
+        return_exceptions=True
+    ), timeout=1)
+
+    assert results[0] == "answer to swap a"
+    assert "No answer for decision-2" in str(results[1])
+
+    backend.error = Exception("batch expired")
+    failed = await asyncio.gather(
+        queue.complete([{"role": "user", "content": "swap c"}]),
+        queue.complete([{"role": "user", "content": "swap d"}]),
+        return_exceptions=True
+    )
+    assert all(isinstance(result, Exception) for result in failed)
+    assert queue.get_stats()["failed"] == 3
+
+
+def test_offline_completion_window_covers_the_backend():
+    assert make_queue(OpenAIBatchBackend(poll_seconds=30)).completion_window_seconds == 24 * 3600 + 90
+    assert make_queue(LocalBatchBackend(concurrency=2)).completion_window_seconds == 60
+
+
+@pytest.mark.asyncio
+async def test_pending_entry_outlives_the_completion_window():
+    store = ExplanationStore(ttl_seconds=3600)
+    release = asyncio.Event()
+
+    async def generate():
+        await release.wait()
+        return "Approved: both employees are within safe limits."
+
+    store.schedule("abc123", 7, generate, pending_seconds=24 * 3600 + 90)
+    pending = store._entries.get_entry_nowait("abc123")
+    assert pending.value["status"] == "pending"
+    assert pending.ttl_seconds == 24 * 3600 + 90
+
+    release.set()
+    await asyncio.gather(*store._tasks)
+    ready = store._entries.get_entry_nowait("abc123")
+    assert ready.value["status"] == "ready"
+    assert ready.ttl_seconds == 3600
+
+
+def decision_state():
+    tomorrow = date.today() + timedelta(days=1)
+    return {
+        "swap_id": 7,
+        "requester_id": 1,
+        "target_employee_id": 2,
+        "requester_data": EmployeeRecord(id=1, full_name="Requester"),
+        "target_data": EmployeeRecord(id=2, full_name="Target"),
+        "requester_shift_data": ShiftRecord.from_payload({"id": 10, "shift_date": tomorrow.isoformat()}),
+        "target_shift_data": ShiftRecord.from_payload({"id": 20, "shift_date": tomorrow.isoformat()}),
+        "availability_check": CheckResult("availability", True, "hard", "Target is free"),
+        "prefetched": None,
+        "error": None
+    }
+
+
+@pytest.mark.asyncio
+async def test_deferred_decision_answers_with_template_and_schedules_explanation(monkeypatch):
+    store = ExplanationStore()
+    release = asyncio.Event()
+    calls = []
+
+    async def complete_chat(messages, **kwargs):
+        calls.append(kwargs)
+        await release.wait()
+        return "Approved: Target is free that day."
+
+    monkeypatch.setattr(nodes, "complete_chat", complete_chat)
+    monkeypatch.setattr(nodes, "explanation_store", store)
+    monkeypatch.setattr(nodes.settings, "reasoning_mode", "deferred")
+    monkeypatch.setattr(nodes.settings, "offline_llm_enabled", False)
+    correlation_id = RequestContext.new(swap_id=7)
+
+    result = await nodes.make_decision_node(decision_state())
+
+    assert result["decision"] == "auto_approve"
+    assert result["explanation_status"] == "pending"
+    assert result["reasoning"] == nodes.render_template_reasoning("auto_approve", [], [])
+    assert store.get(correlation_id)["status"] == "pending"
+
+    release.set()
+    await asyncio.gather(*store._tasks)
+
+    assert store.get(correlation_id)["status"] == "ready"
+    assert store.get(correlation_id)["reasoning"] == "Approved: Target is free that day."
+    assert calls[0]["priority"] >= nodes.BACKGROUND_PRIORITY
+
+
+@pytest.mark.asyncio
+async def test_failed_explanation_is_recorded():
+    store = ExplanationStore()
+
+    async def generate():
+        raise Exception("openai down")
+
+    store.schedule("def456", 7, generate)
+    await asyncio.gather(*store._tasks)
+
+    assert store.get("def456")["status"] == "failed"
+    assert store.get("def456")["error"] == "openai down"
+    assert store.get_stats()["failed"] == 1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.graph.tools import laravel_client
+from app.utils.cache import CacheKeys, CachePolicies, get_cache
+
+
+def test_entity_events_map_to_their_keys():
+    assert CacheKeys.for_entity("employee", entity_id=3) == ["employee:3", "employee_shifts:3"]
+    assert CacheKeys.for_entity("availability", employee_id=3) == ["availability:3:*"]
+    assert CacheKeys.for_entity("availability", employee_id=3, date="2026-01-05") == ["availability:3:2026-01-05"]
+    assert CacheKeys.for_entity("shift", entity_id=7) == ["shift:7", "shift_assignments:7"]
+    assert CacheKeys.for_entity("assignment", employee_id=3, shift_id=7) == ["shift_assignments:7", "employee_shifts:3"]
+
+    with pytest.raises(ValueError):
+        CacheKeys.for_entity("assignment", shift_id=7)
+    with pytest.raises(ValueError):
+        CacheKeys.for_entity("department", entity_id=1)
+
+
+def test_invalidate_endpoint_requires_the_agent_token(monkeypatch):
+    client = TestClient(main.app)
+    body = {"keys": ["employee:1"]}
+
+    monkeypatch.setattr(main.settings, "agent_api_token", None)
+    assert client.post("/api/cache/invalidate", json=body).status_code == 503
+
+    monkeypatch.setattr(main.settings, "agent_api_token", "shared-secret")
+    assert client.post("/api/cache/invalidate", json=body).status_code == 401
+    assert client.post("/api/cache/invalidate", json=body, headers={"X-Agent-Token": "wrong"}).status_code == 401
+
+    response = client.post(
+        "/api/cache/invalidate",
+        json={"events": [{"entity": "department", "id": 1}]},
+        headers={"X-Agent-Token": "shared-secret"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_keys_and_patterns():
+    cache = get_cache()
+    await cache.set("employee:41", {"id": 41}, ttl=600)
+    await cache.set("availability:41:2026-01-05", {"available": True}, ttl=600)
+    await cache.set("availability:41:2026-01-06", {"available": False}, ttl=600)
+    await cache.set("availability:42:2026-01-05", {"available": True}, ttl=600)
+
+    removed = await laravel_client.invalidate(["employee:41", "availability:41:*"])
+
+    assert removed == 3
+    assert await cache.get("employee:41") is None
+    assert await cache.get("availability:41:2026-01-06") is None
+    assert await cache.get("availability:42:2026-01-05") == {"available": True}
+
+
+@pytest.mark.asyncio
+async def test_fetch_started_before_an_invalidation_is_not_cached(monkeypatch):
+    release = asyncio.Event()
+
+    async def fetch(endpoint):
+        await release.wait()
+        return {"id": 43, "full_name": "Old name"}
+
+    monkeypatch.setattr(laravel_client, "_get", fetch)
+    fetching = asyncio.create_task(
+        laravel_client._fetch_and_cache("employee:43", "agent/employees/43", CachePolicies.EMPLOYEE)
+    )
+    await asyncio.sleep(0)
+    await laravel_client.invalidate(["employee:43"])
+    release.set()
+
+    # The caller still gets its answer, but the cache doesn't keep it.
+    assert await fetching == {"id": 43, "full_name": "Old name"}
+    assert await get_cache().get("employee:43") is None
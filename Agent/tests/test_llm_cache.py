@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from app.graph import llm
+from app.utils.llm_cache import LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "Explain the fatigue check."}]
+
+
+def test_key_depends_on_inputs_not_their_order():
+    first = LLMResponseCache.make_key("fatigue", {"target_after": 65, "requester_current": 40})
+    second = LLMResponseCache.make_key("fatigue", {"requester_current": 40, "target_after": 65})
+
+    assert first == second
+    assert first != LLMResponseCache.make_key("fatigue", {"requester_current": 40, "target_after": 70})
+    assert first != LLMResponseCache.make_key("decision", {"requester_current": 40, "target_after": 65})
+
+
+@pytest.fixture
+def llm_cache(monkeypatch):
+    cache = LLMResponseCache()
+    monkeypatch.setattr(llm, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(llm.settings, "llm_cache_enabled", True)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_same_inputs_share_one_completion(monkeypatch, llm_cache):
+    calls = []
+
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0):
+        calls.append(messages)
+        await asyncio.sleep(0.01)
+        return "Both employees stay within safe limits."
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    inputs = {"requester_current": 40, "target_after": 65}
+
+    answers = await asyncio.gather(*(
+        llm.complete_chat(MESSAGES, cache_kind="fatigue", cache_inputs=inputs) for _ in range(3)
+    ))
+    tokens = []
+    streamed = await llm.complete_chat(MESSAGES, cache_kind="fatigue", cache_inputs=inputs, on_token=tokens.append)
+
+    assert len(calls) == 1
+    assert set(answers) == {streamed} == {"Both employees stay within safe limits."}
+    assert tokens == [streamed]
+
+    await llm.complete_chat(MESSAGES, cache_kind="fatigue", cache_inputs={**inputs, "target_after": 70})
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_calls_every_time(monkeypatch, llm_cache):
+    calls = []
+
+    async def create_completion(messages, model, temperature, max_tokens, priority=0.0):
+        calls.append(messages)
+        return "answer"
+
+    monkeypatch.setattr(llm, "_create_completion", create_completion)
+    monkeypatch.setattr(llm.settings, "llm_cache_enabled", False)
+
+    for _ in range(2):
+        await llm.complete_chat(MESSAGES, cache_kind="fatigue", cache_inputs={"requester_current": 40})
+
+    assert len(calls) == 2
+
+
+def test_persisted_entries_reload_until_they_expire(tmp_path):
+    path = str(tmp_path / "llm_cache.json")
+    cache = LLMResponseCache(ttl_seconds=60, path=path)
+    cache.set("llm:fatigue:fresh", "still good")
+    cache._cache.set_nowait("llm:fatigue:old", "too old", ttl=60, created_at=time.time() - 120)
+    cache.save()
+
+    reloaded = LLMResponseCache(ttl_seconds=60, path=path)
+    reloaded.load()
+
+    assert reloaded.get("llm:fatigue:fresh") == "still good"
+    assert reloaded.get("llm:fatigue:old") is None
+
+
+@pytest.mark.asyncio
+async def test_autosave_writes_new_entries_before_shutdown(tmp_path):
+    path = tmp_path / "llm_cache.json"
+    cache = LLMResponseCache(ttl_seconds=60, path=str(path))
+    cache.start_autosave(0.01)
+    try:
+        cache.set("llm:fatigue:new", "saved early")
+        for _ in range(100):
+            if path.exists():
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await cache.stop_autosave()
+
+    reloaded = LLMResponseCache(ttl_seconds=60, path=str(path))
+    reloaded.load()
+    assert reloaded.get("llm:fatigue:new") == "saved early"
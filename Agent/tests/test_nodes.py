@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.graph import nodes
+from app.graph.records import EmployeeRecord, ShiftRecord
+from app.utils.request_context import RequestContext
+
+
+def fatigue_state():
+    tomorrow = date.today() + timedelta(days=1)
+    return {
+        "swap_id": 1,
+        "requester_id": 1,
+        "target_employee_id": 2,
+        "requester_data": EmployeeRecord(id=1, full_name="Requester"),
+        "target_data": EmployeeRecord(id=2, full_name="Target"),
+        "requester_shift_data": ShiftRecord.from_payload(
+            {"id": 10, "shift_date": tomorrow.isoformat(), "shift_type": "day"}
+        ),
+        "target_shift_data": ShiftRecord.from_payload(
+            {"id": 20, "shift_date": (tomorrow + timedelta(days=1)).isoformat(), "shift_type": "day"}
+        ),
+        "prefetched": None,
+        "error": None
+    }
+
+
+@pytest.mark.asyncio
+async def test_fatigue_prompt_is_built_from_the_cache_key(monkeypatch):
+    RequestContext.new(swap_id=1)
+    scores = {1: 41, 2: 58}
+    calls = []
+
+    async def get_fatigue_score(employee_id):
+        return {"total_score": scores[employee_id], "risk_level": "moderate"}
+
+    async def complete_chat(messages, **kwargs):
+        calls.append((messages, kwargs))
+        return "Target would be over the threshold."
+
+    monkeypatch.setattr(nodes.laravel_client, "get_fatigue_score", get_fatigue_score)
+    monkeypatch.setattr(nodes, "complete_chat", complete_chat)
+    monkeypatch.setattr(nodes.settings, "reasoning_mode", "llm")
+
+    result = await nodes.check_fatigue_node(fatigue_state())
+
+    check = result["fatigue_check"]
+    assert not check.passed
+    assert check.details["target_after"] == 63
+    assert check.details["ai_analysis_source"] == "llm"
+
+    messages, kwargs = calls[0]
+    prompt = messages[1]["content"]
+    # The prompt only carries what the cache key does.
+    assert "Current fatigue score: about 40" in prompt
+    assert "Projected after swap: about 65 (at or above the high-risk threshold)" in prompt
+    assert "41" not in prompt and "63" not in prompt
+    assert prompt == nodes.build_fatigue_context(kwargs["cache_inputs"])
+
+    cache_inputs = kwargs["cache_inputs"]
+    assert cache_inputs["requester_current"] == 40
+    assert cache_inputs["target_after"] == 65
+    assert cache_inputs["requester_at_risk"] is False
+    assert cache_inputs["target_at_risk"] is True
+
+
+@pytest.mark.asyncio
+async def test_deferred_fatigue_analysis_is_marked_as_template(monkeypatch):
+    RequestContext.new(swap_id=1)
+
+    async def get_fatigue_score(employee_id):
+        return {"total_score": 58, "risk_level": "high"}
+
+    async def complete_chat(messages, **kwargs):
+        raise AssertionError("deferred mode must not block on the LLM")
+
+    monkeypatch.setattr(nodes.laravel_client, "get_fatigue_score", get_fatigue_score)
+    monkeypatch.setattr(nodes, "complete_chat", complete_chat)
+    monkeypatch.setattr(nodes.settings, "reasoning_mode", "deferred")
+
+    check = (await nodes.check_fatigue_node(fatigue_state()))["fatigue_check"]
+
+    assert not check.passed
+    assert check.details["ai_analysis_source"] == "template"
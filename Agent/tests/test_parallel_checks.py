@@ -0,0 +1,101 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from app.graph import nodes
+from app.graph.records import CheckResult, EmployeeRecord, ShiftRecord
+from app.graph.workflow import create_direct_executor
+from app.utils.request_context import RequestContext
+
+
+def stub_check(check_name, passed=True, severity="soft", delay=0.0, started=None):
+    async def check(state):
+        if started is not None:
+            started.append(check_name)
+        await asyncio.sleep(delay)
+        message = f"{check_name} ok" if passed else f"{check_name} failed"
+        return {f"{check_name}_check": CheckResult(check_name, passed, severity, message)}
+
+    return check
+
+
+async def load_context(state):
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    return {
+        "requester_data": EmployeeRecord(id=1, full_name="Requester"),
+        "target_data": EmployeeRecord(id=2, full_name="Target"),
+        "requester_shift_data": ShiftRecord.from_payload({"id": 10, "shift_date": tomorrow}),
+        "target_shift_data": ShiftRecord.from_payload({"id": 20, "shift_date": tomorrow}),
+        "prefetched": None,
+        "error": None
+    }
+
+
+def initial_state():
+    return {"swap_id": 1, "requester_id": 1, "target_employee_id": 2}
+
+
+@pytest.mark.asyncio
+async def test_hard_failure_cancels_the_checks_still_running(monkeypatch):
+    RequestContext.new(swap_id=1)
+    started = []
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "availability", stub_check("availability", False, "hard"))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "fatigue", stub_check("fatigue", delay=60, started=started))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "staffing", stub_check("staffing", delay=60, started=started))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "compliance", stub_check("compliance", delay=60, started=started))
+
+    results = await asyncio.wait_for(nodes.run_checks_node(initial_state()), timeout=1)
+
+    assert results["availability_check"].is_hard_failure
+    assert sorted(started) == ["compliance", "fatigue", "staffing"]
+    assert set(results) == {"availability_check"}
+
+
+@pytest.mark.asyncio
+async def test_slow_check_becomes_a_soft_timeout(monkeypatch):
+    RequestContext.new(swap_id=1)
+    monkeypatch.setattr(nodes.settings, "check_timeout_seconds", 0.05)
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "availability", stub_check("availability"))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "fatigue", stub_check("fatigue"))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "staffing", stub_check("staffing", delay=60))
+    monkeypatch.setitem(nodes.PARALLEL_CHECKS, "compliance", stub_check("compliance"))
+
+    results = await asyncio.wait_for(nodes.run_checks_node(initial_state()), timeout=1)
+
+    staffing = results["staffing_check"]
+    assert not staffing.passed
+    assert staffing.severity == "soft"
+    assert staffing.details["needs_manual_review"] is True
+    assert results["compliance_check"].passed
+
+
+@pytest.mark.parametrize("outcomes, decision", [
+    ({}, "auto_approve"),
+    ({"staffing": (False, "soft")}, "requires_review"),
+    ({"availability": (False, "hard")}, "auto_reject"),
+    ({"fatigue": (False, "hard"), "compliance": (False, "soft")}, "auto_reject"),
+])
+@pytest.mark.asyncio
+async def test_parallel_and_sequential_reach_the_same_decision(monkeypatch, outcomes, decision):
+    async def complete_chat(messages, **kwargs):
+        raise Exception("no LLM in tests")
+
+    monkeypatch.setattr(nodes, "complete_chat", complete_chat)
+    monkeypatch.setattr(nodes.settings, "reasoning_mode", "llm")
+    checks = {
+        f"check_{name}": stub_check(name, *outcomes.get(name, (True, "soft")))
+        for name in nodes.PARALLEL_CHECKS
+    }
+    for name in nodes.PARALLEL_CHECKS:
+        monkeypatch.setitem(nodes.PARALLEL_CHECKS, name, checks[f"check_{name}"])
+    overrides = {"load_context": load_context, **checks}
+
+    results = []
+    for parallel in (False, True):
+        RequestContext.new(swap_id=1)
+        state = await create_direct_executor(parallel=parallel, nodes=overrides).ainvoke(initial_state())
+        results.append((state["decision"], state["confidence"], state["reasoning"]))
+
+    assert results[0] == results[1]
+    assert results[0][0] == decision
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+from app.graph.tools import laravel_client
+
+
+def test_pool_stats_survive_unexpected_httpcore_internals(monkeypatch):
+    monkeypatch.setattr(laravel_client, "_transport", SimpleNamespace(_pool=object()))
+
+    stats = laravel_client.get_pool_stats()
+
+    assert stats["in_use"] is None and stats["idle"] is None and stats["waiting"] is None
+    assert "waits_estimate" in stats
+
+
+def test_pool_stats_count_connections(monkeypatch):
+    connections = [SimpleNamespace(is_idle=lambda: True), SimpleNamespace(is_idle=lambda: False)]
+    pool = SimpleNamespace(connections=connections, _requests=[SimpleNamespace(connection=None)])
+    monkeypatch.setattr(laravel_client, "_transport", SimpleNamespace(_pool=pool))
+
+    stats = laravel_client.get_pool_stats()
+
+    assert (stats["in_use"], stats["idle"], stats["waiting"]) == (1, 1, 1)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.graph.prefetch import prefetch_stats, start_prefetch, use_prefetched, release_prefetch
+from app.utils.request_context import RequestContext
+
+
+async def fail_fetch():
+    raise AssertionError("should have used the prefetch")
+
+
+@pytest.mark.asyncio
+async def test_use_prefetched_awaits_only_its_key():
+    RequestContext.new(swap_id=1)
+    slow_started = asyncio.Event()
+
+    async def fast():
+        return "fast"
+
+    async def slow():
+        slow_started.set()
+        await asyncio.sleep(60)
+        return "slow"
+
+    state = {"prefetched": start_prefetch({"fast": fast, "slow": slow})}
+    await slow_started.wait()
+
+    # Returns as soon as "fast" is done; "slow" is still in flight.
+    assert await asyncio.wait_for(use_prefetched(state, "fast", fail_fetch), timeout=1) == "fast"
+    assert not state["prefetched"]["slow"].done()
+
+    wasted = prefetch_stats.get_stats()["wasted_by_key"].get("slow", 0)
+    release_prefetch(state)
+    await asyncio.sleep(0)
+    assert state["prefetched"]["slow"].cancelled()
+    assert prefetch_stats.get_stats()["wasted_by_key"]["slow"] == wasted + 1
+    assert "fast" not in prefetch_stats.get_stats()["wasted_by_key"]
+
+    # A second release (main after make_decision) doesn't count it again.
+    release_prefetch(state)
+    assert prefetch_stats.get_stats()["wasted_by_key"]["slow"] == wasted + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_falls_back_to_fetch():
+    RequestContext.new(swap_id=2)
+
+    async def broken():
+        raise Exception("laravel down")
+
+    async def fetch():
+        return "fetched"
+
+    state = {"prefetched": start_prefetch({"broken": broken})}
+    failed = prefetch_stats.get_stats()["failed"]
+
+    assert await use_prefetched(state, "broken", fetch) == "fetched"
+    assert await use_prefetched({"prefetched": None}, "missing", fetch) == "fetched"
+    assert prefetch_stats.get_stats()["failed"] == failed + 1
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.graph import llm
+from app.utils.rate_limiter import OpenAIRateLimiter
+
+
+def drained_limiter() -> OpenAIRateLimiter:
+    # 60 RPM refills one request per second; use up the initial burst.
+    limiter = OpenAIRateLimiter(rpm=60, tpm=0)
+    for _ in range(60):
+        limiter._take(1)
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_interactive_caller_gives_up_after_max_wait():
+    limiter = drained_limiter()
+
+    with pytest.raises(Exception, match="no capacity"):
+        await limiter.acquire(1, priority=0, max_wait_seconds=0.05)
+    assert limiter.get_stats()["queue_timeouts"] == 1
+    assert limiter.get_stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_priority_order():
+    limiter = drained_limiter()
+    order = []
+
+    async def acquire(name, priority):
+        await limiter.acquire(1, priority=priority, max_wait_seconds=None)
+        order.append(name)
+
+    await asyncio.wait_for(asyncio.gather(
+        acquire("background", llm.BACKGROUND_PRIORITY),
+        acquire("interactive", 0)
+    ), timeout=5)
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_background_calls_are_not_capped_by_the_queue_wait(monkeypatch):
+    limiter = drained_limiter()
+    monkeypatch.setattr(llm, "openai_rate_limiter", limiter)
+    monkeypatch.setattr(llm.settings, "openai_queue_max_wait_seconds", 0.05)
+
+    async def send():
+        return "ok"
+
+    with pytest.raises(Exception, match="no capacity"):
+        await llm._rate_limited(send, 1, priority=0)
+    assert await asyncio.wait_for(llm._rate_limited(send, 1, priority=llm.BACKGROUND_PRIORITY), timeout=5) == "ok"
+
+
+def openai_request() -> httpx.Request:
+    return httpx.Request("POST", "https://api.openai.test/v1/chat/completions")
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_with_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "openai_rate_limiter", OpenAIRateLimiter(rpm=0, tpm=0))
+    monkeypatch.setattr(llm, "_retry_backoff", lambda attempt: 0.0)
+    errors = [
+        openai.APITimeoutError(request=openai_request()),
+        openai.InternalServerError("overloaded", response=httpx.Response(503, request=openai_request()), body=None)
+    ]
+
+    async def send():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert await llm._rate_limited(send, 1, priority=0) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_transient_retries_are_capped(monkeypatch):
+    monkeypatch.setattr(llm, "openai_rate_limiter", OpenAIRateLimiter(rpm=0, tpm=0))
+    monkeypatch.setattr(llm, "_retry_backoff", lambda attempt: 0.0)
+    calls = []
+
+    async def send():
+        calls.append(1)
+        raise openai.APIConnectionError(request=openai_request())
+
+    with pytest.raises(openai.APIConnectionError):
+        await llm._rate_limited(send, 1, priority=0)
+    assert len(calls) == llm.settings.openai_transient_retries + 1
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from app.graph.executor import DirectExecutor, END
+from app.graph.records import CheckResult, EmployeeRecord, ShiftRecord
+
+
+def test_shift_record_parses_its_dates_once():
+    shift = ShiftRecord.from_payload({
+        "id": 10,
+        "shift_date": "2026-01-05",
+        "start_time": "07:00:00",
+        "end_time": "15:30:00",
+        "required_staff_count": 3,
+        "department_id": 4
+    })
+
+    assert shift.start == datetime(2026, 1, 5, 7, 0)
+    assert shift.end == datetime(2026, 1, 5, 15, 30)
+    assert shift.day == datetime(2026, 1, 5)
+    assert shift.hours == 8.5
+    assert (shift.shift_type, shift.required_staff_count, shift.department_id) == ("day", 3, 4)
+
+
+def test_overnight_shift_hours_wrap_past_midnight():
+    shift = ShiftRecord.from_payload({"shift_date": "2026-01-05", "start_time": "22:00:00", "end_time": "06:00:00"})
+
+    assert shift.hours == 8.0
+
+
+def test_unparseable_shift_date_leaves_no_day():
+    shift = ShiftRecord.from_payload({"shift_date": "next tuesday"})
+
+    assert shift.day is None
+    assert isinstance(shift.start, datetime)
+
+
+def test_employee_record_keeps_only_what_the_graph_reads():
+    employee = EmployeeRecord.from_payload({"id": 2, "full_name": "", "is_active": True, "email": "x@test.local"})
+
+    assert employee.name("Unknown") == "Unknown"
+    assert not hasattr(employee, "email")
+    with pytest.raises(AttributeError):
+        employee.email = "x@test.local"
+
+
+def test_check_result_serializes_for_the_stream():
+    check = CheckResult("fatigue", False, "hard", "Too tired", {"target_after": 63})
+
+    assert check.is_hard_failure
+    assert check.to_dict() == {
+        "check_name": "fatigue",
+        "passed": False,
+        "severity": "hard",
+        "message": "Too tired",
+        "details": {"target_after": 63}
+    }
+    assert not CheckResult("staffing", False, "soft", "Short").is_hard_failure
+
+
+@pytest.mark.asyncio
+async def test_node_deltas_are_merged_into_the_state():
+    async def load_context(state):
+        return {"requester_data": EmployeeRecord(id=1, full_name="Requester")}
+
+    async def make_decision(state):
+        assert state["requester_data"].full_name == "Requester"
+        return {"decision": "auto_approve"}
+
+    executor = DirectExecutor(
+        {"load_context": load_context, "make_decision": make_decision},
+        {"load_context": "make_decision", "make_decision": END}
+    )
+
+    state = await executor.ainvoke({"swap_id": 1, "swap_reason": "Family event"})
+
+    assert state["swap_id"] == 1
+    assert state["swap_reason"] == "Family event"
+    assert state["decision"] == "auto_approve"
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.graph import tools
+from app.graph.tools import LaravelAPIClient, RetryBudget
+from app.utils.request_context import RequestContext
+
+
+def server_error(status: int = 503) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "http://laravel.test/api/agent/employees/7")
+    return httpx.HTTPStatusError("server error", request=request, response=httpx.Response(status, request=request))
+
+
+def make_client(monkeypatch, responses) -> LaravelAPIClient:
+    """A client whose GETs play back `responses` in order: an exception to
+    raise, a (delay, result) pair, or a plain result."""
+    client = LaravelAPIClient()
+    calls = []
+
+    async def make_request(endpoint):
+        response = responses[len(calls)]
+        calls.append(endpoint)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, tuple):
+            delay, response = response
+            await asyncio.sleep(delay)
+        return response
+
+    monkeypatch.setattr(client, "_make_request", make_request)
+    monkeypatch.setattr(client, "_backoff", lambda attempt: 0.0)
+    client.calls = calls
+    return client
+
+
+def test_retry_budget_drains_and_refills():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_balance=2.0)
+
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+
+    trickle = RetryBudget(ratio=0.1, min_per_second=10.0, max_balance=2.0)
+    trickle.balance = 0.0
+    trickle._refilled_at -= 0.1
+    assert trickle.try_spend()
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_within_the_budget(monkeypatch):
+    RequestContext.new(swap_id=1)
+    client = make_client(monkeypatch, [server_error(), server_error(502), {"id": 7}])
+
+    assert await client._get("agent/employees/7") == {"id": 7}
+    assert len(client.calls) == 3
+    assert client._traffic_for("agent/employees/7").counts["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_stops_retries(monkeypatch):
+    RequestContext.new(swap_id=1)
+    client = make_client(monkeypatch, [server_error(), {"id": 7}])
+    client.retry_budget = RetryBudget(ratio=0.1, min_per_second=0.0)
+    client.retry_budget.balance = 0.0
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._get("agent/employees/7")
+
+    assert len(client.calls) == 1
+    assert client._traffic_for("agent/employees/7").counts["retries_denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(monkeypatch):
+    RequestContext.new(swap_id=1)
+    client = make_client(monkeypatch, [server_error(404), {"id": 7}])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client._get("agent/employees/7")
+
+    assert len(client.calls) == 1
+    assert client._breaker_for("agent/employees/7").failure_count == 0
+
+
+def enable_hedging(monkeypatch, client: LaravelAPIClient, endpoint: str):
+    monkeypatch.setattr(tools.settings, "laravel_hedging", True)
+    monkeypatch.setattr(tools.settings, "laravel_hedge_min_samples", 5)
+    monkeypatch.setattr(tools.settings, "laravel_hedge_min_delay_ms", 10.0)
+    for _ in range(5):
+        client._traffic_for(endpoint).record_latency(0.02)
+
+
+@pytest.mark.asyncio
+async def test_slow_get_is_hedged_after_the_p95(monkeypatch):
+    RequestContext.new(swap_id=1)
+    client = make_client(monkeypatch, [(5.0, {"from": "primary"}), {"from": "hedge"}])
+    enable_hedging(monkeypatch, client, "agent/employees/7")
+
+    result = await asyncio.wait_for(client._get("agent/employees/7"), timeout=1)
+
+    assert result == {"from": "hedge"}
+    counts = client._traffic_for("agent/employees/7").counts
+    assert (counts["hedges"], counts["hedge_wins"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget(monkeypatch):
+    RequestContext.new(swap_id=1)
+    client = make_client(monkeypatch, [(0.05, {"from": "primary"}), {"from": "hedge"}])
+    enable_hedging(monkeypatch, client, "agent/employees/7")
+    client.retry_budget = RetryBudget(ratio=0.1, min_per_second=0.0)
+    client.retry_budget.balance = 0.0
+
+    assert await client._get("agent/employees/7") == {"from": "primary"}
+    assert len(client.calls) == 1
+    assert client._traffic_for("agent/employees/7").counts["hedges_denied"] == 1
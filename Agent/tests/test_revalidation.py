@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from app.graph.tools import laravel_client
+from app.utils.cache import CachePolicies, CachePolicy, get_cache
+from app.utils.request_context import RequestContext
+
+
+def backdate(key, seconds):
+    cache = get_cache()
+    cache._cache[key].created_at -= seconds
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_runs_without_the_request_deadline():
+    seen = []
+
+    async def fetch():
+        seen.append((RequestContext.get().get("swap_id"), RequestContext.time_remaining()))
+        return {"id": 1, "full_name": "Refreshed"}
+
+    RequestContext.new(swap_id=9, deadline=time.monotonic() + 0.001)
+    laravel_client._schedule_refresh("test:refresh:1", "agent/employees/1", CachePolicies.EMPLOYEE, fetch)
+    await asyncio.gather(*laravel_client._refresh_tasks)
+
+    # Same request identity for the logs, but no deadline to cut it short.
+    assert seen == [(9, None)]
+    assert await get_cache().get("test:refresh:1") == {"id": 1, "full_name": "Refreshed"}
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_it_refreshes(monkeypatch):
+    RequestContext.new(swap_id=1)
+    policy = CachePolicy(ttl=60, grace=60)
+    get_cache().set_nowait("test:stale:1", {"version": 1}, ttl=60, grace=60)
+    backdate("test:stale:1", 90)
+    refreshed = asyncio.Event()
+
+    async def fetch(endpoint):
+        await refreshed.wait()
+        return {"version": 2}
+
+    monkeypatch.setattr(laravel_client, "_get", fetch)
+    assert await laravel_client._cached_get("test:stale:1", "agent/employees/1", policy) == {"version": 1}
+
+    refreshed.set()
+    await asyncio.gather(*laravel_client._refresh_tasks)
+    assert await get_cache().get("test:stale:1") == {"version": 2}
+
+
+@pytest.mark.asyncio
+async def test_entry_past_its_grace_is_fetched_before_answering(monkeypatch):
+    RequestContext.new(swap_id=1)
+    policy = CachePolicy(ttl=60, grace=60)
+    get_cache().set_nowait("test:stale:2", {"version": 1}, ttl=60, grace=60)
+    backdate("test:stale:2", 150)
+
+    async def fetch(endpoint):
+        return {"version": 2}
+
+    monkeypatch.setattr(laravel_client, "_get", fetch)
+    assert await laravel_client._cached_get("test:stale:2", "agent/employees/2", policy) == {"version": 2}
+    assert not laravel_client._refresh_tasks
+
+
+@pytest.mark.asyncio
+async def test_hot_key_is_refreshed_ahead_of_expiry(monkeypatch):
+    RequestContext.new(swap_id=1)
+    policy = CachePolicy(ttl=60, grace=60, refresh_ahead=30, hot_hits=2)
+    get_cache().set_nowait("test:hot:1", {"version": 1}, ttl=60, grace=60)
+    backdate("test:hot:1", 45)
+    fetches = []
+
+    async def fetch(endpoint):
+        fetches.append(endpoint)
+        return {"version": 2}
+
+    monkeypatch.setattr(laravel_client, "_get", fetch)
+    for _ in range(3):
+        assert await laravel_client._cached_get("test:hot:1", "agent/employees/3", policy) == {"version": 1}
+    await asyncio.gather(*laravel_client._refresh_tasks)
+
+    # Refreshed once the key was hot, without any caller waiting on it.
+    assert fetches == ["agent/employees/3"]
+    assert await get_cache().get("test:hot:1") == {"version": 2}
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.cache import SingleFlight
+from app.utils.request_context import RequestContext
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"id": 1}
+
+    waiters = [asyncio.create_task(single_flight.do("employee:1", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert single_flight.get_stats()["in_flight"] == 1
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [{"id": 1}] * 5
+    assert calls == [1]
+    assert single_flight.get_stats()["in_flight"] == 0
+    assert single_flight.get_stats()["coalesced_waiters"] == 4
+
+
+@pytest.mark.asyncio
+async def test_error_fans_out_to_every_waiter_and_frees_the_key():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ConnectionError("laravel down")
+
+    waiters = [asyncio.create_task(single_flight.do("shift:3", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert single_flight.get_stats()["errors"] == 1
+    assert single_flight.get_stats()["in_flight"] == 0
+
+    async def recovered():
+        return "ok"
+
+    # The failure isn't cached: the next caller starts a fresh call.
+    assert await single_flight.do("shift:3", recovered) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "value"
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "value"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_leader_deadline_does_not_cap_followers():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+    seen_deadlines = []
+
+    async def fetch():
+        seen_deadlines.append(RequestContext.time_remaining())
+        await release.wait()
+        return "value"
+
+    async def leader():
+        RequestContext.new(swap_id=1, deadline=time.monotonic() + 0.01)
+        return await single_flight.do("key", fetch)
+
+    async def follower():
+        RequestContext.new(swap_id=2)
+        return await single_flight.do("key", fetch)
+
+    first = asyncio.create_task(leader())
+    await asyncio.sleep(0)
+    second = asyncio.create_task(follower())
+
+    with pytest.raises(asyncio.TimeoutError):
+        await first
+    release.set()
+
+    assert await second == "value"
+    assert seen_deadlines == [None]
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from app import main
+from app.utils.startup import StartupTracker
+
+
+@pytest.mark.asyncio
+async def test_warm_up_retries_failed_phase_and_cancels_siblings(monkeypatch):
+    monkeypatch.setattr(main, "startup", StartupTracker(budget_ms=10000))
+    compile_attempts = []
+    auth_cancelled = []
+
+    async def compile_graph():
+        compile_attempts.append(1)
+        if len(compile_attempts) == 1:
+            raise Exception("import failed")
+
+    async def authenticate():
+        if len(compile_attempts) == 1:
+            try:
+                await asyncio.sleep(60)  # Laravel not up yet; still retrying
+            except asyncio.CancelledError:
+                auth_cancelled.append(1)
+                raise
+
+    async def warm_connections(count):
+        return count
+
+    monkeypatch.setattr(main, "compile_graph", compile_graph)
+    monkeypatch.setattr(main, "authenticate", authenticate)
+    monkeypatch.setattr(main.laravel_client, "warm_up", warm_connections)
+
+    await asyncio.wait_for(main.warm_up(retry_delay=0.01), timeout=5)
+
+    assert len(compile_attempts) == 2
+    assert auth_cancelled == [1]
+    assert main.startup.ready
+    assert all(phase["ok"] for phase in main.startup.phases.values())
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+from app import main
+from app.graph import workflow
+from app.graph.records import CheckResult
+from app.models import SwapValidationRequest
+from app.utils.request_context import RequestContext
+
+
+class StubGraph:
+    async def astream(self, state, stream_mode="updates"):
+        yield {"load_context": {"error": None}}
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_even_if_building_the_result_fails(monkeypatch):
+    def broken_response(*args, **kwargs):
+        raise ValueError("bad state")
+
+    monkeypatch.setattr(workflow, "validation_app", StubGraph())
+    monkeypatch.setattr(main, "build_response", broken_response)
+    monkeypatch.setattr(main, "build_error_response", broken_response)
+    request = SwapValidationRequest(
+        swap_id=1, requester_id=1, requester_shift_id=10, target_employee_id=2, target_shift_id=20
+    )
+
+    async def collect():
+        return [message async for message in main.stream_validation_events(request)]
+
+    messages = await asyncio.wait_for(collect(), timeout=2)
+
+    assert messages[0].startswith("event: started")
+    assert messages[1].startswith("event: node")
+    assert messages[2].startswith("event: error")
+    assert not any(message.startswith("event: result") for message in messages)
+
+
+def parse_sse(message):
+    event, data = message.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+class DecidingGraph:
+    async def astream(self, state, stream_mode="updates"):
+        yield {"load_context": {"error": None}}
+        check = CheckResult("availability", True, "hard", "Target is free")
+        yield {"check_availability": {"availability_check": check}}
+        for token in ("Approved", "."):
+            RequestContext.emit("token", {"text": token})
+        yield {"make_decision": {
+            "decision": "auto_approve",
+            "confidence": 0.9,
+            "reasoning": "Approved.",
+            "all_checks": [check]
+        }}
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_checks_tokens_and_result(monkeypatch):
+    monkeypatch.setattr(workflow, "validation_app", DecidingGraph())
+    request = SwapValidationRequest(
+        swap_id=1, requester_id=1, requester_shift_id=10, target_employee_id=2, target_shift_id=20
+    )
+
+    events = [parse_sse(message) async for message in main.stream_validation_events(request)]
+
+    assert [event for event, _ in events] == ["started", "node", "node", "token", "token", "node", "result"]
+    assert events[2][1]["check"]["check_name"] == "availability"
+    assert "".join(data["text"] for event, data in events if event == "token") == "Approved."
+    result = events[-1][1]
+    assert result["decision"] == "auto_approve"
+    assert result["correlation_id"] == events[0][1]["correlation_id"]
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_stops_the_graph(monkeypatch):
+    cancelled = asyncio.Event()
+
+    class EndlessGraph:
+        async def astream(self, state, stream_mode="updates"):
+            yield {"load_context": {"error": None}}
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            yield {}
+
+    monkeypatch.setattr(workflow, "validation_app", EndlessGraph())
+    request = SwapValidationRequest(
+        swap_id=1, requester_id=1, requester_shift_id=10, target_employee_id=2, target_shift_id=20
+    )
+
+    stream = main.stream_validation_events(request)
+    assert (await stream.__anext__()).startswith("event: started")
+    assert (await stream.__anext__()).startswith("event: node")
+    await stream.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
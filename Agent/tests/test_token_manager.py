@@ -0,0 +1,95 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import jwt
+import pytest
+
+from app.graph.tools import JWTTokenManager
+
+
+def make_token(subject: str, lifetime_seconds: int = 3600) -> str:
+    return jwt.encode({"sub": subject, "exp": int(time.time()) + lifetime_seconds}, "test-signing-key-not-checked-by-the-agent", algorithm="HS256")
+
+
+def make_manager(logins: list, delay: float = 0.0) -> JWTTokenManager:
+    async def handler(request):
+        logins.append(request.url.path)
+        await asyncio.sleep(delay)
+        token = make_token(f"login-{len(logins)}")
+        return httpx.Response(200, headers={"set-cookie": f"auth_token={token}; Path=/; HttpOnly"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JWTTokenManager(lambda: client)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_login():
+    logins = []
+    manager = make_manager(logins, delay=0.05)
+
+    tokens = await asyncio.gather(*(manager.get_valid_token() for _ in range(5)))
+
+    assert len(logins) == 1
+    assert len(set(tokens)) == 1
+    assert manager.get_stats()["blocked_requests"] == 5
+
+    # A valid token is handed out without another login.
+    assert await manager.get_valid_token() == tokens[0]
+    assert len(logins) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_abort_the_shared_login():
+    logins = []
+    manager = make_manager(logins, delay=0.05)
+
+    first = asyncio.create_task(manager.get_valid_token())
+    second = asyncio.create_task(manager.get_valid_token())
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == manager.token
+    assert first.cancelled()
+    assert len(logins) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_only_drops_the_rejected_token():
+    logins = []
+    manager = make_manager(logins)
+    token = await manager.get_valid_token()
+
+    manager.invalidate("an-older-token")
+    assert manager.token == token
+
+    manager.invalidate(token)
+    assert manager.token is None
+    assert await manager.get_valid_token() != token
+    assert len(logins) == 2
+
+
+@pytest.mark.asyncio
+async def test_refresher_logs_in_before_the_token_expires():
+    logins = []
+    manager = make_manager(logins)
+    manager.token = "short-lived"
+    manager._token_obtained_at = datetime.now()
+    manager.token_expiry = manager._token_obtained_at + timedelta(seconds=0.2)
+
+    manager.start_refresher()
+    try:
+        # Half-life of a 0.2s token, well inside the 10 minute margin.
+        assert 0 < manager._seconds_until_refresh() <= 0.1
+        for _ in range(50):
+            if manager.get_stats()["background_refreshes"]:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await manager.stop_refresher()
+
+    assert manager.get_stats()["background_refreshes"] == 1
+    assert manager.token != "short-lived"
+    assert manager.is_token_valid()
+    assert manager.get_stats()["blocked_requests"] == 0
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from app.utils.cache import InMemoryCache, RedisCache, TwoTierCache
+
+
+class SharedCache(InMemoryCache):
+    # Stands in for Redis: a second in-memory store that records broadcasts.
+    def __init__(self):
+        super().__init__(max_size=100)
+        self.published = []
+
+    async def publish_invalidation(self, pattern: str):
+        self.published.append(pattern)
+
+
+class FakeRedis:
+    def __init__(self, values):
+        self.values = values
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_l2_hit_is_copied_into_l1_with_its_timestamp():
+    l1, l2 = InMemoryCache(max_size=100), SharedCache()
+    cache = TwoTierCache(l1, l2)
+    written_at = time.time() - 30
+    l2.set_nowait("employee:1", {"id": 1}, ttl=60, created_at=written_at)
+
+    assert await cache.get("employee:1") == {"id": 1}
+    local = l1.get_entry_nowait("employee:1")
+    assert local.created_at == written_at
+    assert local.ttl_seconds == 60
+
+
+@pytest.mark.asyncio
+async def test_writes_go_to_both_tiers_and_deletes_are_broadcast():
+    l1, l2 = InMemoryCache(max_size=100), SharedCache()
+    cache = TwoTierCache(l1, l2)
+
+    await cache.set("shift:2", {"id": 2}, ttl=60)
+    assert l1.get_nowait("shift:2") == l2.get_nowait("shift:2") == {"id": 2}
+
+    assert await cache.delete_pattern("shift:*") == 1
+    assert l1.get_nowait("shift:2") is None and l2.get_nowait("shift:2") is None
+    assert l2.published == ["shift:*"]
+
+
+@pytest.mark.asyncio
+async def test_fresher_l1_entry_wins_over_stale_l2():
+    l1, l2 = InMemoryCache(max_size=100), SharedCache()
+    cache = TwoTierCache(l1, l2)
+    l2.set_nowait("fatigue:3", {"score": 10}, ttl=1, grace=60, created_at=time.time() - 5)
+    l1.set_nowait("fatigue:3", {"score": 40}, ttl=1, grace=60, created_at=time.time() - 2)
+
+    entry = await cache.get_entry("fatigue:3")
+    assert entry.value == {"score": 40}
+    # Both stale, so a plain get() reports a miss.
+    assert await cache.get("fatigue:3") is None
+
+
+@pytest.mark.asyncio
+async def test_each_lookup_is_counted_once():
+    l1, l2 = InMemoryCache(max_size=100), SharedCache()
+    cache = TwoTierCache(l1, l2)
+    l1.set_nowait("employee:1", {"id": 1}, ttl=1, grace=60, created_at=time.time() - 5)
+    l2.set_nowait("employee:1", {"id": 1}, ttl=60)
+
+    # Stale in L1, fresh in L2: one lookup, one hit.
+    assert await cache.get("employee:1") == {"id": 1}
+    assert await cache.get("employee:2") is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stale_hits"]) == (1, 1, 0)
+    assert stats["hit_rate_percent"] == 50.0
+
+
+@pytest.mark.asyncio
+async def test_promotion_keeps_the_hit_count_for_refresh_ahead():
+    l1, l2 = InMemoryCache(max_size=100), SharedCache()
+    cache = TwoTierCache(l1, l2)
+    l1.set_nowait("shift:4", {"id": 4}, ttl=1, grace=60, created_at=time.time() - 5)
+    for _ in range(3):
+        l1.get_entry_nowait("shift:4")
+    l2.set_nowait("shift:4", {"id": 4}, ttl=60)
+
+    entry = await cache.get_entry("shift:4")
+    assert entry is l1.get_entry_nowait("shift:4")
+    assert entry.hits >= 4
+
+
+@pytest.mark.asyncio
+async def test_unreadable_l2_entry_is_dropped_as_a_miss():
+    l2 = RedisCache("redis://localhost:6379/0")
+    l2._client = FakeRedis({"smartshift:agent:employee:1": b"not json", "smartshift:agent:employee:2": b"[1, 2]"})
+
+    assert await l2.get_entry("employee:1") is None
+    assert await l2.get_entry("employee:2") is None
+    assert l2._client.values == {}
+    assert (l2.get_stats()["misses"], l2.get_stats()["errors"]) == (2, 2)
@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.graph.tools import AdaptiveConcurrencyLimiter, CircuitBreaker, endpoint_family, is_upstream_failure
+
+
+def make_limiter(**kwargs) -> AdaptiveConcurrencyLimiter:
+    options = {"initial_limit": 4, "min_limit": 1, "max_limit": 8, "max_wait_seconds": 1.0}
+    return AdaptiveConcurrencyLimiter(**{**options, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_over_the_limit_in_fifo_order():
+    limiter = make_limiter(initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+    order = []
+
+    async def wait(name):
+        await limiter.acquire()
+        order.append(name)
+
+    waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    assert limiter.get_stats()["queue_length"] == 2
+
+    limiter.release(0.01, True)
+    limiter.release(0.01, True)
+    await asyncio.gather(*waiters)
+
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_gives_up_after_max_wait():
+    limiter = make_limiter(initial_limit=1, max_wait_seconds=0.05)
+    await limiter.acquire()
+
+    with pytest.raises(Exception, match="concurrency limit"):
+        await limiter.acquire()
+
+    assert limiter.get_stats()["queue_timeouts"] == 1
+    assert limiter.get_stats()["queue_length"] == 0
+
+
+def test_limiter_grows_while_fast_and_backs_off_when_slow():
+    limiter = make_limiter(initial_limit=4)
+    limiter.in_flight = 4
+    for _ in range(8):
+        limiter.in_flight -= 1
+        limiter._record(0.010, True)
+        limiter.in_flight += 1
+    assert limiter.limit > 4
+
+    grown = limiter.limit
+    limiter._record(0.200, True)  # smoothed latency now far past 2x the baseline
+    assert limiter.limit == pytest.approx(grown * 0.9)
+
+    # At most one cut per round trip, however many slow responses arrive.
+    limiter._record(0.200, True)
+    assert limiter.limit == pytest.approx(grown * 0.9)
+
+
+def test_limiter_backs_off_on_errors_but_not_below_min():
+    limiter = make_limiter(initial_limit=4)
+    limiter._record(None, False)
+    assert limiter.limit == pytest.approx(3.6)
+
+    floored = make_limiter(initial_limit=1, min_limit=1)
+    floored._record(None, False)
+    assert floored.limit == 1
+    assert floored.get_stats()["decreases"] == 0
+
+
+def test_breaker_admits_a_single_probe_when_half_open():
+    breaker = CircuitBreaker("employees/{id}", failure_threshold=2, timeout_seconds=30)
+    breaker.call_failed()
+    breaker.call_failed()
+    assert breaker.state == "OPEN"
+    assert not breaker.can_attempt()
+
+    breaker.opened_at -= 31
+    assert breaker.can_attempt()
+    assert breaker.state == "HALF_OPEN"
+    assert not breaker.can_attempt()
+
+    # A request that started before the breaker opened doesn't close it.
+    breaker.call_succeeded()
+    assert breaker.state == "HALF_OPEN"
+
+    breaker.call_succeeded(probe=True)
+    assert breaker.state == "CLOSED"
+    assert breaker.can_attempt()
+    assert breaker.get_stats()["probes"] == 1
+
+
+def test_failed_probe_reopens_and_released_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=1, timeout_seconds=30)
+    breaker.call_failed()
+    breaker.opened_at -= 31
+
+    assert breaker.can_attempt()
+    breaker.release_probe()
+    assert breaker.state == "HALF_OPEN"
+    assert breaker.can_attempt()
+
+    breaker.call_failed(probe=True)
+    assert breaker.state == "OPEN"
+    assert not breaker.can_attempt()
+
+
+def test_breakers_are_per_route_and_ignore_client_errors():
+    assert endpoint_family("agent/employees/7/availability?date=2026-01-05") == "employees/{id}/availability"
+    assert endpoint_family("agent/fatigue-scores/12") == endpoint_family("agent/fatigue-scores/3")
+
+    request = httpx.Request("GET", "http://laravel.test/api/agent/employees/7")
+    assert is_upstream_failure(httpx.HTTPStatusError("", request=request, response=httpx.Response(503)))
+    assert is_upstream_failure(httpx.HTTPStatusError("", request=request, response=httpx.Response(429)))
+    assert not is_upstream_failure(httpx.HTTPStatusError("", request=request, response=httpx.Response(404)))
+    assert is_upstream_failure(httpx.ConnectTimeout("timed out"))
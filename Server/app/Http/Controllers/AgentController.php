@@ -18,11 +18,21 @@ public function getEmployee(int $id)
         return $this->responseJSON($this->agentService->getEmployee($id), 'success', 200);
     }
 
+    public function getEmployees(Request $request)
+    {
+        return $this->responseJSON($this->agentService->getEmployees($this->parseIds($request)), 'success', 200);
+    }
+
     public function getShift(int $id)
     {
         return $this->responseJSON($this->agentService->getShift($id), 'success', 200);
     }
 
+    public function getShifts(Request $request)
+    {
+        return $this->responseJSON($this->agentService->getShifts($this->parseIds($request)), 'success', 200);
+    }
+
     public function getEmployeeAvailability(Request $request, int $employeeId)
     {
         $date = $request->query('date');
@@ -44,4 +54,15 @@ public function getEmployeeShifts(int $employeeId)
     {
         return $this->responseJSON($this->employeeShiftsService->getEmployeeShifts($employeeId), 'success', 200);
     }
+
+    private function parseIds(Request $request): array
+    {
+        return collect(explode(',', (string) $request->query('ids', '')))
+            ->map(fn ($id) => (int) $id)
+            ->filter(fn ($id) => $id > 0)
+            ->unique()
+            ->take(100)
+            ->values()
+            ->all();
+    }
 }
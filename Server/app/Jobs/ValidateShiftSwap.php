@@ -55,7 +55,12 @@ private function callAgent(ShiftSwaps $swap): array
         $agentUrl = config('services.ai_agent.url');
         $timeout = config('services.ai_agent.timeout', 30);
 
+        // Give the agent a deadline a little inside our own timeout so it
+        // answers (with requires_review if need be) before we give up on it.
+        $deadlineMs = max(($timeout - 2) * 1000, 1000);
+
         $response = Http::timeout($timeout)
+            ->withHeaders(['X-Request-Deadline-Ms' => (string) $deadlineMs])
             ->post("{$agentUrl}/api/validate-swap", [
                 'swap_id' => $swap->id,
                 'requester_id' => $swap->requester_id,
@@ -19,6 +19,21 @@ public function getEmployee(int $id): array
         $employee = User::with(['userType', 'employeeDepartments.department'])
             ->findOrFail($id);
 
+        return $this->formatEmployee($employee);
+    }
+
+    public function getEmployees(array $ids): array
+    {
+        return User::with(['userType', 'employeeDepartments.department'])
+            ->whereIn('id', $ids)
+            ->get()
+            ->map(fn ($employee) => $this->formatEmployee($employee))
+            ->values()
+            ->toArray();
+    }
+
+    private function formatEmployee(User $employee): array
+    {
         return [
             'id' => $employee->id,
             'full_name' => $employee->full_name,
@@ -38,6 +53,21 @@ public function getShift(int $id): array
     {
         $shift = Shifts::with('department')->findOrFail($id);
 
+        return $this->formatShift($shift);
+    }
+
+    public function getShifts(array $ids): array
+    {
+        return Shifts::with('department')
+            ->whereIn('id', $ids)
+            ->get()
+            ->map(fn ($shift) => $this->formatShift($shift))
+            ->values()
+            ->toArray();
+    }
+
+    private function formatShift(Shifts $shift): array
+    {
         return [
             'id' => $shift->id,
             'department_id' => $shift->department_id,
@@ -31,10 +31,12 @@
     Route::get('me', [AuthController::class, 'me'])->middleware('jwt');
 
     Route::prefix('agent')->middleware('jwt')->group(function () {
+        Route::get('employees', [AgentController::class, 'getEmployees']);
         Route::get('employees/{id}', [AgentController::class, 'getEmployee']);
         Route::get('employees/{employeeId}/availability', [AgentController::class, 'getEmployeeAvailability']);
         Route::get('employees/{employeeId}/shifts', [AgentController::class, 'getEmployeeShifts']);
         Route::get('fatigue-scores/{employeeId}', [AgentController::class, 'getFatigueScore']);
+        Route::get('shifts', [AgentController::class, 'getShifts']);
         Route::get('shifts/{id}', [AgentController::class, 'getShift']);
         Route::get('shifts/{shiftId}/assignments', [AgentController::class, 'getShiftAssignments']);
     });
@@ -0,0 +1,138 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\Department;
+use App\Models\Shifts;
+use App\Models\User;
+use App\Models\User_type;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Tests\TestCase;
+
+class AgentBulkLookupTest extends TestCase
+{
+    use RefreshDatabase;
+
+    private string $token;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        User_type::create(['id' => 1, 'role_name' => 'manager']);
+        User_type::create(['id' => 2, 'role_name' => 'employee']);
+
+        $this->token = auth()->login(User::factory()->manager()->create());
+    }
+
+    /** @test */
+    public function agent_can_get_employees_by_id_list()
+    {
+        $employees = User::factory()->employee()->count(3)->create();
+        $ids = $employees->pluck('id')->implode(',');
+
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson("/api/v1/agent/employees?ids={$ids}");
+
+        $response->assertStatus(200)
+            ->assertJsonPath('status', 'success')
+            ->assertJsonCount(3, 'payload')
+            ->assertJsonStructure([
+                'status',
+                'payload' => [
+                    '*' => ['id', 'full_name', 'email', 'phone', 'is_active', 'user_type', 'departments'],
+                ],
+            ]);
+        $this->assertEqualsCanonicalizing($employees->pluck('id')->all(), $response->json('payload.*.id'));
+    }
+
+    /** @test */
+    public function agent_employee_lookup_skips_missing_and_invalid_ids()
+    {
+        $employee = User::factory()->employee()->create();
+        $missingId = $employee->id + 1000;
+
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson("/api/v1/agent/employees?ids={$employee->id},{$missingId},abc,-4,{$employee->id}");
+
+        $response->assertStatus(200)
+            ->assertJsonCount(1, 'payload')
+            ->assertJsonPath('payload.0.id', $employee->id);
+    }
+
+    /** @test */
+    public function agent_employee_lookup_is_capped_at_100_ids()
+    {
+        $employees = User::factory()->employee()->count(101)->create();
+        $ids = $employees->pluck('id')->implode(',');
+
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson("/api/v1/agent/employees?ids={$ids}");
+
+        $response->assertStatus(200)
+            ->assertJsonCount(100, 'payload');
+        $this->assertNotContains($employees->last()->id, $response->json('payload.*.id'));
+    }
+
+    /** @test */
+    public function agent_employee_lookup_without_ids_returns_empty_payload()
+    {
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson('/api/v1/agent/employees');
+
+        $response->assertStatus(200)
+            ->assertJsonPath('payload', []);
+    }
+
+    /** @test */
+    public function agent_can_get_shifts_by_id_list()
+    {
+        $department = Department::factory()->create();
+        $shifts = Shifts::factory()->count(2)->create(['department_id' => $department->id]);
+        $missingId = $shifts->max('id') + 1000;
+        $ids = $shifts->pluck('id')->push($missingId)->implode(',');
+
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson("/api/v1/agent/shifts?ids={$ids}");
+
+        $response->assertStatus(200)
+            ->assertJsonCount(2, 'payload')
+            ->assertJsonStructure([
+                'status',
+                'payload' => [
+                    '*' => [
+                        'id', 'department_id', 'department_name', 'shift_date', 'start_time',
+                        'end_time', 'shift_type', 'required_staff_count', 'status',
+                    ],
+                ],
+            ]);
+        $this->assertEqualsCanonicalizing($shifts->pluck('id')->all(), $response->json('payload.*.id'));
+    }
+
+    /** @test */
+    public function agent_shift_lookup_is_capped_at_100_ids()
+    {
+        $department = Department::factory()->create();
+        $shifts = Shifts::factory()->count(101)->create(['department_id' => $department->id]);
+        $ids = $shifts->pluck('id')->implode(',');
+
+        $response = $this->withHeaders([
+            'Authorization' => "Bearer {$this->token}",
+        ])->getJson("/api/v1/agent/shifts?ids={$ids}");
+
+        $response->assertStatus(200)
+            ->assertJsonCount(100, 'payload');
+    }
+
+    /** @test */
+    public function agent_bulk_lookup_requires_a_token()
+    {
+        $this->getJson('/api/v1/agent/employees?ids=1')->assertStatus(401);
+        $this->getJson('/api/v1/agent/shifts?ids=1')->assertStatus(401);
+    }
+}